@@ -1,16 +1,18 @@
 from typing import Dict
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.config import get_db
-from app.schemas.adl_schemas import AttachADLRequest
-from app.services.adl_service import ADLService
+from app.database.config import get_async_db
+from app.schemas.adl_schemas import AttachADLRequest, BulkAttachADLRequest
+from app.services.adl_service import AsyncADLService
 
 
 class ADLController:
     @staticmethod
-    def attach_adl(order_id: int, request: AttachADLRequest, db: Session = Depends(get_db)) -> Dict:
+    async def attach_adl(
+        order_id: int, request: AttachADLRequest, db: AsyncSession = Depends(get_async_db)
+    ) -> Dict:
         """Attach ADL media to an order"""
         adl_data = {
             "type": request.type,
@@ -20,5 +22,25 @@ class ADLController:
             "captured_at": request.capturedAt,
             "meta": request.meta,
         }
-        service = ADLService(db)
-        return service.attach_adl_to_order(order_id, adl_data)
+        service = AsyncADLService(db)
+        return await service.attach_adl_to_order(order_id, adl_data)
+
+    @staticmethod
+    async def attach_adl_bulk(
+        request: BulkAttachADLRequest, db: AsyncSession = Depends(get_async_db)
+    ) -> Dict:
+        """Attach ADL media to many orders at once"""
+        items = [
+            {
+                "order_id": item.orderId,
+                "type": item.type,
+                "url": item.url,
+                "gps_lat": item.gps.get("lat") if item.gps else None,
+                "gps_lng": item.gps.get("lng") if item.gps else None,
+                "captured_at": item.capturedAt,
+                "meta": item.meta,
+            }
+            for item in request.items
+        ]
+        service = AsyncADLService(db)
+        return await service.attach_adl_bulk(items)
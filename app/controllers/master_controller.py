@@ -1,21 +1,42 @@
-from typing import Dict, List
+from typing import AsyncIterator, Dict, Optional, Tuple
 
+import orjson
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.config import get_db
-from app.services.master_service import MasterService
+from app.database.config import get_async_db
+from app.repositories.master_repository import MasterFilters
+from app.services.master_service import AsyncMasterService
 
 
 class MasterController:
     @staticmethod
-    def get_all_masters(db: Session = Depends(get_db)) -> List[Dict]:
-        """Get all masters with their current load and availability"""
-        service = MasterService(db)
-        return service.get_all_masters()
+    async def list_masters(
+        filters: MasterFilters,
+        cursor: Optional[str],
+        limit: Optional[int],
+        if_none_match: Optional[str],
+        db: AsyncSession = Depends(get_async_db),
+    ) -> Tuple[str, Optional[Dict]]:
+        """List masters, one keyset page at a time; returns the ETag and page (None if unchanged)"""
+        service = AsyncMasterService(db)
+        return await service.list_masters_if_changed(filters, cursor, limit, if_none_match)
 
     @staticmethod
-    def get_master(master_id: int, db: Session = Depends(get_db)) -> Dict:
+    def stream_masters(
+        filters: MasterFilters, cursor: Optional[str], db: AsyncSession = Depends(get_async_db)
+    ) -> AsyncIterator[bytes]:
+        """Stream masters as NDJSON lines"""
+        masters = AsyncMasterService(db).stream_masters(filters, cursor)
+
+        async def lines():
+            async for master in masters:
+                yield orjson.dumps(master) + b"\n"
+
+        return lines()
+
+    @staticmethod
+    async def get_master(master_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict:
         """Get master by ID"""
-        service = MasterService(db)
-        return service.get_master_by_id(master_id)
+        service = AsyncMasterService(db)
+        return await service.get_master_by_id(master_id)
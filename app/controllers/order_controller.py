@@ -1,41 +1,113 @@
-from typing import Dict
+from typing import AsyncIterator, Dict, Optional, Tuple
 
+import orjson
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database.config import get_db
-from app.schemas.order_schemas import CreateOrderRequest
-from app.services.order_service import OrderService
+from app.database.config import get_async_db, get_unit_of_work
+from app.repositories.order_repository import OrderFilters
+from app.schemas.order_schemas import (
+    BatchAssignRequest,
+    BulkCreateOrdersRequest,
+    CreateOrderRequest,
+)
+from app.services.assignment_dispatcher import AssignmentDispatcher
+from app.services.order_service import AsyncOrderService, OrderService
 
 
 class OrderController:
     @staticmethod
-    def create_order(request: CreateOrderRequest, db: Session = Depends(get_db)) -> Dict:
+    async def create_order(
+        request: CreateOrderRequest, db: AsyncSession = Depends(get_async_db)
+    ) -> Dict:
         """Create a new order"""
-        order_data = {
+        service = AsyncOrderService(db)
+        return await service.create_order(OrderController._order_data(request))
+
+    @staticmethod
+    def create_orders_bulk(
+        request: BulkCreateOrdersRequest, db: Session = Depends(get_unit_of_work)
+    ) -> Dict:
+        """Create many orders at once, optionally assigning masters"""
+        service = OrderService(db)
+        return service.create_orders_bulk(
+            [OrderController._order_data(order) for order in request.orders],
+            request.autoAssign,
+            request.maxLoad,
+        )
+
+    @staticmethod
+    def _order_data(request: CreateOrderRequest) -> dict:
+        return {
             "title": request.title,
             "description": request.description,
             "customer": request.customer.dict() if request.customer else None,
             "geo_lat": request.geo.lat,
             "geo_lng": request.geo.lng,
         }
-        service = OrderService(db)
-        return service.create_order(order_data)
 
     @staticmethod
-    def get_order(order_id: int, db: Session = Depends(get_db)) -> Dict:
-        """Get order by ID"""
-        service = OrderService(db)
-        return service.get_order_by_id(order_id)
+    async def get_order(
+        order_id: int, if_none_match: Optional[str], db: AsyncSession = Depends(get_async_db)
+    ) -> Tuple[str, Optional[Dict]]:
+        """Get order by ID; returns the ETag and the order (None if unchanged)"""
+        service = AsyncOrderService(db)
+        return await service.get_order_if_changed(order_id, if_none_match)
+
+    @staticmethod
+    async def list_orders(
+        filters: OrderFilters,
+        cursor: Optional[str],
+        limit: int,
+        db: AsyncSession = Depends(get_async_db),
+    ) -> Dict:
+        """List orders, one keyset page at a time"""
+        service = AsyncOrderService(db)
+        return await service.list_orders(filters, cursor, limit)
+
+    @staticmethod
+    def stream_orders(
+        filters: OrderFilters, cursor: Optional[str], db: AsyncSession = Depends(get_async_db)
+    ) -> AsyncIterator[bytes]:
+        """Stream orders as NDJSON lines"""
+        orders = AsyncOrderService(db).stream_orders(filters, cursor)
+
+        async def lines():
+            async for order in orders:
+                yield orjson.dumps(order) + b"\n"
+
+        return lines()
+
+    @staticmethod
+    async def get_candidates(
+        order_id: int, k: int, db: AsyncSession = Depends(get_async_db)
+    ) -> Dict:
+        """Preview candidate masters for an order"""
+        service = AsyncOrderService(db)
+        return await service.get_candidates(order_id, k)
 
     @staticmethod
-    def assign_master(order_id: int, db: Session = Depends(get_db)) -> Dict:
+    async def assign_master(order_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict:
         """Assign master to order"""
+        service = AsyncOrderService(db)
+        return await service.assign_master_to_order(order_id)
+
+    @staticmethod
+    async def assign_master_dispatched(order_id: int, dispatcher: AssignmentDispatcher) -> Dict:
+        """Assign master to order through the micro-batching dispatcher"""
+        return await dispatcher.submit(order_id)
+
+    @staticmethod
+    def assign_masters_batch(
+        request: BatchAssignRequest, db: Session = Depends(get_unit_of_work)
+    ) -> Dict:
+        """Assign masters to a batch of orders"""
         service = OrderService(db)
-        return service.assign_master_to_order(order_id)
+        return service.assign_masters_batch(request.orderIds, request.maxLoad)
 
     @staticmethod
-    def complete_order(order_id: int, db: Session = Depends(get_db)) -> Dict:
+    async def complete_order(order_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict:
         """Complete an order"""
-        service = OrderService(db)
-        return service.complete_order(order_id)
+        service = AsyncOrderService(db)
+        return await service.complete_order(order_id)
@@ -1,18 +1,265 @@
 import logging
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional
 
-from sqlalchemy import create_engine
+from fastapi import Depends
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, AdaptedConnection, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.database.base import Base
+from app.settings import Settings, settings
+from app.utils.concurrency import acquire_lock
 
 logger = logging.getLogger(__name__)
 
-DATABASE_URL = "sqlite:///./nexa_test2.db"
+# SQLite VM instructions between statement deadline checks
+SQLITE_PROGRESS_STEPS = 10_000
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})  # Needed for SQLite
+# Name of the shared-cache database that in-memory SQLite URLs are mapped to
+SQLITE_MEMORY_NAME = "nexa_memory"
+
+# Per shared-cache in-memory database: the connection keeping it alive, and the lock
+# its connections take turns with (see share_memory_database())
+_memory_lock = threading.Lock()
+_memory_anchors: Dict[str, sqlite3.Connection] = {}
+_memory_turns: Dict[str, threading.Lock] = {}
+
+# asyncio drivers used by the async session path, per backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def sqlite_pragmas(config: Settings = settings) -> Dict[str, object]:
+    """PRAGMA values of the SQLite connection profile"""
+    return {
+        "journal_mode": config.sqlite_journal_mode,
+        "synchronous": config.sqlite_synchronous,
+        "busy_timeout": config.sqlite_busy_timeout_ms,
+        "mmap_size": config.sqlite_mmap_size,
+        "cache_size": config.sqlite_cache_size,
+        "temp_store": config.sqlite_temp_store,
+    }
+
+
+def is_in_memory_sqlite(url: URL) -> bool:
+    if url.get_backend_name() != "sqlite":
+        return False
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def shared_memory_url(url: URL) -> URL:
+    """
+    Turn a private in-memory SQLite URL into a named shared-cache one, so the sync
+    and async engines of this process open the same in-memory database
+    (see share_memory_database())
+    """
+    if url.database not in (None, "", ":memory:"):
+        return url
+    return url.set(
+        database=f"file:{SQLITE_MEMORY_NAME}",
+        query={"mode": "memory", "cache": "shared", "uri": "true"},
+    )
+
+
+def async_url(url: URL) -> URL:
+    """The same database URL with an asyncio driver"""
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def engine_options(url: URL, config: Settings = settings) -> Dict[str, object]:
+    """
+    Keyword arguments for create_engine() for a database URL.
+
+    - in-memory SQLite: a pool of one connection, so the engine's sessions take
+      turns on the shared database (see share_memory_database())
+    - file SQLite and server databases: a QueuePool sized by the db_pool_* settings;
+      server connections are also pinged before use, as the server may drop them
+    """
+    options: Dict[str, object] = {"echo": config.db_echo}
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}  # Needed for SQLite
+        if is_in_memory_sqlite(url):
+            options.update(poolclass=QueuePool, pool_size=1, max_overflow=0)
+            return options
+    else:
+        options["pool_pre_ping"] = True
+
+    options.update(
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_recycle=config.db_pool_recycle_s,
+    )
+    if backend == "postgresql" and config.db_statement_timeout_ms:
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={config.db_statement_timeout_ms}"
+        }
+    return options
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, object]) -> None:
+    """Run the given PRAGMAs on every new DBAPI connection of the engine"""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def apply_sqlite_statement_timeout(engine: Engine, timeout_ms: int) -> None:
+    """
+    Interrupt SQLite statements that run longer than timeout_ms.
+
+    SQLite has no statement_timeout setting, so each statement gets a deadline
+    and a progress handler aborts it ("interrupted") once the deadline passes.
+    """
+    timeout = timeout_ms / 1000
+
+    @event.listens_for(engine, "connect")
+    def _install_progress_handler(dbapi_connection, connection_record):
+        info = connection_record.info
+
+        def check_deadline():
+            deadline = info.get("statement_deadline")
+            return deadline is not None and time.monotonic() > deadline
+
+        if isinstance(dbapi_connection, AdaptedConnection):
+            # aiosqlite: the handler runs in the driver's connection thread
+            dbapi_connection.await_(
+                dbapi_connection.driver_connection.set_progress_handler(
+                    check_deadline, SQLITE_PROGRESS_STEPS
+                )
+            )
+        else:
+            dbapi_connection.set_progress_handler(check_deadline, SQLITE_PROGRESS_STEPS)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_deadline(connection, cursor, statement, parameters, context, executemany):
+        connection.info["statement_deadline"] = time.monotonic() + timeout
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _clear_deadline(connection, cursor, statement, parameters, context, executemany):
+        connection.info.pop("statement_deadline", None)
+
+
+def share_memory_database(engine: Engine, url: URL) -> None:
+    """
+    Let the engines of a shared-cache in-memory SQLite database use it in turns.
+
+    Connections to a shared cache lock whole tables, and a connection that finds a
+    table locked fails right away ("database table is locked"): busy_timeout does
+    not apply. So every connection of every engine on the database takes one lock
+    at checkout and gives it back at checkin; on the async path the wait happens
+    off the event loop. An anchor connection keeps the database alive while the
+    engines' pools are empty.
+    """
+    with _memory_lock:
+        lock = _memory_turns.get(url.database)
+        if lock is None:
+            query = "&".join(f"{key}={value}" for key, value in url.query.items() if key != "uri")
+            _memory_anchors[url.database] = sqlite3.connect(
+                f"{url.database}?{query}", uri=True, check_same_thread=False
+            )
+            lock = _memory_turns[url.database] = threading.Lock()
+
+    @event.listens_for(engine, "checkout")
+    def _take_turn(dbapi_connection, connection_record, connection_proxy):
+        acquire_lock(lock)
+
+    @event.listens_for(engine, "checkin")
+    def _end_turn(dbapi_connection, connection_record):
+        lock.release()
+
+
+def apply_mysql_statement_timeout(engine: Engine, timeout_ms: int) -> None:
+    """Limit SELECT execution time on every new MySQL connection"""
+
+    @event.listens_for(engine, "connect")
+    def _set_max_execution_time(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"SET SESSION max_execution_time={int(timeout_ms)}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(
+    url: Optional[str] = None,
+    pragmas: Optional[Dict[str, object]] = None,
+    config: Settings = settings,
+) -> Engine:
+    """
+    Create an engine for the database URL (config.database_url by default).
+
+    SQLite engines get the connection profile from sqlite_pragmas() (or the given
+    pragmas). Pool sizing, recycling, the statement timeout and echo come from the
+    db_* settings, so deployments only differ in their NEXA_* environment.
+    """
+    url = shared_memory_url(make_url(url or config.database_url))
+    engine = create_engine(url, **engine_options(url, config))
+    _configure_engine(engine, url, pragmas, config)
+    return engine
+
+
+def create_async_db_engine(
+    url: Optional[str] = None,
+    pragmas: Optional[Dict[str, object]] = None,
+    config: Settings = settings,
+) -> AsyncEngine:
+    """
+    Create an asyncio engine (aiosqlite, asyncpg, ...) for the database URL, with
+    the same pool settings and connection profile as create_db_engine()
+    """
+    url = async_url(shared_memory_url(make_url(url or config.database_url)))
+    options = engine_options(url, config)
+    if "pool_size" in options:
+        # aiosqlite would otherwise default to opening a connection per checkout
+        options["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(url, **options)
+    _configure_engine(engine.sync_engine, url, pragmas, config)
+    return engine
+
+
+def _configure_engine(
+    engine: Engine, url: URL, pragmas: Optional[Dict[str, object]], config: Settings
+) -> None:
+    backend = url.get_backend_name()
+    timeout_ms = config.db_statement_timeout_ms
+    if backend == "sqlite":
+        if is_in_memory_sqlite(url):
+            share_memory_database(engine, url)
+        apply_sqlite_pragmas(engine, sqlite_pragmas(config) if pragmas is None else pragmas)
+        if timeout_ms:
+            apply_sqlite_statement_timeout(engine, timeout_ms)
+    elif backend in ("mysql", "mariadb") and timeout_ms:
+        apply_mysql_statement_timeout(engine, timeout_ms)
+
+    logger.info(f"Database engine: {url.render_as_string(hide_password=True)}")
+
+
+engine = create_db_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_async_lock = threading.Lock()
+_async_engines: Dict[URL, AsyncEngine] = {}
+
 
 def get_db() -> Session:
     """Dependency for getting database session"""
@@ -23,10 +270,88 @@ def get_db() -> Session:
         db.close()
 
 
+def get_unit_of_work(db: Session = Depends(get_db)) -> Iterator[Session]:
+    """
+    Dependency for a request-scoped unit of work.
+
+    Repositories only flush; the request commits once when the handler returns,
+    and rolls back if it raises. Derived from get_db, so overriding get_db
+    (e.g. in tests) keeps the commit at the request boundary.
+    """
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def get_async_engine(bind: Engine) -> AsyncEngine:
+    """Return the async engine for the database a sync engine points at"""
+    with _async_lock:
+        async_engine = _async_engines.get(bind.url)
+        if async_engine is None:
+            async_engine = create_async_db_engine(bind.url.render_as_string(hide_password=False))
+            _async_engines[bind.url] = async_engine
+        return async_engine
+
+
+async def get_engine() -> Engine:
+    """
+    Dependency for the sync engine of the application database.
+
+    A coroutine, so resolving it takes no threadpool worker; tests override it
+    to point the async session path at their own database.
+    """
+    return engine
+
+
+@asynccontextmanager
+async def async_unit_of_work(bind: Engine) -> AsyncIterator[AsyncSession]:
+    """
+    Async session on the database of a sync engine, as a unit of work: commits
+    when the block exits, rolls back if it raises
+    """
+    async_db = AsyncSession(get_async_engine(bind), autoflush=False)
+    try:
+        yield async_db
+        await async_db.commit()
+    except Exception:
+        await async_db.rollback()
+        raise
+    finally:
+        await async_db.close()
+
+
+async def get_async_db(bind: Engine = Depends(get_engine)) -> AsyncIterator[AsyncSession]:
+    """
+    Dependency for getting an async database session, as a request-scoped unit
+    of work like get_unit_of_work: one commit when the handler returns.
+
+    The session is bound to the async engine of get_engine()'s database. Handlers
+    that only need a session on some paths take get_engine and open
+    async_unit_of_work() themselves.
+    """
+    async with async_unit_of_work(bind) as async_db:
+        yield async_db
+
+
+async def dispose_async_engines() -> None:
+    """Close the connection pools of all async engines"""
+    with _async_lock:
+        engines = list(_async_engines.values())
+        _async_engines.clear()
+    for async_engine in engines:
+        await async_engine.dispose()
+
+
 def init_db():
-    """Initialize database tables"""
+    """Initialize database tables and apply pending schema migrations"""
+    from app.database.migrations import run_migrations
+
     try:
         Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
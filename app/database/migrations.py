@@ -0,0 +1,146 @@
+"""
+Versioned schema migrations.
+
+Base.metadata.create_all() creates missing tables but never changes existing
+ones, so columns and indexes added to a model after a database was created
+reach it through the migrations below. Applied versions are recorded in the
+schema_migrations table; run_migrations() applies the rest, in order, each in
+its own transaction.
+
+Every migration checks the schema before changing it: a database created from
+the current models already has what a migration adds, and only gets the
+version recorded.
+
+Usage:
+    python -m app.database.migrations
+"""
+import logging
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Sequence
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database.base import Base
+from app.models.order import ACTIVE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _add_active_load_column(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("masters")}
+    if "active_load" in columns:
+        return
+
+    connection.execute(
+        text("ALTER TABLE masters ADD COLUMN active_load INTEGER NOT NULL DEFAULT 0")
+    )
+    # Plain SQL rather than MasterRepository.reconcile_active_load(): the current Master
+    # model also maps columns that later migrations add
+    # The status column stores the enum names
+    active = ", ".join(f"'{status.name}'" for status in ACTIVE_STATUSES)
+    result = connection.execute(
+        text(
+            "UPDATE masters SET active_load = (SELECT COUNT(*) FROM orders "
+            "WHERE orders.assigned_master_id = masters.id "
+            f"AND orders.status IN ({active}))"
+        )
+    )
+    logger.info(f"Backfilled masters.active_load for {result.rowcount} masters")
+
+
+def _add_master_version_column(connection: Connection) -> None:
+    columns = {column["name"] for column in inspect(connection).get_columns("masters")}
+    if "version" in columns:
+        return
+    connection.execute(text("ALTER TABLE masters ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+
+
+def _create_indexes(index_names: Sequence[str]) -> Callable[[Connection], None]:
+    """Upgrade that creates the named model indexes unless they already exist"""
+
+    def upgrade(connection: Connection) -> None:
+        indexes = {
+            index.name: index for table in Base.metadata.sorted_tables for index in table.indexes
+        }
+        for name in index_names:
+            indexes[name].create(bind=connection, checkfirst=True)
+
+    return upgrade
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Add masters.active_load and backfill it", _add_active_load_column),
+    Migration(
+        2,
+        "Index available masters by location",
+        _create_indexes(["ix_masters_available_geo"]),
+    ),
+    Migration(
+        3,
+        "Index orders by master and status, ADL media by order",
+        _create_indexes(["ix_orders_master_status", "ix_adl_media_order_id"]),
+    ),
+    Migration(
+        4,
+        "Index orders by (created_at, id) for listings",
+        _create_indexes(["ix_orders_created_id"]),
+    ),
+    Migration(5, "Add masters.version for ETags", _add_master_version_column),
+]
+
+
+def applied_versions(engine: Engine) -> List[int]:
+    """Versions recorded in schema_migrations, ascending"""
+    migration_metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        version = schema_migrations.c.version
+        return list(connection.scalars(select(version).order_by(version)))
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Apply pending migrations in version order, returning the versions applied"""
+    applied = set(applied_versions(engine))
+    upgraded = []
+    for migration in MIGRATIONS:
+        if migration.version in applied:
+            continue
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(
+                schema_migrations.insert().values(
+                    version=migration.version, description=migration.description
+                )
+            )
+        logger.info(f"Applied migration {migration.version}: {migration.description}")
+        upgraded.append(migration.version)
+    return upgraded
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    from app.database.config import init_db
+
+    init_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Rebuild denormalized counters from their source tables.
+
+Usage:
+    python -m app.database.reconcile
+"""
+import logging
+
+from app.database.config import SessionLocal, init_db
+from app.repositories.master_repository import MasterRepository
+
+logger = logging.getLogger(__name__)
+
+
+def reconcile_active_load() -> int:
+    """Recount masters.active_load from the orders table, returning the number of fixes"""
+    db = SessionLocal()
+    try:
+        corrected = MasterRepository(db).reconcile_active_load()
+        db.commit()
+        return corrected
+    finally:
+        db.close()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    )
+    init_db()
+    corrected = reconcile_active_load()
+    logger.info(f"Reconciled active_load: {corrected} masters corrected")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 import logging
 
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database.config import init_db, seed_sample_data
+from app.database.config import SessionLocal, dispose_async_engines, init_db, seed_sample_data
+from app.repositories import read_cache
 from app.routes import master_routes, order_routes
+from app.services.assignment_dispatcher import AssignmentDispatcher
+from app.settings import settings
 
 # Configure logging
 logging.basicConfig(
@@ -36,11 +40,30 @@ app.add_middleware(
 async def startup_event():
     """Initialize database and seed sample data on startup"""
     logger.info("Starting Nexa Task Manager API...")
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
     init_db()
     seed_sample_data()
+    if settings.assign_dispatcher_enabled:
+        dispatcher = AssignmentDispatcher(
+            SessionLocal,
+            flush_interval_ms=settings.assign_flush_interval_ms,
+            max_batch_size=settings.assign_max_batch_size,
+        )
+        await dispatcher.start()
+        app.state.assignment_dispatcher = dispatcher
     logger.info("Application started successfully")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and close async connection pools"""
+    dispatcher = getattr(app.state, "assignment_dispatcher", None)
+    if dispatcher:
+        await dispatcher.stop()
+        app.state.assignment_dispatcher = None
+    await dispose_async_engines()
+
+
 @app.get("/")
 def root():
     """Root endpoint"""
@@ -53,6 +76,12 @@ def health_check():
     return {"status": "healthy", "service": "nexa-task-manager-test2", "version": "1.0.0"}
 
 
+@app.get("/health/cache")
+def cache_stats():
+    """Read cache counters (hits, misses, evictions, ...) per cache"""
+    return {"enabled": read_cache.enabled(), "caches": read_cache.stats()}
+
+
 # Include routers
 app.include_router(order_routes.router, prefix="/api/v1")
 app.include_router(master_routes.router, prefix="/api/v1")
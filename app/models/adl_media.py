@@ -1,11 +1,14 @@
 import enum
+from operator import attrgetter
+from typing import Dict
 
 from sqlalchemy import JSON, Column, DateTime
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import Float, ForeignKey, Integer, String
+from sqlalchemy import Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.database.base import Base
+from app.utils.timestamps import render_timestamp
 
 
 class MediaType(str, enum.Enum):
@@ -15,6 +18,10 @@ class MediaType(str, enum.Enum):
 
 class ADLMedia(Base):
     __tablename__ = "adl_media"
+    __table_args__ = (
+        # Serves the ADL lookup of an order when it is completed
+        Index("ix_adl_media_order_id", "order_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
@@ -29,12 +36,33 @@ class ADLMedia(Base):
     order = relationship("Order", back_populates="adl_media")
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "orderId": self.order_id,
-            "type": self.type.value,
-            "url": self.url,
-            "gps": {"lat": self.gps_lat, "lng": self.gps_lng},
-            "capturedAt": self.captured_at.isoformat() if self.captured_at else None,
-            "meta": self.meta,
-        }
+        return adl_view(_view_row(self))
+
+
+# Columns of the read-only ADL media views, in the order adl_view() unpacks them
+ADL_VIEW_COLUMNS = (
+    ADLMedia.id,
+    ADLMedia.order_id,
+    ADLMedia.type,
+    ADLMedia.url,
+    ADLMedia.gps_lat,
+    ADLMedia.gps_lng,
+    ADLMedia.captured_at,
+    ADLMedia.meta,
+)
+# Reads the ADL_VIEW_COLUMNS values of an instance, as one row tuple
+_view_row = attrgetter(*(column.key for column in ADL_VIEW_COLUMNS))
+
+
+def adl_view(row) -> Dict:
+    """Build the ADLMedia.to_dict() shape from an ADL_VIEW_COLUMNS row"""
+    adl_id, order_id, media_type, url, lat, lng, captured_at, meta = row
+    return {
+        "id": adl_id,
+        "orderId": order_id,
+        "type": media_type.value,
+        "url": url,
+        "gps": {"lat": lat, "lng": lng},
+        "capturedAt": render_timestamp(captured_at),
+        "meta": meta,
+    }
@@ -1,4 +1,7 @@
-from sqlalchemy import Boolean, Column, Float, Integer, String
+from operator import attrgetter
+from typing import Dict
+
+from sqlalchemy import Boolean, Column, Float, Index, Integer, String, text
 from sqlalchemy.orm import relationship
 
 from app.database.base import Base
@@ -6,6 +9,10 @@ from app.database.base import Base
 
 class Master(Base):
     __tablename__ = "masters"
+    __table_args__ = (
+        # Serves the bounding-box candidate query: is_available = 1 AND lat/lng in range
+        Index("ix_masters_available_geo", "is_available", "geo_lat", "geo_lng"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -13,15 +20,41 @@ class Master(Base):
     is_available = Column(Boolean, nullable=False, default=True)
     geo_lat = Column(Float, nullable=False)
     geo_lng = Column(Float, nullable=False)
+    # Number of assigned/in_progress orders, maintained alongside order status changes
+    active_load = Column(Integer, nullable=False, default=0, server_default="0")
+    # Row version, bumped in SQL by every UPDATE of the row (ORM flushes and Core updates
+    # such as active_load changes alike); ETags of master responses are derived from it
+    version = Column(
+        Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1")
+    )
 
     # Relationships
     orders = relationship("Order", back_populates="assigned_master")
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "rating": self.rating,
-            "isAvailable": self.is_available,
-            "geo": {"lat": self.geo_lat, "lng": self.geo_lng},
-        }
+        return master_view(_view_row(self))
+
+
+# Columns of the read-only master views, in the order master_view() unpacks them
+MASTER_VIEW_COLUMNS = (
+    Master.id,
+    Master.name,
+    Master.rating,
+    Master.is_available,
+    Master.geo_lat,
+    Master.geo_lng,
+)
+# Reads the MASTER_VIEW_COLUMNS values of an instance, as one row tuple
+_view_row = attrgetter(*(column.key for column in MASTER_VIEW_COLUMNS))
+
+
+def master_view(row) -> Dict:
+    """Build the Master.to_dict() shape from a MASTER_VIEW_COLUMNS row"""
+    master_id, name, rating, is_available, lat, lng = row
+    return {
+        "id": master_id,
+        "name": name,
+        "rating": rating,
+        "isAvailable": is_available,
+        "geo": {"lat": lat, "lng": lng},
+    }
@@ -1,12 +1,17 @@
 import enum
 from datetime import datetime
+from operator import attrgetter
+from typing import Dict
 
 from sqlalchemy import JSON, Column, DateTime
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import Float, ForeignKey, Integer, String
+from sqlalchemy import Float, ForeignKey, Index, Integer, String, event, update
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import get_history
 
 from app.database.base import Base
+from app.models.master import Master
+from app.utils.timestamps import render_timestamp
 
 
 class OrderStatus(str, enum.Enum):
@@ -17,8 +22,19 @@ class OrderStatus(str, enum.Enum):
     REJECTED = "rejected"
 
 
+# Statuses that count towards a master's active load
+ACTIVE_STATUSES = (OrderStatus.ASSIGNED, OrderStatus.IN_PROGRESS)
+
+
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Serves per-master load counts (assigned_master_id = ? AND status IN (active)) and
+        # the assignment queue (IS NULL AND status = 'NEW', oldest first, without a sort)
+        Index("ix_orders_master_status", "assigned_master_id", "status", "created_at"),
+        # Serves keyset pagination of order listings: ORDER BY created_at, id
+        Index("ix_orders_created_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -36,17 +52,7 @@ class Order(Base):
     adl_media = relationship("ADLMedia", back_populates="order", cascade="all, delete-orphan")
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "title": self.title,
-            "description": self.description,
-            "status": self.status.value,
-            "customer": self.customer,
-            "geo": {"lat": self.geo_lat, "lng": self.geo_lng},
-            "assignedMasterId": self.assigned_master_id,
-            "createdAt": self.created_at.isoformat() if self.created_at else None,
-            "updatedAt": self.updated_at.isoformat() if self.updated_at else None,
-        }
+        return order_view(_view_row(self))
 
     def to_dict_with_relations(self):
         result = self.to_dict()
@@ -55,3 +61,92 @@ class Order(Base):
         if self.adl_media:
             result["adlMedia"] = [adl.to_dict() for adl in self.adl_media]
         return result
+
+
+# Columns of the read-only order views, in the order order_view() unpacks them
+ORDER_VIEW_COLUMNS = (
+    Order.id,
+    Order.title,
+    Order.description,
+    Order.status,
+    Order.customer,
+    Order.geo_lat,
+    Order.geo_lng,
+    Order.assigned_master_id,
+    Order.created_at,
+    Order.updated_at,
+)
+# Reads the ORDER_VIEW_COLUMNS values of an instance, as one row tuple
+_view_row = attrgetter(*(column.key for column in ORDER_VIEW_COLUMNS))
+
+
+def order_view(row) -> Dict:
+    """Build the Order.to_dict() shape from an ORDER_VIEW_COLUMNS row"""
+    order_id, title, description, status, customer, lat, lng, master_id, created, updated = row
+    return {
+        "id": order_id,
+        "title": title,
+        "description": description,
+        "status": status.value,
+        "customer": customer,
+        "geo": {"lat": lat, "lng": lng},
+        "assignedMasterId": master_id,
+        "createdAt": render_timestamp(created),
+        "updatedAt": render_timestamp(updated),
+    }
+
+
+def active_load_holder(master_id, status):
+    """Return the master whose active load includes an order in this state"""
+    return master_id if status in ACTIVE_STATUSES else None
+
+
+def _previous_value(order: Order, key: str):
+    history = get_history(order, key)
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(order, key)
+
+
+def active_load_change(order: Order):
+    """Return (old_holder, new_holder) for an order's unflushed changes"""
+    old_holder = active_load_holder(
+        _previous_value(order, "assigned_master_id"), _previous_value(order, "status")
+    )
+    return old_holder, active_load_holder(order.assigned_master_id, order.status)
+
+
+def adjust_active_load(connection, master_id: int, delta: int) -> None:
+    """Shift a master's active_load counter inside the caller's transaction"""
+    masters = Master.__table__
+    connection.execute(
+        update(masters)
+        .where(masters.c.id == master_id)
+        .values(active_load=masters.c.active_load + delta)
+    )
+
+
+def move_active_load(connection, old_holder, new_holder) -> None:
+    """Move one unit of active load between masters (either may be None)"""
+    if old_holder == new_holder:
+        return
+    if old_holder is not None:
+        adjust_active_load(connection, old_holder, -1)
+    if new_holder is not None:
+        adjust_active_load(connection, new_holder, 1)
+
+
+@event.listens_for(Order, "after_insert")
+def _order_inserted(mapper, connection, order: Order) -> None:
+    move_active_load(connection, None, active_load_holder(order.assigned_master_id, order.status))
+
+
+@event.listens_for(Order, "after_update")
+def _order_updated(mapper, connection, order: Order) -> None:
+    move_active_load(connection, *active_load_change(order))
+
+
+@event.listens_for(Order, "after_delete")
+def _order_deleted(mapper, connection, order: Order) -> None:
+    old_holder, _ = active_load_change(order)
+    move_active_load(connection, old_holder, None)
@@ -1,8 +1,10 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+from sqlalchemy import Exists, insert, select
 from sqlalchemy.orm import Session
 
-from app.models.adl_media import ADLMedia
+from app.models.adl_media import ADL_VIEW_COLUMNS, ADLMedia, adl_view
+from app.repositories import read_cache
 
 
 class ADLRepository:
@@ -13,6 +15,11 @@ class ADLRepository:
         """Get all ADL media for an order"""
         return self.db.query(ADLMedia).filter(ADLMedia.order_id == order_id).all()
 
+    def get_views_by_order_id(self, order_id: int) -> List[Dict]:
+        """Get all ADL media of an order as response dicts, read-only and without ORM objects"""
+        query = select(*ADL_VIEW_COLUMNS).where(ADLMedia.order_id == order_id)
+        return [adl_view(row) for row in self.db.execute(query.order_by(ADLMedia.id))]
+
     def get_by_id(self, adl_id: int) -> Optional[ADLMedia]:
         """Get ADL media by ID"""
         return self.db.query(ADLMedia).filter(ADLMedia.id == adl_id).first()
@@ -21,18 +28,43 @@ class ADLRepository:
         """Create new ADL media"""
         adl = ADLMedia(**adl_data)
         self.db.add(adl)
-        self.db.commit()
-        self.db.refresh(adl)
+        self.db.flush()
+        read_cache.invalidate_orders(self.db, [adl.order_id])
         return adl
 
+    def create_many(self, adl_data: List[dict]) -> List[int]:
+        """
+        Insert many ADL media rows with one executemany (multi-row VALUES ... RETURNING)
+
+        Returns the new IDs in input order. The rows are not loaded into the session.
+        """
+        if not adl_data:
+            return []
+        read_cache.invalidate_orders(self.db, {adl["order_id"] for adl in adl_data})
+        # RETURNING rows come back unordered, but IDs are handed out in VALUES order
+        return sorted(self.db.scalars(insert(ADLMedia).returning(ADLMedia.id), adl_data))
+
+    @staticmethod
+    def valid_adl_exists(order_id) -> Exists:
+        """
+        EXISTS clause: the order has an ADL with GPS coordinates and a timestamp.
+        order_id is a value, or a column such as Order.id to correlate a statement on orders
+        """
+        return (
+            select(ADLMedia.id)
+            .where(
+                ADLMedia.order_id == order_id,
+                ADLMedia.gps_lat.is_not(None),
+                ADLMedia.gps_lng.is_not(None),
+                ADLMedia.captured_at.is_not(None),
+            )
+            .exists()
+        )
+
     def has_valid_adl(self, order_id: int) -> bool:
-        """Check if order has at least one valid ADL with GPS and timestamp"""
-        adl_list = self.get_by_order_id(order_id)
-        if not adl_list:
-            return False
-
-        # Check if at least one ADL has valid GPS coordinates and timestamp
-        for adl in adl_list:
-            if adl.gps_lat is not None and adl.gps_lng is not None and adl.captured_at is not None:
-                return True
-        return False
+        """
+        Check if order has at least one valid ADL with GPS and timestamp
+        One EXISTS query that seeks ix_adl_media_order_id and stops at the first match,
+        however many media the order has
+        """
+        return bool(self.db.scalar(select(self.valid_adl_exists(order_id))))
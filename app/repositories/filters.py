@@ -0,0 +1,35 @@
+from typing import Optional, Protocol
+
+from sqlalchemy import and_, or_
+
+
+class BoundingBoxFilters(Protocol):
+    """Listing filters with an optional bounding box"""
+
+    min_lat: Optional[float]
+    max_lat: Optional[float]
+    min_lng: Optional[float]
+    max_lng: Optional[float]
+
+
+def bounding_box_conditions(filters: BoundingBoxFilters, lat_column, lng_column) -> list:
+    """
+    Build the WHERE conditions of a (partial) bounding box; min_lng > max_lng
+    selects a box crossing the antimeridian
+    """
+    conditions = []
+    if filters.min_lat is not None:
+        conditions.append(lat_column >= filters.min_lat)
+    if filters.max_lat is not None:
+        conditions.append(lat_column <= filters.max_lat)
+    lng_bounds = []
+    if filters.min_lng is not None:
+        lng_bounds.append(lng_column >= filters.min_lng)
+    if filters.max_lng is not None:
+        lng_bounds.append(lng_column <= filters.max_lng)
+    if len(lng_bounds) == 2 and filters.min_lng > filters.max_lng:
+        # Box wraps around the antimeridian
+        conditions.append(or_(*lng_bounds))
+    elif lng_bounds:
+        conditions.append(and_(*lng_bounds))
+    return conditions
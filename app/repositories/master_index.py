@@ -0,0 +1,290 @@
+"""
+Process-level read model of masters.
+
+One MasterRegistry (columnar arrays plus a spatial index of the available
+masters) is kept per database, shared by the sync and async engines that
+point at it. It is built lazily from the masters table on first use and then
+follows committed writes through session events:
+
+- ORM writes to Master rows (inserts, moves, availability changes, deletes)
+- active_load changes, from ORM order writes seen at flush time and from
+  Core updates reported with record_load_change()
+- ORM bulk UPDATE/DELETE on masters, which drop the registry so it is rebuilt
+
+so it is not rebuilt for the writes of this process.
+
+A registry built from a snapshot that is out of step with those events is
+used once but not kept: while another transaction holding master changes is
+between its flush and the end of its commit (its changes may or may not be
+in the rows), or when such a commit completed after the building session's
+transaction began (its rows may predate it). Writes by other processes
+(another worker, `make reconcile`) are never seen by the events, so a
+registry older than NEXA_MASTER_REGISTRY_MAX_AGE_S is rebuilt on next use.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from app.models.master import Master
+from app.models.order import Order, active_load_change, active_load_holder
+from app.settings import settings
+from app.utils.master_registry import MasterColumns, MasterRecord, MasterRegistry
+from app.utils.spatial_index import GridIndex
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "master_index_pending"
+_SEQUENCE_KEY = "master_index_sequence"
+
+_lock = threading.RLock()
+_registries: Dict[object, MasterRegistry] = {}
+_built_at: Dict[object, float] = {}
+# Per database: commits whose master changes have been applied, and transactions
+# holding master changes that are not applied yet (from their flush to their end)
+_sequences: Counter = Counter()
+_in_flight: Counter = Counter()
+
+
+class _PendingChanges:
+    """Master changes made inside a transaction, applied to the registry on commit"""
+
+    def __init__(self, database: object):
+        self.database = database
+        self.masters: Dict[int, Optional[tuple]] = {}
+        self.loads: Counter = Counter()
+        self.rebuild = False
+
+
+def database_of(bind) -> object:
+    """Registry key: the database URL without its driver (sync and async share it)"""
+    engine = getattr(bind, "engine", bind)
+    url = engine.url
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # Every private in-memory engine is its own database
+        return engine
+    return url.set(drivername=url.get_backend_name())
+
+
+def _pending(session: Session) -> _PendingChanges:
+    pending = session.info.get(_PENDING_KEY)
+    if pending is None:
+        pending = _PendingChanges(database_of(session.get_bind()))
+        with _lock:
+            _in_flight[pending.database] += 1
+        session.info[_PENDING_KEY] = pending
+    return pending
+
+
+def get_registry(db: Session) -> MasterRegistry:
+    """Return the registry for the session's database, building it on first use"""
+    database = database_of(db.get_bind())
+    with _lock:
+        registry = _registries.get(database)
+        if registry is not None:
+            if time.monotonic() - _built_at[database] < settings.master_registry_max_age_s:
+                return registry
+            del _registries[database]
+
+    # Built without holding the lock: on the async path the query yields to the
+    # event loop, where other requests may need the lock
+    registry = MasterRegistry()
+    rows = db.execute(
+        select(
+            Master.id,
+            Master.name,
+            Master.rating,
+            Master.is_available,
+            Master.geo_lat,
+            Master.geo_lng,
+            Master.active_load,
+        )
+    )
+    for row in rows:
+        registry.upsert(*row)
+    with _lock:
+        if not _in_step(db, database):
+            return registry
+        _registries[database] = registry
+        _built_at[database] = time.monotonic()
+    logger.info(
+        f"Built master registry with {len(registry)} masters ({len(registry.index)} available)"
+    )
+    return registry
+
+
+def _in_step(db: Session, database: object) -> bool:
+    """Whether a registry just built from the session's rows can be kept (see module docstring)"""
+    if _PENDING_KEY in db.info:
+        # The rows include this session's uncommitted writes, applied again on commit
+        return False
+    return not _in_flight[database] and db.info.get(_SEQUENCE_KEY) == _sequences[database]
+
+
+def get_index(db: Session) -> GridIndex:
+    """Return the spatial index of available masters for the session's database"""
+    return get_registry(db).index
+
+
+def nearest_available(db: Session, lat: float, lng: float, k: int) -> List[Tuple[float, int]]:
+    """Return up to k (distance_km, master_id) pairs for the nearest available masters"""
+    registry = get_registry(db)
+    with _lock:
+        return registry.nearest(lat, lng, k)
+
+
+def get_records(db: Session, master_ids: Iterable[int]) -> List[MasterRecord]:
+    """Return MasterRecords for the known IDs among master_ids"""
+    registry = get_registry(db)
+    with _lock:
+        return registry.records(master_ids)
+
+
+def get_columns(db: Session, available_only: bool = False) -> MasterColumns:
+    """Return a column snapshot of all (or only available) masters, ordered by ID"""
+    registry = get_registry(db)
+    with _lock:
+        return registry.columns(available_only)
+
+
+def record_load_change(db: Session, master_id: int, delta: int) -> None:
+    """Report an active_load change written with Core, applied when the session commits"""
+    _pending(db).loads[master_id] += delta
+
+
+def reset(engine: Engine = None) -> None:
+    """Drop the registry of one engine's database (or all), forcing a rebuild on next use"""
+    with _lock:
+        if engine is None:
+            _registries.clear()
+        else:
+            _registries.pop(database_of(engine), None)
+
+
+def _master_state(master: Master, is_new: bool) -> tuple:
+    # active_load is usually moved by Core updates, so the loaded value may be
+    # stale; only trust it for new rows or when it was set explicitly
+    load = master.active_load
+    if not is_new and not get_history(master, "active_load").has_changes():
+        load = None
+    return (master.name, master.rating, master.is_available, master.geo_lat, master.geo_lng, load)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_master_changes(session: Session, flush_context) -> None:
+    """
+    Remember flushed master and load changes until the transaction commits.
+
+    Only a flush that changes a master row or moves active load is recorded, so
+    e.g. creating NEW orders neither holds back nor outdates a registry build.
+    """
+    masters = _master_changes(session)
+    loads = _load_changes(session)
+    if not masters and not any(loads.values()):
+        return
+    pending = _pending(session)
+    for master_id, state in masters.items():
+        previous = pending.masters.get(master_id)
+        if state is not None and state[-1] is None and previous is not None:
+            # Keep a load set explicitly by an earlier flush
+            state = state[:-1] + (previous[-1],)
+        pending.masters[master_id] = state
+    pending.loads.update(loads)
+
+
+def _master_changes(session: Session) -> Dict[int, Optional[tuple]]:
+    masters: Dict[int, Optional[tuple]] = {}
+    for obj in session.new:
+        if isinstance(obj, Master):
+            masters[obj.id] = _master_state(obj, is_new=True)
+    for obj in session.dirty:
+        # Collections do not count: adding an order to master.orders changes no column
+        if isinstance(obj, Master) and session.is_modified(obj, include_collections=False):
+            masters[obj.id] = _master_state(obj, is_new=False)
+    for obj in session.deleted:
+        if isinstance(obj, Master):
+            masters[obj.id] = None
+    return masters
+
+
+def _load_changes(session: Session) -> Counter:
+    loads: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, Order):
+            _move_load(loads, None, active_load_holder(obj.assigned_master_id, obj.status))
+    for obj in session.dirty:
+        if isinstance(obj, Order):
+            _move_load(loads, *active_load_change(obj))
+    for obj in session.deleted:
+        if isinstance(obj, Order):
+            _move_load(loads, active_load_change(obj)[0], None)
+    return loads
+
+
+def _move_load(loads: Counter, old_holder, new_holder) -> None:
+    if old_holder == new_holder:
+        return
+    if old_holder is not None:
+        loads[old_holder] -= 1
+    if new_holder is not None:
+        loads[new_holder] += 1
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _detect_bulk_master_writes(orm_execute_state) -> None:
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        if any(mapper.class_ is Master for mapper in orm_execute_state.all_mappers):
+            _pending(orm_execute_state.session).rebuild = True
+
+
+@event.listens_for(Session, "after_begin")
+def _remember_sequence(session: Session, transaction, connection) -> None:
+    session.info[_SEQUENCE_KEY] = _sequences[database_of(connection)]
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_master_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending is None:
+        return
+    database = pending.database
+    with _lock:
+        _in_flight[database] -= 1
+        _sequences[database] += 1
+        if pending.rebuild:
+            _registries.pop(database, None)
+            return
+        registry = _registries.get(database)
+        if registry is None:
+            # Not built yet; it will read the committed rows when first used
+            return
+        for master_id, state in pending.masters.items():
+            if state is None:
+                registry.remove(master_id)
+            else:
+                registry.upsert(master_id, *state)
+        for master_id, delta in pending.loads.items():
+            if delta:
+                registry.add_load(master_id, delta)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_master_changes(session: Session, transaction) -> None:
+    if transaction.parent is not None:
+        return
+    # Still pending at the end of the transaction: rolled back, or closed without commit
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending is not None:
+        with _lock:
+            _in_flight[pending.database] -= 1
+
+
+@event.listens_for(Master.__table__, "after_drop")
+def _drop_registry(target, connection, **kw) -> None:
+    reset(connection.engine)
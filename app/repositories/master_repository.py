@@ -1,8 +1,32 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
+from sqlalchemy import and_, func, or_, select, update
 from sqlalchemy.orm import Session
 
-from app.models.master import Master
+from app.models.master import MASTER_VIEW_COLUMNS, Master, master_view
+from app.repositories import master_index, read_cache
+from app.repositories.filters import bounding_box_conditions
+from app.utils.distance import bounding_box
+from app.utils.master_registry import MasterColumns, MasterRecord
+
+
+class MasterFilters(NamedTuple):
+    """Filters of a master listing; None means no restriction"""
+
+    is_available: Optional[bool] = None
+    min_rating: Optional[float] = None
+    # Bounding box; min_lng > max_lng selects a box crossing the antimeridian
+    min_lat: Optional[float] = None
+    max_lat: Optional[float] = None
+    min_lng: Optional[float] = None
+    max_lng: Optional[float] = None
+
+
+def master_load_view(row) -> Dict:
+    """master_view() plus currentLoad, from MASTER_VIEW_COLUMNS + active_load"""
+    master_dict = master_view(row[:-1])
+    master_dict["currentLoad"] = row[-1]
+    return master_dict
 
 
 class MasterRepository:
@@ -17,16 +41,98 @@ class MasterRepository:
         """Get master by ID"""
         return self.db.query(Master).filter(Master.id == master_id).first()
 
+    def get_view(self, master_id: int) -> Optional[Dict]:
+        """
+        Get master by ID as a response dict with its currentLoad
+        Read-only: selects the columns and builds the dict without an ORM object
+        """
+        query = select(*MASTER_VIEW_COLUMNS, Master.active_load).where(Master.id == master_id)
+        row = self.db.execute(query).first()
+        return master_load_view(row) if row else None
+
+    def list_page(
+        self, filters: MasterFilters, after_id: Optional[int], limit: Optional[int]
+    ) -> List[Dict]:
+        """
+        Get up to limit (None: all) masters matching the filters, ordered by id, as
+        response dicts with their currentLoad (read-only, like get_view)
+
+        Keyset pagination: with after_id, only masters with a larger id are returned.
+        """
+        query = select(*MASTER_VIEW_COLUMNS, Master.active_load)
+        query = query.where(*self._filter_conditions(filters))
+        if after_id is not None:
+            query = query.where(Master.id > after_id)
+        rows = self.db.execute(query.order_by(Master.id).limit(limit))
+        return [master_load_view(row) for row in rows]
+
+    def list_versions(
+        self, filters: MasterFilters, after_id: Optional[int], limit: Optional[int]
+    ) -> List[Tuple[int, int]]:
+        """
+        Get the (id, version) pairs of the masters list_page() would return, with the
+        same arguments; the page's content changes exactly when these do
+        """
+        query = select(Master.id, Master.version).where(*self._filter_conditions(filters))
+        if after_id is not None:
+            query = query.where(Master.id > after_id)
+        return [tuple(row) for row in self.db.execute(query.order_by(Master.id).limit(limit))]
+
+    @staticmethod
+    def _filter_conditions(filters: MasterFilters) -> list:
+        conditions = []
+        if filters.is_available is not None:
+            conditions.append(Master.is_available.is_(filters.is_available))
+        if filters.min_rating is not None:
+            conditions.append(Master.rating >= filters.min_rating)
+        return conditions + bounding_box_conditions(filters, Master.geo_lat, Master.geo_lng)
+
     def get_available_masters(self) -> List[Master]:
         """Get all available masters"""
         return self.db.query(Master).filter(Master.is_available.is_(True)).all()
 
+    def get_available_masters_near(self, lat: float, lng: float, radius_km: float) -> List[Master]:
+        """
+        Get available masters inside the lat/lng bounding box of a radius around a point
+
+        The box is a superset of the circle, so callers must still check distances.
+        """
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+        if min_lng <= max_lng:
+            lng_filter = and_(Master.geo_lng >= min_lng, Master.geo_lng <= max_lng)
+        else:
+            # Box wraps around the antimeridian
+            lng_filter = or_(Master.geo_lng >= min_lng, Master.geo_lng <= max_lng)
+
+        return (
+            self.db.query(Master)
+            .filter(
+                Master.is_available.is_(True),
+                Master.geo_lat >= min_lat,
+                Master.geo_lat <= max_lat,
+                lng_filter,
+            )
+            .all()
+        )
+
+    def get_nearest_available(self, lat: float, lng: float, k: int) -> List[Tuple[float, int]]:
+        """Get (distance_km, master_id) pairs for the k nearest available masters"""
+        return master_index.nearest_available(self.db, lat, lng, k)
+
+    def get_records(self, master_ids: Iterable[int]) -> List[MasterRecord]:
+        """Get masters by IDs from the in-memory registry, skipping unknown IDs"""
+        return master_index.get_records(self.db, master_ids)
+
+    def get_columns(self, available_only: bool = False) -> MasterColumns:
+        """Get a column snapshot of all (or only available) masters from the in-memory registry"""
+        return master_index.get_columns(self.db, available_only)
+
     def create(self, master_data: dict) -> Master:
         """Create new master"""
         master = Master(**master_data)
         self.db.add(master)
-        self.db.commit()
-        self.db.refresh(master)
+        self.db.flush()
+        read_cache.invalidate_masters(self.db, [master.id])
         return master
 
     def update(self, master_id: int, master_data: dict) -> Optional[Master]:
@@ -35,8 +141,10 @@ class MasterRepository:
         if master:
             for key, value in master_data.items():
                 setattr(master, key, value)
-            self.db.commit()
-            self.db.refresh(master)
+            self.db.flush()
+            read_cache.invalidate_masters(self.db, [master_id])
+            # Orders render their master
+            read_cache.invalidate_orders(self.db)
         return master
 
     def get_master_order_count(self, master_id: int) -> int:
@@ -51,3 +159,25 @@ class MasterRepository:
             )
             .count()
         )
+
+    def reconcile_active_load(self) -> int:
+        """
+        Rebuild every master's active_load counter from the orders table.
+
+        Returns the number of masters whose counter had drifted and was corrected.
+        """
+        from app.models.order import ACTIVE_STATUSES, Order
+
+        active_count = (
+            select(func.count(Order.id))
+            .where(Order.assigned_master_id == Master.id, Order.status.in_(ACTIVE_STATUSES))
+            .scalar_subquery()
+        )
+        result = self.db.execute(
+            update(Master)
+            .where(Master.active_load != active_count)
+            .values(active_load=active_count)
+            .execution_options(synchronize_session=False)
+        )
+        read_cache.invalidate_masters(self.db)
+        return result.rowcount
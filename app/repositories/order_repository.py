@@ -1,8 +1,38 @@
-from typing import List, Optional
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select, tuple_, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.models.order import Order, OrderStatus
+from app.models.adl_media import ADLMedia
+from app.models.master import MASTER_VIEW_COLUMNS, Master, master_view
+from app.models.order import (
+    ORDER_VIEW_COLUMNS,
+    Order,
+    OrderStatus,
+    active_load_holder,
+    adjust_active_load,
+    order_view,
+)
+from app.repositories import master_index, read_cache
+from app.repositories.adl_repository import ADLRepository
+from app.repositories.filters import bounding_box_conditions
+
+
+class OrderFilters(NamedTuple):
+    """Filters of an order listing; None means no restriction"""
+
+    status: Optional[OrderStatus] = None
+    master_id: Optional[int] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    # Bounding box; min_lng > max_lng selects a box crossing the antimeridian
+    min_lat: Optional[float] = None
+    max_lat: Optional[float] = None
+    min_lng: Optional[float] = None
+    max_lng: Optional[float] = None
 
 
 class OrderRepository:
@@ -17,30 +47,280 @@ class OrderRepository:
         """Get order by ID"""
         return self.db.query(Order).filter(Order.id == order_id).first()
 
+    def get_with_relations(self, order_id: int) -> Optional[Order]:
+        """
+        Get order by ID with its master (joined into the same SELECT) and ADL media
+        (one selectin query) loaded, so to_dict_with_relations() needs no lazy loads
+        """
+        return self.db.scalars(self._with_relations().where(Order.id == order_id)).first()
+
+    def get_view_with_relations(self, order_id: int) -> Optional[Dict]:
+        """
+        Get order by ID as the to_dict_with_relations() response dict
+
+        Read-only: one SELECT of the order and master columns (outer join) and one
+        of the ADL media columns, turned into dicts without ORM objects.
+        """
+        columns = len(ORDER_VIEW_COLUMNS)
+        query = (
+            select(*ORDER_VIEW_COLUMNS, *MASTER_VIEW_COLUMNS)
+            .outerjoin(Master, Master.id == Order.assigned_master_id)
+            .where(Order.id == order_id)
+        )
+        row = self.db.execute(query).first()
+        if row is None:
+            return None
+        result = order_view(row[:columns])
+        if row[columns] is not None:
+            result["assignedMaster"] = master_view(row[columns:])
+        adl_media = ADLRepository(self.db).get_views_by_order_id(order_id)
+        if adl_media:
+            result["adlMedia"] = adl_media
+        return result
+
+    def get_version_key(self, order_id: int) -> Optional[Tuple]:
+        """
+        Get what the get_view_with_relations() response of an order is derived from,
+        with one SELECT and no relations loaded: the order's updated_at, its master's
+        id and version, and the count and highest id of its ADL media (attaching
+        media does not touch the order row). None if the order does not exist.
+        """
+        media_count = select(func.count(ADLMedia.id)).where(ADLMedia.order_id == Order.id)
+        last_media_id = select(func.max(ADLMedia.id)).where(ADLMedia.order_id == Order.id)
+        query = (
+            select(
+                Order.updated_at,
+                Master.id,
+                Master.version,
+                media_count.scalar_subquery(),
+                last_media_id.scalar_subquery(),
+            )
+            .outerjoin(Master, Master.id == Order.assigned_master_id)
+            .where(Order.id == order_id)
+        )
+        row = self.db.execute(query).first()
+        return tuple(row) if row else None
+
+    def get_many_with_relations(self, order_ids: Iterable[int]) -> List[Order]:
+        """Get orders by IDs with their masters and ADL media loaded, like get_with_relations"""
+        return list(self.db.scalars(self._with_relations().where(Order.id.in_(list(order_ids)))))
+
+    @staticmethod
+    def _with_relations():
+        return select(Order).options(
+            joinedload(Order.assigned_master), selectinload(Order.adl_media)
+        )
+
+    def load_assigned_masters(self, orders: List[Order]) -> None:
+        """
+        Load the masters of orders (e.g. just assigned ones) with one IN query and set
+        them as the orders' assigned_master, so rendering the orders needs no lazy loads
+        """
+        master_ids = {order.assigned_master_id for order in orders} - {None}
+        masters = {}
+        if master_ids:
+            query = select(Master).where(Master.id.in_(master_ids))
+            masters = {master.id: master for master in self.db.scalars(query)}
+        for order in orders:
+            set_committed_value(order, "assigned_master", masters.get(order.assigned_master_id))
+
+    def get_by_ids(self, order_ids: Iterable[int]) -> List[Order]:
+        """Get orders by IDs"""
+        return self.db.query(Order).filter(Order.id.in_(list(order_ids))).all()
+
+    def list_page(
+        self, filters: OrderFilters, after: Optional[Tuple[datetime, int]], limit: int
+    ) -> List[Dict]:
+        """
+        Get up to limit orders matching the filters, ordered by (created_at, id), as
+        to_dict() response dicts (read-only, selected as columns without ORM objects)
+
+        Keyset pagination: with after, only orders sorting after that
+        (created_at, id) key are returned, so every page costs the same.
+        """
+        query = select(*ORDER_VIEW_COLUMNS).where(*self._filter_conditions(filters))
+        if after is not None:
+            query = query.where(tuple_(Order.created_at, Order.id) > tuple_(*after))
+        rows = self.db.execute(query.order_by(Order.created_at, Order.id).limit(limit))
+        return [order_view(row) for row in rows]
+
+    @staticmethod
+    def _filter_conditions(filters: OrderFilters) -> list:
+        conditions = []
+        if filters.status is not None:
+            conditions.append(Order.status == filters.status)
+        if filters.master_id is not None:
+            conditions.append(Order.assigned_master_id == filters.master_id)
+        if filters.created_from is not None:
+            conditions.append(Order.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            conditions.append(Order.created_at < filters.created_to)
+        return conditions + bounding_box_conditions(filters, Order.geo_lat, Order.geo_lng)
+
+    def get_existing_ids(self, order_ids: Iterable[int]) -> Set[int]:
+        """Get which of the given order IDs exist, with one IN query"""
+        order_ids = list(order_ids)
+        if not order_ids:
+            return set()
+        return set(self.db.scalars(select(Order.id).where(Order.id.in_(order_ids))))
+
+    def get_unassigned(self, limit: int) -> List[Order]:
+        """Get the oldest NEW orders without a master"""
+        return (
+            self.db.query(Order)
+            .filter(Order.status == OrderStatus.NEW, Order.assigned_master_id.is_(None))
+            .order_by(Order.created_at, Order.id)
+            .limit(limit)
+            .all()
+        )
+
     def create(self, order_data: dict) -> Order:
         """Create new order"""
         order = Order(**order_data)
         self.db.add(order)
-        self.db.commit()
-        self.db.refresh(order)
+        self.db.flush()
+        read_cache.invalidate_orders(self.db, [order.id])
+        read_cache.invalidate_masters(self.db, [order.assigned_master_id])
         return order
 
+    def create_many(self, orders_data: List[dict]) -> List[int]:
+        """
+        Insert many new orders with one executemany (multi-row VALUES ... RETURNING)
+
+        Returns the new order IDs in input order. The orders are not loaded into the session.
+        """
+        # RETURNING rows come back unordered, but IDs are handed out in VALUES order.
+        # (Requesting sort_by_parameter_order would make SQLite insert row by row.)
+        order_ids = sorted(self.db.scalars(insert(Order).returning(Order.id), orders_data))
+        read_cache.invalidate_orders(self.db, order_ids)
+        return order_ids
+
     def update(self, order_id: int, order_data: dict) -> Optional[Order]:
         """Update order"""
         order = self.get_by_id(order_id)
         if order:
+            # The old and new master's active_load may change along with the order
+            masters = [order.assigned_master_id]
             for key, value in order_data.items():
                 setattr(order, key, value)
-            self.db.commit()
-            self.db.refresh(order)
+            self.db.flush()
+            read_cache.invalidate_orders(self.db, [order_id])
+            read_cache.invalidate_masters(self.db, masters + [order.assigned_master_id])
+        return order
+
+    def _compare_and_set(self, order_id: int, conditions: list, values: dict) -> Optional[Order]:
+        """
+        Update an order only if `conditions` still hold, as a single UPDATE ... RETURNING
+
+        Returns the updated order, or None if it does not exist or no longer matches.
+        """
+        statement = (
+            update(Order)
+            .where(Order.id == order_id, *conditions)
+            .values(**values)
+            .returning(Order)
+            .execution_options(synchronize_session="fetch")
+        )
+        order = self.db.scalars(statement).one_or_none()
+        if order is not None:
+            read_cache.invalidate_orders(self.db, [order_id])
+        if order is not None and "assigned_master_id" in values:
+            # RETURNING refreshes the columns only; a loaded assigned_master is now stale
+            self.db.expire(order, ["assigned_master"])
         return order
 
     def assign_master(self, order_id: int, master_id: int) -> Optional[Order]:
-        """Assign master to order"""
-        return self.update(
-            order_id, {"assigned_master_id": master_id, "status": OrderStatus.ASSIGNED}
+        """
+        Assign master to a NEW, unassigned order atomically
+
+        Returns None if the order is missing or was assigned/changed concurrently.
+        """
+        order = self._compare_and_set(
+            order_id,
+            [Order.assigned_master_id.is_(None), Order.status == OrderStatus.NEW],
+            {"assigned_master_id": master_id, "status": OrderStatus.ASSIGNED},
+        )
+        if order is not None:
+            self._adjust_active_load(master_id, 1)
+        return order
+
+    def assign_masters(self, assignments: List[Tuple[Order, int]]) -> Tuple[List[Order], List[int]]:
+        """
+        Assign masters to several orders in the current transaction
+
+        Each order is claimed with its own compare-and-set. Returns the assigned
+        orders and the IDs of orders that were assigned/changed concurrently.
+        """
+        assigned = []
+        conflicts = []
+        new_load = Counter()
+        for order, master_id in assignments:
+            updated = self._compare_and_set(
+                order.id,
+                [Order.assigned_master_id.is_(None), Order.status == OrderStatus.NEW],
+                {"assigned_master_id": master_id, "status": OrderStatus.ASSIGNED},
+            )
+            if updated is None:
+                conflicts.append(order.id)
+            else:
+                assigned.append(updated)
+                new_load[master_id] += 1
+
+        for master_id, count in new_load.items():
+            self._adjust_active_load(master_id, count)
+        return assigned, conflicts
+
+    def update_status(
+        self,
+        order_id: int,
+        status: OrderStatus,
+        expected_status: Optional[OrderStatus] = None,
+        conditions: Sequence = (),
+    ) -> Optional[Order]:
+        """
+        Update order status
+
+        With expected_status the change is a compare-and-set: it only applies if the
+        order is still in expected_status (and meets the extra conditions), and None
+        is returned otherwise.
+        """
+        if expected_status is None:
+            return self.update(order_id, {"status": status})
+
+        order = self._compare_and_set(
+            order_id, [Order.status == expected_status, *conditions], {"status": status}
+        )
+        if order is not None:
+            old_holder = active_load_holder(order.assigned_master_id, expected_status)
+            new_holder = active_load_holder(order.assigned_master_id, status)
+            if old_holder != new_holder:
+                if old_holder is not None:
+                    self._adjust_active_load(old_holder, -1)
+                if new_holder is not None:
+                    self._adjust_active_load(new_holder, 1)
+        return order
+
+    def complete_with_valid_adl(
+        self, order_id: int, expected_status: OrderStatus
+    ) -> Optional[Order]:
+        """
+        Mark an order COMPLETED if it is still in expected_status and has a valid ADL
+
+        The ADL check is an EXISTS inside the status UPDATE, so both happen in one
+        statement. Returns None if the order changed or has no valid ADL.
+        """
+        return self.update_status(
+            order_id,
+            OrderStatus.COMPLETED,
+            expected_status=expected_status,
+            conditions=[ADLRepository.valid_adl_exists(Order.id)],
         )
 
-    def update_status(self, order_id: int, status: OrderStatus) -> Optional[Order]:
-        """Update order status"""
-        return self.update(order_id, {"status": status})
+    def _adjust_active_load(self, master_id: int, delta: int) -> None:
+        """
+        Shift a master's active_load after a Core update of its orders, which
+        bypasses the ORM events that normally keep the counter in sync
+        """
+        adjust_active_load(self.db.connection(), master_id, delta)
+        master_index.record_load_change(self.db, master_id, delta)
+        read_cache.invalidate_masters(self.db, [master_id])
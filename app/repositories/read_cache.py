@@ -0,0 +1,166 @@
+"""
+Process-level read cache of master and order response dicts.
+
+MasterService.get_master_by_id (when the master registry is disabled) and
+OrderService.get_order_if_changed keep their results in an LRUCache per kind,
+keyed by database and ID and bounded by NEXA_READ_CACHE_MAX_ENTRIES and
+NEXA_READ_CACHE_TTL_S. Orders are cached with the ETag they were read under
+and only served for that ETag. The repository write methods report the rows they
+change with invalidate_masters() / invalidate_orders(); like the master
+registry's pending changes, the entries are dropped when the transaction
+commits, and forgotten on rollback.
+
+Only writes made through the repositories of this process invalidate
+entries, so the cache is opt-in (NEXA_READ_CACHE_ENABLED) and suits a single
+worker process; the TTL bounds how long any other change stays hidden.
+
+Two rules keep stale values out:
+- a read fills the cache only if nothing was invalidated since its
+  transaction began, so a row read from a snapshot older than a commit is
+  never stored
+- a session with uncommitted invalidations neither reads nor fills the cache
+"""
+import threading
+from typing import Any, Dict, Hashable, Iterable, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.adl_media import ADLMedia
+from app.models.master import Master
+from app.models.order import Order
+from app.repositories.master_index import database_of
+from app.settings import settings
+from app.utils.lru_cache import LRUCache
+
+MASTERS = "masters"
+ORDERS = "orders"
+
+_PENDING_KEY = "read_cache_pending"
+_GENERATION_KEY = "read_cache_generation"
+
+_lock = threading.Lock()
+_caches: Dict[str, LRUCache] = {}
+# Bumped by every applied invalidation; see the module docstring
+_generation = 0
+
+
+class _PendingInvalidations:
+    """Cache entries made stale inside a transaction, dropped on commit"""
+
+    def __init__(self):
+        self.keys: Dict[str, Set[int]] = {MASTERS: set(), ORDERS: set()}
+        self.clear: Set[str] = set()
+
+
+def enabled() -> bool:
+    return settings.read_cache_enabled
+
+
+def _cache(kind: str) -> LRUCache:
+    with _lock:
+        cache = _caches.get(kind)
+        if cache is None:
+            cache = LRUCache(settings.read_cache_max_entries, settings.read_cache_ttl_s)
+            _caches[kind] = cache
+        return cache
+
+
+def _pending(db: Session) -> _PendingInvalidations:
+    return db.info.setdefault(_PENDING_KEY, _PendingInvalidations())
+
+
+def get(db: Session, kind: str, key: int) -> Optional[Any]:
+    """Return the cached value of a master or order, or None"""
+    if not enabled() or _PENDING_KEY in db.info:
+        return None
+    return _cache(kind).get((database_of(db.get_bind()), key))
+
+
+def put(db: Session, kind: str, key: int, value: Any) -> None:
+    """Cache a value the session just read, unless the rules above forbid it"""
+    if not enabled() or _PENDING_KEY in db.info:
+        return
+    cache = _cache(kind)
+    database = database_of(db.get_bind())
+    with _lock:
+        if db.info.get(_GENERATION_KEY) != _generation:
+            return
+        cache.put((database, key), value)
+
+
+def invalidate_masters(db: Session, master_ids: Iterable[Optional[int]] = None) -> None:
+    """
+    Drop the given masters (all masters if master_ids is None) when the session commits.
+    Orders render their master, so edits of master fields also call invalidate_orders().
+    """
+    if not enabled():
+        return
+    pending = _pending(db)
+    if master_ids is None:
+        pending.clear.add(MASTERS)
+    else:
+        pending.keys[MASTERS].update(master_id for master_id in master_ids if master_id)
+
+
+def invalidate_orders(db: Session, order_ids: Iterable[int] = None) -> None:
+    """Drop the given orders (all orders if order_ids is None) when the session commits"""
+    if not enabled():
+        return
+    pending = _pending(db)
+    if order_ids is None:
+        pending.clear.add(ORDERS)
+    else:
+        pending.keys[ORDERS].update(order_ids)
+
+
+def stats() -> Dict[str, Dict]:
+    """Counters and size of each cache"""
+    return {kind: _cache(kind).stats() for kind in (MASTERS, ORDERS)}
+
+
+def reset() -> None:
+    """Drop both caches and their counters; they are recreated with the current settings"""
+    global _generation
+    with _lock:
+        _caches.clear()
+        _generation += 1
+
+
+def _drop(database: Hashable, pending: _PendingInvalidations) -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        caches = {kind: _caches.get(kind) for kind in (MASTERS, ORDERS)}
+    for kind, cache in caches.items():
+        if cache is None:
+            continue
+        if kind in pending.clear:
+            cache.clear()
+        else:
+            cache.invalidate((database, key) for key in pending.keys[kind])
+
+
+@event.listens_for(Session, "after_begin")
+def _remember_generation(session: Session, transaction, connection) -> None:
+    session.info[_GENERATION_KEY] = _generation
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending is not None:
+        _drop(database_of(session.get_bind()), pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_invalidations(session: Session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+
+
+@event.listens_for(Master.__table__, "after_drop")
+@event.listens_for(Order.__table__, "after_drop")
+@event.listens_for(ADLMedia.__table__, "after_drop")
+def _drop_caches(target, connection, **kw) -> None:
+    reset()
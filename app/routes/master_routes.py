@@ -1,30 +1,76 @@
-from typing import Dict, List
+from typing import Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.controllers.master_controller import MasterController
-from app.database.config import get_db
+from app.database.config import get_async_db
+from app.repositories.master_repository import MasterFilters
+from app.routes.responses import json_response, not_modified
 
 router = APIRouter(prefix="/masters", tags=["Masters"])
 
 
 @router.get("", response_model=List[Dict])
-def get_all_masters(db: Session = Depends(get_db)):
+async def get_all_masters(
+    response: Response,
+    available: Optional[bool] = Query(None, description="Only (un)available masters"),
+    minRating: Optional[float] = Query(None, ge=0, description="Minimum rating"),
+    minLat: Optional[float] = Query(None, ge=-90, le=90),
+    maxLat: Optional[float] = Query(None, ge=-90, le=90),
+    minLng: Optional[float] = Query(None, ge=-180, le=180),
+    maxLng: Optional[float] = Query(None, ge=-180, le=180),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Masters per page"),
+    format: Literal["json", "ndjson"] = Query("json", description="JSON array or NDJSON stream"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    Get all masters with their current load and availability.
+    Get masters with their current load and availability, ordered by id.
 
     Returns:
-    - List of all masters
+    - List of masters matching the optional filters (all masters by default)
     - Each master includes: id, name, rating, isAvailable, geo, currentLoad
     - currentLoad = number of active orders (assigned or in_progress)
+
+    With `limit` the list is one page: when more masters follow, the
+    `X-Next-Cursor` header holds the cursor to pass as `cursor` for the next page.
+
+    With `format=ndjson` every matching master (after `cursor`) is streamed as
+    one JSON object per line while it is fetched; `limit` is ignored.
+
+    JSON responses carry a strong `ETag` of the returned masters (and of whether a
+    next page exists). Send it back as `If-None-Match` to get an empty 304 while
+    they are unchanged; no master is rendered then.
     """
-    return MasterController.get_all_masters(db)
+    filters = MasterFilters(
+        is_available=available,
+        min_rating=minRating,
+        min_lat=minLat,
+        max_lat=maxLat,
+        min_lng=minLng,
+        max_lng=maxLng,
+    )
+    if format == "ndjson":
+        return StreamingResponse(
+            MasterController.stream_masters(filters, cursor, db),
+            media_type="application/x-ndjson",
+        )
+
+    etag, page = await MasterController.list_masters(filters, cursor, limit, if_none_match, db)
+    if page is None:
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    if page["nextCursor"]:
+        response.headers["X-Next-Cursor"] = page["nextCursor"]
+    return json_response(page["masters"], response=response)
 
 
 @router.get("/{master_id}", response_model=Dict)
-def get_master(master_id: int, db: Session = Depends(get_db)):
+async def get_master(master_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get master by ID with current load information.
     """
-    return MasterController.get_master(master_id, db)
+    return json_response(await MasterController.get_master(master_id, db))
@@ -1,17 +1,29 @@
-from typing import Dict
+from datetime import datetime
+from typing import Dict, Literal, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.controllers.order_controller import OrderController
-from app.database.config import get_db
-from app.schemas.order_schemas import CreateOrderRequest
+from app.database.config import async_unit_of_work, get_async_db, get_engine, get_unit_of_work
+from app.models.order import OrderStatus
+from app.repositories.order_repository import OrderFilters
+from app.routes.responses import json_response, not_modified
+from app.schemas.adl_schemas import BulkAttachADLRequest
+from app.schemas.order_schemas import (
+    BatchAssignRequest,
+    BulkCreateOrdersRequest,
+    CreateOrderRequest,
+)
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=Dict)
-def create_order(request: CreateOrderRequest, db: Session = Depends(get_db)):
+async def create_order(request: CreateOrderRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new order.
 
@@ -20,21 +32,161 @@ def create_order(request: CreateOrderRequest, db: Session = Depends(get_db)):
     - **customer**: Customer information (optional)
     - **geo**: Order location with lat/lng (required)
     """
-    return OrderController.create_order(request, db)
+    return json_response(await OrderController.create_order(request, db), status.HTTP_201_CREATED)
+
+
+@router.get("", response_model=Dict)
+async def list_orders(
+    response: Response,
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
+    masterId: Optional[int] = Query(None, description="Only orders assigned to this master"),
+    createdFrom: Optional[datetime] = Query(None, description="Created at or after (ISO)"),
+    createdTo: Optional[datetime] = Query(None, description="Created before (ISO)"),
+    minLat: Optional[float] = Query(None, ge=-90, le=90),
+    maxLat: Optional[float] = Query(None, ge=-90, le=90),
+    minLng: Optional[float] = Query(None, ge=-180, le=180),
+    maxLng: Optional[float] = Query(None, ge=-180, le=180),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
+    limit: int = Query(50, ge=1, le=500, description="Orders per page"),
+    format: Literal["json", "ndjson"] = Query("json", description="json page or NDJSON stream"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    List orders, oldest first, with optional filters.
+
+    - **status**, **masterId**: exact match
+    - **createdFrom** / **createdTo**: created_at range (from inclusive, to exclusive)
+    - **minLat** / **maxLat** / **minLng** / **maxLng**: bounding box (minLng > maxLng
+      selects a box crossing the antimeridian)
+
+    Keyset pagination on (created_at, id): each page returns `nextCursor` (also in
+    the `X-Next-Cursor` header); pass it as `cursor` to get the next page. It is
+    null on the last page.
+
+    With `format=ndjson` every matching order (after `cursor`) is streamed as one
+    JSON object per line while it is fetched, without pagination; `limit` is ignored.
+    """
+    filters = OrderFilters(
+        status=order_status,
+        master_id=masterId,
+        created_from=createdFrom,
+        created_to=createdTo,
+        min_lat=minLat,
+        max_lat=maxLat,
+        min_lng=minLng,
+        max_lng=maxLng,
+    )
+    if format == "ndjson":
+        return StreamingResponse(
+            OrderController.stream_orders(filters, cursor, db), media_type="application/x-ndjson"
+        )
+
+    page = await OrderController.list_orders(filters, cursor, limit, db)
+    if page["nextCursor"]:
+        response.headers["X-Next-Cursor"] = page["nextCursor"]
+    return json_response(page, response=response)
+
+
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=Dict)
+def create_orders_bulk(request: BulkCreateOrdersRequest, db: Session = Depends(get_unit_of_work)):
+    """
+    Create many orders at once.
+
+    - **orders**: Orders to create, each like `POST /orders` (at most 1000)
+    - **autoAssign**: Also assign masters to the new orders (default false)
+    - **maxLoad**: Maximum active orders per master after auto-assignment (default 5)
+
+    Every order is validated before anything is written; the orders are then
+    inserted with one multi-row INSERT and committed in a single transaction.
+    With autoAssign, masters are assigned in the same transaction as by
+    `POST /orders/assign-batch`.
+
+    Returns the created order IDs in request order, plus the assignment result
+    when autoAssign is set.
+    """
+    return json_response(OrderController.create_orders_bulk(request, db), status.HTTP_201_CREATED)
+
+
+@router.post("/adl/bulk", response_model=Dict)
+async def attach_adl_bulk(request: BulkAttachADLRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Attach ADL media to many orders at once, e.g. when a device syncs captures made offline.
+
+    - **items**: ADL media, each like `POST /orders/{order_id}/adl` plus its **orderId** (at most 1000)
+
+    All referenced orders are looked up with one query and every item is validated
+    (order exists, GPS coordinates, timestamp). Valid items are inserted with one
+    statement in a single transaction; invalid items do not block the others.
+
+    Returns per-item results in request order: status 201 with the created ADL, or
+    the error status (404/400) and detail a single attach would have returned.
+    """
+    from app.controllers.adl_controller import ADLController
+
+    return json_response(await ADLController.attach_adl_bulk(request, db))
+
+
+@router.post("/assign-batch", response_model=Dict)
+def assign_masters_batch(request: BatchAssignRequest, db: Session = Depends(get_unit_of_work)):
+    """
+    Assign masters to many orders at once.
+
+    Runs as a plain (threadpool) handler: the assignment solve is CPU-bound.
+
+    - **orderIds**: Orders to assign (optional, defaults to all NEW orders)
+    - **maxLoad**: Maximum active orders per master after assignment (default 5)
+
+    Builds one order x master distance matrix and solves a min-cost assignment
+    (nearest → higher rating → lower load) that respects each master's remaining
+    capacity, then commits every assignment in a single transaction.
+
+    Returns assigned pairs, unassigned orders with a reason, and the solve time (solveMs).
+    """
+    return json_response(OrderController.assign_masters_batch(request, db))
 
 
 @router.get("/{order_id}", response_model=Dict)
-def get_order(order_id: int, db: Session = Depends(get_db)):
+async def get_order(
+    order_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Get order by ID.
 
     Returns full order information including assigned master and ADL media if available.
+
+    The response carries a strong `ETag` that changes with the order, its master and
+    its ADL media. Send it back as `If-None-Match` to get an empty 304 while the
+    order is unchanged; that check runs one query and loads no relations.
     """
-    return OrderController.get_order(order_id, db)
+    etag, order = await OrderController.get_order(order_id, if_none_match, db)
+    if order is None:
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return json_response(order, response=response)
+
+
+@router.get("/{order_id}/candidates", response_model=Dict)
+async def get_order_candidates(
+    order_id: int,
+    k: int = Query(5, ge=1, le=100, description="Number of candidates to return"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Preview the best available masters for an order without assigning one.
+
+    Candidates are ranked like the assignment algorithm (nearest → higher rating →
+    lower load). Each entry is a master with its currentLoad and distanceKm.
+    """
+    return json_response(await OrderController.get_candidates(order_id, k, db))
 
 
 @router.post("/{order_id}/assign", response_model=Dict)
-def assign_master_to_order(order_id: int, db: Session = Depends(get_db)):
+async def assign_master_to_order(
+    order_id: int, request: Request, engine: Engine = Depends(get_engine)
+):
     """
     Assign the best available master to an order.
 
@@ -43,13 +195,25 @@ def assign_master_to_order(order_id: int, db: Session = Depends(get_db)):
     2. Higher rating (if distances are close)
     3. Lower current load (if ratings are close)
 
+    When the assignment dispatcher is enabled (NEXA_ASSIGN_DISPATCHER_ENABLED),
+    concurrent requests are collected into micro-batches that share one master
+    snapshot and one commit; each caller still gets its own result. The dispatcher
+    uses its own sessions, so a request session is only opened without it.
+
     Returns the updated order with assigned master information.
     """
-    return OrderController.assign_master(order_id, db)
+    dispatcher = getattr(request.app.state, "assignment_dispatcher", None)
+    if dispatcher:
+        return json_response(await OrderController.assign_master_dispatched(order_id, dispatcher))
+    async with async_unit_of_work(engine) as db:
+        order = await OrderController.assign_master(order_id, db)
+    return json_response(order)
 
 
 @router.post("/{order_id}/adl", response_model=Dict)
-def attach_adl_to_order(order_id: int, request: Dict, db: Session = Depends(get_db)):
+async def attach_adl_to_order(
+    order_id: int, request: Dict, db: AsyncSession = Depends(get_async_db)
+):
     """
     Attach ADL media to an order.
 
@@ -64,11 +228,11 @@ def attach_adl_to_order(order_id: int, request: Dict, db: Session = Depends(get_
     from app.schemas.adl_schemas import AttachADLRequest
 
     adl_request = AttachADLRequest(**request)
-    return ADLController.attach_adl(order_id, adl_request, db)
+    return json_response(await ADLController.attach_adl(order_id, adl_request, db))
 
 
 @router.post("/{order_id}/complete", response_model=Dict)
-def complete_order(order_id: int, db: Session = Depends(get_db)):
+async def complete_order(order_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Mark an order as completed.
 
@@ -78,4 +242,4 @@ def complete_order(order_id: int, db: Session = Depends(get_db)):
 
     Returns the completed order.
     """
-    return OrderController.complete_order(order_id, db)
+    return json_response(await OrderController.complete_order(order_id, db))
@@ -0,0 +1,28 @@
+from typing import Any, Optional
+
+from fastapi import Response, status
+from fastapi.responses import ORJSONResponse
+
+from app.settings import settings
+
+
+def json_response(content: Any, status_code: int = 200, response: Optional[Response] = None):
+    """
+    Return a handler result as the response body.
+
+    By default the content itself is returned, and FastAPI validates it against the
+    route's response_model and encodes it with jsonable_encoder and json. With
+    NEXA_FAST_JSON_ENABLED the dicts built by the services are rendered straight
+    to bytes by orjson instead; the body is the same JSON. Pass the status code
+    and the injected Response (for headers it carries), which FastAPI only applies
+    to the default path.
+    """
+    if not settings.fast_json_enabled:
+        return content
+    headers = dict(response.headers) if response is not None else None
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response for a conditional GET whose If-None-Match matched etag"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -29,6 +29,46 @@ class AttachADLRequest(BaseModel):
         }
 
 
+class BulkADLItem(BaseModel):
+    orderId: int = Field(..., description="Order the media belongs to")
+    type: MediaTypeEnum = Field(..., description="Type of media (photo or video)")
+    url: str = Field(..., description="URL or path to the media file")
+    # GPS and timestamp are checked per item, so one bad capture does not reject the upload
+    gps: Optional[Dict[str, float]] = Field(
+        None, description="GPS coordinates where media was captured"
+    )
+    capturedAt: Optional[datetime] = Field(
+        None, description="ISO timestamp when media was captured"
+    )
+    meta: Optional[Dict] = Field(None, description="Additional metadata")
+
+
+class BulkAttachADLRequest(BaseModel):
+    items: List[BulkADLItem] = Field(..., min_length=1, description="ADL media to attach")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {
+                        "orderId": 1,
+                        "type": "photo",
+                        "url": "/uploads/order_1_photo1.jpg",
+                        "gps": {"lat": 40.7128, "lng": -74.0060},
+                        "capturedAt": "2025-10-16T14:30:00Z",
+                    },
+                    {
+                        "orderId": 2,
+                        "type": "video",
+                        "url": "/uploads/order_2_video1.mp4",
+                        "gps": {"lat": 40.7589, "lng": -73.9851},
+                        "capturedAt": "2025-10-16T15:05:00Z",
+                    },
+                ]
+            }
+        }
+
+
 class ADLResponse(BaseModel):
     id: int
     orderId: int
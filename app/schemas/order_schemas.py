@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -30,6 +30,36 @@ class CreateOrderRequest(BaseModel):
         }
 
 
+class BulkCreateOrdersRequest(BaseModel):
+    orders: List[CreateOrderRequest] = Field(..., min_length=1, description="Orders to create")
+    autoAssign: bool = Field(False, description="Assign masters to the new orders right away")
+    maxLoad: int = Field(
+        5, ge=1, description="Maximum active orders per master after auto-assignment"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "orders": [
+                    {"title": "Fix plumbing issue", "geo": {"lat": 40.7128, "lng": -74.0060}},
+                    {"title": "Replace socket", "geo": {"lat": 40.7589, "lng": -73.9851}},
+                ],
+                "autoAssign": True,
+                "maxLoad": 5,
+            }
+        }
+
+
+class BatchAssignRequest(BaseModel):
+    orderIds: Optional[List[int]] = Field(
+        None, description="Orders to assign; omit to assign all NEW orders"
+    )
+    maxLoad: int = Field(5, ge=1, description="Maximum active orders per master after assignment")
+
+    class Config:
+        json_schema_extra = {"example": {"orderIds": [1, 2, 3], "maxLoad": 5}}
+
+
 class OrderResponse(BaseModel):
     id: int
     title: str
@@ -1,14 +1,19 @@
 import logging
-from typing import Dict
+from typing import Dict, List, Optional, Set
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+from app.models.adl_media import ADLMedia
 from app.repositories.adl_repository import ADLRepository
 from app.repositories.order_repository import OrderRepository
+from app.services.async_service import AsyncServiceAdapter
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on ADL media items attached by one bulk request
+MAX_BULK_ITEMS = 1000
+
 
 class ADLService:
     def __init__(self, db: Session):
@@ -29,17 +34,10 @@ class ADLService:
         if not order:
             raise HTTPException(status_code=404, detail=f"Order with id '{order_id}' not found")
 
-        # Validate GPS coordinates
-        if adl_data.get("gps_lat") is None or adl_data.get("gps_lng") is None:
-            raise HTTPException(
-                status_code=400, detail="GPS coordinates (gps_lat, gps_lng) are required"
-            )
-
-        # Validate timestamp
-        if adl_data.get("captured_at") is None:
-            raise HTTPException(
-                status_code=400, detail="Timestamp (captured_at) is required in ISO format"
-            )
+        # Validate GPS coordinates and timestamp
+        error = self._validation_error(adl_data)
+        if error:
+            raise error
 
         # Add order_id to adl_data
         adl_data["order_id"] = order_id
@@ -49,3 +47,76 @@ class ADLService:
         logger.info(f"Attached ADL {adl.id} to order {order_id}")
 
         return adl.to_dict()
+
+    def attach_adl_bulk(self, items: List[dict]) -> Dict:
+        """
+        Attach ADL media to many orders at once
+        Every item (with its order_id) is validated like attach_adl_to_order, but
+        all orders are looked up with one IN query and the valid items are inserted
+        with one statement. Returns a result per item, in input order.
+        """
+        if len(items) > MAX_BULK_ITEMS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_BULK_ITEMS} ADL media items can be attached at once",
+            )
+
+        existing_orders = self.order_repository.get_existing_ids(
+            {item["order_id"] for item in items}
+        )
+        results: List[Dict] = [{} for _ in items]
+        valid = []
+        for position, item in enumerate(items):
+            error = self._bulk_item_error(item, existing_orders)
+            if error:
+                results[position] = {
+                    "index": position,
+                    "orderId": item["order_id"],
+                    "status": error.status_code,
+                    "detail": error.detail,
+                }
+            else:
+                valid.append((position, item))
+
+        adl_ids = self.repository.create_many([item for _, item in valid])
+        for (position, item), adl_id in zip(valid, adl_ids):
+            results[position] = {
+                "index": position,
+                "orderId": item["order_id"],
+                "status": 201,
+                "adl": ADLMedia(id=adl_id, **item).to_dict(),
+            }
+        logger.info(f"Bulk attached {len(adl_ids)} of {len(items)} ADL media items")
+
+        return {"attached": len(adl_ids), "failed": len(items) - len(adl_ids), "results": results}
+
+    def _bulk_item_error(self, item: dict, existing_orders: Set[int]) -> Optional[HTTPException]:
+        order_id = item["order_id"]
+        if order_id not in existing_orders:
+            return HTTPException(status_code=404, detail=f"Order with id '{order_id}' not found")
+        return self._validation_error(item)
+
+    @staticmethod
+    def _validation_error(adl_data: dict) -> Optional[HTTPException]:
+        """Return the error that makes ADL media data invalid, if any"""
+        if adl_data.get("gps_lat") is None or adl_data.get("gps_lng") is None:
+            return HTTPException(
+                status_code=400, detail="GPS coordinates (gps_lat, gps_lng) are required"
+            )
+        if adl_data.get("captured_at") is None:
+            return HTTPException(
+                status_code=400, detail="Timestamp (captured_at) is required in ISO format"
+            )
+        return None
+
+
+class AsyncADLService(AsyncServiceAdapter):
+    """Async counterpart of ADLService"""
+
+    service_class = ADLService
+
+    async def attach_adl_to_order(self, order_id: int, adl_data: dict) -> Dict:
+        return await self._call(ADLService.attach_adl_to_order, order_id, adl_data)
+
+    async def attach_adl_bulk(self, items: List[dict]) -> Dict:
+        return await self._call(ADLService.attach_adl_bulk, items)
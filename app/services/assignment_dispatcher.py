@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.services.order_service import OrderService
+
+logger = logging.getLogger(__name__)
+
+
+class AssignmentDispatcher:
+    """
+    Micro-batching front end for master assignment.
+
+    Concurrent assign requests are queued and drained together: the first
+    request opens a batch that collects further requests for up to
+    flush_interval_ms (or until max_batch_size is reached). The batch is then
+    assigned with one master snapshot, one distance computation and one
+    commit, and each waiting caller receives its own result or error.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval_ms: float = 5.0,
+        max_batch_size: int = 64,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        """Start draining the queue on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"Assignment dispatcher started (flush={self.flush_interval * 1000:.1f}ms, "
+            f"max_batch={self.max_batch_size})"
+        )
+
+    async def stop(self) -> None:
+        """Stop the worker and fail any requests still waiting in the queue"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Assignment dispatcher stopped"))
+        logger.info("Assignment dispatcher stopped")
+
+    async def submit(self, order_id: int) -> Dict:
+        """Queue an assignment and wait for its result"""
+        if not self.running:
+            raise RuntimeError("Assignment dispatcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((order_id, future))
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            await self._dispatch(batch)
+
+    async def _collect_batch(self) -> List[Tuple[int, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _dispatch(self, batch: List[Tuple[int, asyncio.Future]]) -> None:
+        order_ids = [order_id for order_id, _ in batch]
+        try:
+            results = await run_in_threadpool(self._assign, order_ids)
+        except Exception as e:
+            logger.error(f"Assignment batch of {len(batch)} orders failed: {e}")
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # Caller went away (e.g. client disconnected)
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _assign(self, order_ids: List[int]) -> List[object]:
+        db = self.session_factory()
+        try:
+            results = OrderService(db).assign_masters_in_arrival_order(order_ids)
+            # One commit for the whole micro-batch
+            db.commit()
+            return results
+        finally:
+            db.close()
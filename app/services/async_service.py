@@ -0,0 +1,28 @@
+from typing import Any, Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+
+class AsyncServiceAdapter:
+    """
+    Base for the async counterparts of the services.
+
+    The sync service, and the repositories behind it, run unchanged on the
+    AsyncSession's sync facade (AsyncSession.run_sync). That code runs on the
+    event loop thread, and its SQL goes through the asyncio driver, so while a
+    query waits on the database the event loop serves other requests instead
+    of a threadpool worker being blocked. Its CPU-bound steps (candidate
+    ranking, the assignment solve) go through run_cpu_bound(), which moves them
+    to a worker thread rather than stalling the loop.
+    """
+
+    service_class: type
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _call(self, method: Callable[..., T], *args: Any) -> T:
+        """Run an unbound service method with a service built on the sync session"""
+        return await self.db.run_sync(lambda session: method(self.service_class(session), *args))
@@ -1,13 +1,41 @@
+import heapq
 import logging
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.repositories.master_repository import MasterRepository
-from app.utils.distance import haversine_distance
+from app.models.master import Master
+from app.repositories import read_cache
+from app.repositories.master_repository import MasterFilters, MasterRepository
+from app.services.async_service import AsyncServiceAdapter
+from app.settings import settings
+from app.utils.assignment import solve_min_cost_assignment
+from app.utils.concurrency import run_cpu_bound
+from app.utils.distance import haversine_distance_matrix, haversine_distances
+from app.utils.etag import etag_matches, make_etag
+from app.utils.master_registry import MasterColumns, MasterRecord
+from app.utils.pagination import decode_id_cursor, encode_id_cursor
 
 logger = logging.getLogger(__name__)
 
+# Number of nearest masters fetched from the spatial index per assignment
+CANDIDATE_POOL_SIZE = 8
+
+# Search radii tried in turn by the bounding-box candidate query
+SEARCH_RADII_KM = (2.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0)
+
+# Batch assignment cost = distance_km - RATING_WEIGHT * rating + LOAD_WEIGHT * load.
+# The weights are small enough to only separate (near-)equal distances, mirroring
+# the nearest → higher rating → lower load order of find_best_master.
+RATING_WEIGHT = 1e-3
+LOAD_WEIGHT = 1e-6
+
+# Masters fetched per page (and per short session) when streaming a listing
+STREAM_PAGE_SIZE = 500
+
 
 class MasterService:
     def __init__(self, db: Session):
@@ -16,21 +44,105 @@ class MasterService:
 
     def get_all_masters(self) -> List[Dict]:
         """Get all masters with their current load"""
-        masters = self.repository.get_all()
-        result = []
-        for master in masters:
-            master_dict = master.to_dict()
-            master_dict["currentLoad"] = self.repository.get_master_order_count(master.id)
-            result.append(master_dict)
-        return result
+        if settings.master_registry_enabled:
+            return self.repository.get_columns().to_dicts()
+
+        return self.repository.list_page(MasterFilters(), None, None)
+
+    def list_masters(
+        self, filters: MasterFilters, cursor: Optional[str], limit: Optional[int]
+    ) -> Dict:
+        """
+        Get one page of masters matching the filters, by id
+        nextCursor is None on the last page; limit=None returns every match as one page
+        """
+        after_id = self.decode_cursor(cursor)
+        fetch = None if limit is None else limit + 1
+        if settings.master_registry_enabled:
+            masters = self._registry_columns(filters, after_id, fetch).to_dicts()
+        else:
+            masters = self.repository.list_page(filters, after_id, fetch)
+        return self._page(masters, limit)
+
+    def list_masters_if_changed(
+        self,
+        filters: MasterFilters,
+        cursor: Optional[str],
+        limit: Optional[int],
+        if_none_match: Optional[str],
+    ) -> Tuple[str, Optional[Dict]]:
+        """
+        Conditional list_masters(): returns the page's ETag, and the page unless
+        if_none_match matches that ETag (None then)
+
+        The ETag is hashed from the limit and the (id, version) pairs of the page's
+        rows plus the one that decides nextCursor, read with one query before any
+        master is rendered. Versions live in the masters table, so every process
+        derives the same ETag. The page is then read with SQL in the same
+        transaction, even with the registry on, so the body always matches its tag:
+        the registry may lag writes of other processes.
+        """
+        after_id = self.decode_cursor(cursor)
+        fetch = None if limit is None else limit + 1
+        etag = make_etag(limit, *self.repository.list_versions(filters, after_id, fetch))
+        if etag_matches(if_none_match, etag):
+            return etag, None
+        return etag, self._page(self.repository.list_page(filters, after_id, fetch), limit)
+
+    @staticmethod
+    def _page(masters: List[Dict], limit: Optional[int]) -> Dict:
+        next_cursor = None
+        if limit is not None and len(masters) > limit:
+            masters = masters[:limit]
+            next_cursor = encode_id_cursor(masters[-1]["id"])
+        return {"masters": masters, "nextCursor": next_cursor}
+
+    @staticmethod
+    def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+        if cursor is None:
+            return None
+        try:
+            return decode_id_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'")
+
+    def _registry_columns(
+        self, filters: MasterFilters, after_id: Optional[int], limit: Optional[int]
+    ) -> MasterColumns:
+        """Filter the registry columns (ordered by id) down to one page of them"""
+        columns = self.repository.get_columns(available_only=filters.is_available is True)
+        rows = columns.in_bounding_box(
+            filters.min_lat, filters.max_lat, filters.min_lng, filters.max_lng
+        )
+        if filters.is_available is False:
+            rows &= ~columns.available
+        if filters.min_rating is not None:
+            rows &= columns.ratings >= filters.min_rating
+        if after_id is not None:
+            rows &= columns.ids > after_id
+        return columns.take(np.flatnonzero(rows)[:limit])
+
+    @staticmethod
+    def _master_dict(master) -> Dict:
+        master_dict = master.to_dict()
+        master_dict["currentLoad"] = master.active_load
+        return master_dict
 
     def get_master_by_id(self, master_id: int) -> Optional[Dict]:
-        """Get master by ID"""
-        master = self.repository.get_by_id(master_id)
-        if master:
-            master_dict = master.to_dict()
-            master_dict["currentLoad"] = self.repository.get_master_order_count(master.id)
-            return master_dict
+        """
+        Get master by ID
+        Without the registry, served from the read cache when NEXA_READ_CACHE_ENABLED is set
+        """
+        if not settings.master_registry_enabled:
+            master = read_cache.get(self.db, read_cache.MASTERS, master_id)
+            if master is None:
+                master = self.repository.get_view(master_id)
+                if master is not None:
+                    read_cache.put(self.db, read_cache.MASTERS, master_id, master)
+            return master
+        records = self.repository.get_records([master_id])
+        if records:
+            return self._master_dict(records[0])
         return None
 
     def find_best_master(self, order_lat: float, order_lng: float) -> Optional[int]:
@@ -42,17 +154,52 @@ class MasterService:
 
         Returns master_id or None if no available master found
         """
-        available_masters = self.repository.get_available_masters()
+        ranked = self.rank_candidates(order_lat, order_lng, 1)
 
-        if not available_masters:
+        if not ranked:
             logger.warning("No available masters found")
             return None
 
+        best = ranked[0]
+        best_master = best["master"]
+        logger.info(
+            f"Selected master {best_master.id} ({best_master.name}) "
+            f"with distance={best['distance']:.2f}km, "
+            f"rating={best_master.rating}, load={best['load']}"
+        )
+
+        return best_master.id
+
+    def rank_candidates(self, order_lat: float, order_lng: float, k: int) -> List[Dict]:
+        """
+        Get the top k available masters for an order, best first
+        (nearest → higher rating → lower load).
+
+        Each entry holds the master, its distance, rating and load. Uses heap
+        selection, so ranking N candidates costs O(N log k) instead of a full sort.
+        """
+        available_masters = self._candidate_masters(order_lat, order_lng, k)
+        if not available_masters:
+            return []
+        return run_cpu_bound(self._rank, order_lat, order_lng, available_masters, k)
+
+    @staticmethod
+    def _rank(
+        order_lat: float,
+        order_lng: float,
+        available_masters: List[Union[Master, MasterRecord]],
+        k: int,
+    ) -> List[Dict]:
         # Calculate distance and load for each master
+        distances = haversine_distances(
+            order_lat,
+            order_lng,
+            [master.geo_lat for master in available_masters],
+            [master.geo_lng for master in available_masters],
+        )
         master_candidates = []
-        for master in available_masters:
-            distance = haversine_distance(order_lat, order_lng, master.geo_lat, master.geo_lng)
-            current_load = self.repository.get_master_order_count(master.id)
+        for master, distance in zip(available_masters, distances.tolist()):
+            current_load = master.active_load
 
             master_candidates.append(
                 {
@@ -68,15 +215,219 @@ class MasterService:
                 f"distance={distance:.2f}km, rating={master.rating}, load={current_load}"
             )
 
-        # Sort by: distance (ascending), then rating (descending), then load (ascending)
+        # Order by: distance (ascending), then rating (descending), then load (ascending)
         # This ensures: nearest → higher rating → lower load
-        master_candidates.sort(key=lambda x: (x["distance"], -x["rating"], x["load"]))
+        return heapq.nsmallest(
+            k, master_candidates, key=lambda x: (x["distance"], -x["rating"], x["load"])
+        )
 
-        best_master = master_candidates[0]["master"]
-        logger.info(
-            f"Selected master {best_master.id} ({best_master.name}) "
-            f"with distance={master_candidates[0]['distance']:.2f}km, "
-            f"rating={best_master.rating}, load={master_candidates[0]['load']}"
+    def _candidate_masters(
+        self, order_lat: float, order_lng: float, k: int = 1
+    ) -> List[Union[Master, MasterRecord]]:
+        """
+        Get a set of available masters guaranteed to contain the top k: the k
+        nearest plus every master tied with the k-th nearest
+        """
+        if settings.master_registry_enabled:
+            return self.repository.get_records(self._nearest_available_ids(order_lat, order_lng, k))
+        return self._masters_within_widening_radius(order_lat, order_lng, k)
+
+    def _masters_within_widening_radius(
+        self, order_lat: float, order_lng: float, k: int = 1
+    ) -> List[Master]:
+        """
+        Get available masters from bounding-box queries of growing radius.
+
+        Stops at the first radius whose circle contains k masters: the k
+        nearest masters, and any master tied with the k-th, are then inside the box.
+        """
+        for radius_km in SEARCH_RADII_KM:
+            masters = self.repository.get_available_masters_near(order_lat, order_lng, radius_km)
+            if len(masters) < k:
+                continue
+            distances = haversine_distances(
+                order_lat,
+                order_lng,
+                [master.geo_lat for master in masters],
+                [master.geo_lng for master in masters],
+            )
+            if np.count_nonzero(distances <= radius_km) >= k:
+                return masters
+        return self.repository.get_available_masters()
+
+    def _nearest_available_ids(self, order_lat: float, order_lng: float, k: int) -> List[int]:
+        """
+        Get IDs of the nearest available masters from the spatial index.
+
+        The pool is widened until it holds every master tied with the k-th
+        smallest distance, so the rating and load tie-breaks still see all contenders.
+        """
+        pool_size = max(k, CANDIDATE_POOL_SIZE)
+        while True:
+            nearest = self.repository.get_nearest_available(order_lat, order_lng, pool_size)
+            if len(nearest) < pool_size or nearest[-1][0] > nearest[k - 1][0]:
+                break
+            pool_size *= 2
+        return [master_id for _, master_id in nearest]
+
+    def pick_best_masters(
+        self, order_points: Sequence[Tuple[float, float]]
+    ) -> List[Optional[Tuple[int, float]]]:
+        """
+        Pick the best master for each order point in turn, as find_best_master would
+        if the orders were assigned one after another.
+
+        All points share one snapshot of candidate masters and one distance
+        matrix; loads taken by earlier points count against later ones.
+
+        Returns, per order point, (master_id, distance_km) or None if no master is available.
+        """
+        if not order_points:
+            return []
+
+        if settings.master_registry_enabled:
+            candidate_ids = set()
+            for lat, lng in order_points:
+                candidate_ids.update(self._nearest_available_ids(lat, lng, 1))
+            masters = self.repository.get_records(sorted(candidate_ids))
+        else:
+            masters = self.repository.get_available_masters()
+        if not masters:
+            return [None] * len(order_points)
+        return run_cpu_bound(self._pick_in_turn, order_points, masters)
+
+    @staticmethod
+    def _pick_in_turn(
+        order_points: Sequence[Tuple[float, float]],
+        masters: List[Union[Master, MasterRecord]],
+    ) -> List[Optional[Tuple[int, float]]]:
+        distances = haversine_distance_matrix(
+            [lat for lat, _ in order_points],
+            [lng for _, lng in order_points],
+            [master.geo_lat for master in masters],
+            [master.geo_lng for master in masters],
+        ).tolist()
+        loads = [master.active_load for master in masters]
+
+        picks: List[Optional[Tuple[int, float]]] = []
+        for row in distances:
+            # nearest → higher rating → lower load, with in-batch load included
+            best = min(range(len(masters)), key=lambda j: (row[j], -masters[j].rating, loads[j]))
+            loads[best] += 1
+            picks.append((masters[best].id, row[best]))
+        return picks
+
+    def plan_assignments(
+        self, order_points: Sequence[Tuple[float, float]], max_load: int
+    ) -> List[Optional[Tuple[int, float]]]:
+        """
+        Jointly assign a batch of orders to available masters.
+
+        Builds one order x master distance matrix and solves a min-cost
+        assignment in which each master can take at most
+        max_load - active_load more orders.
+
+        Returns, per order point, (master_id, distance_km) or None when the
+        masters ran out of capacity.
+        """
+        n_orders = len(order_points)
+        masters = self._available_columns()
+        masters = masters.take(masters.loads < max_load)
+        if n_orders == 0 or not len(masters):
+            return [None] * n_orders
+        return run_cpu_bound(self._solve_plan, order_points, masters, max_load)
+
+    @staticmethod
+    def _solve_plan(
+        order_points: Sequence[Tuple[float, float]], masters: MasterColumns, max_load: int
+    ) -> List[Optional[Tuple[int, float]]]:
+        n_orders = len(order_points)
+        distances = haversine_distance_matrix(
+            [lat for lat, _ in order_points],
+            [lng for _, lng in order_points],
+            masters.lats,
+            masters.lngs,
         )
+        loads = masters.loads
+        base_cost = distances - RATING_WEIGHT * masters.ratings + LOAD_WEIGHT * loads
 
-        return best_master.id
+        # An order is never matched outside its n_orders cheapest masters: at most
+        # n_orders - 1 other orders can occupy those, so prune every other column.
+        if len(masters) > n_orders:
+            nearest = np.argpartition(base_cost, n_orders - 1, axis=1)[:, :n_orders]
+            candidates = np.unique(nearest)
+        else:
+            candidates = np.arange(len(masters))
+
+        # One column per free slot; each extra slot of a master costs one more unit of load
+        capacities = np.minimum(max_load - loads[candidates], n_orders)
+        slot_master = np.repeat(candidates, capacities)
+        slot_rank = np.concatenate([np.arange(capacity) for capacity in capacities])
+        slot_cost = base_cost[:, slot_master] + LOAD_WEIGHT * slot_rank
+
+        slot_for_order = solve_min_cost_assignment(slot_cost)
+
+        plan: List[Optional[Tuple[int, float]]] = []
+        for order_index, slot in enumerate(slot_for_order.tolist()):
+            if slot < 0:
+                plan.append(None)
+                continue
+            master_index = slot_master[slot]
+            plan.append(
+                (int(masters.ids[master_index]), float(distances[order_index, master_index]))
+            )
+        return plan
+
+    def _available_columns(self) -> MasterColumns:
+        """Get a column snapshot of the available masters"""
+        if settings.master_registry_enabled:
+            return self.repository.get_columns(available_only=True)
+        return MasterColumns.from_masters(self.repository.get_available_masters())
+
+
+class AsyncMasterService(AsyncServiceAdapter):
+    """Async counterpart of MasterService"""
+
+    service_class = MasterService
+
+    async def get_all_masters(self) -> List[Dict]:
+        return await self._call(MasterService.get_all_masters)
+
+    async def get_master_by_id(self, master_id: int) -> Optional[Dict]:
+        return await self._call(MasterService.get_master_by_id, master_id)
+
+    async def list_masters(
+        self, filters: MasterFilters, cursor: Optional[str], limit: Optional[int]
+    ) -> Dict:
+        return await self._call(MasterService.list_masters, filters, cursor, limit)
+
+    async def list_masters_if_changed(
+        self,
+        filters: MasterFilters,
+        cursor: Optional[str],
+        limit: Optional[int],
+        if_none_match: Optional[str],
+    ) -> Tuple[str, Optional[Dict]]:
+        return await self._call(
+            MasterService.list_masters_if_changed, filters, cursor, limit, if_none_match
+        )
+
+    def stream_masters(self, filters: MasterFilters, cursor: Optional[str]) -> AsyncIterator[Dict]:
+        """
+        Iterate over every master matching the filters, by id.
+
+        The cursor is checked right away; masters are then fetched STREAM_PAGE_SIZE
+        at a time, each page in its own short session, like AsyncOrderService.stream_orders.
+        """
+        MasterService.decode_cursor(cursor)
+        return self._stream_pages(filters, cursor)
+
+    async def _stream_pages(self, filters: MasterFilters, cursor: Optional[str]):
+        while True:
+            async with AsyncSession(self.db.bind, autoflush=False) as db:
+                page = await AsyncMasterService(db).list_masters(filters, cursor, STREAM_PAGE_SIZE)
+            for master in page["masters"]:
+                yield master
+            cursor = page["nextCursor"]
+            if cursor is None:
+                return
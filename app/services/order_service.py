@@ -1,16 +1,30 @@
 import logging
-from typing import Dict
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.order import OrderStatus
+from app.repositories import read_cache
 from app.repositories.adl_repository import ADLRepository
-from app.repositories.order_repository import OrderRepository
+from app.repositories.order_repository import OrderFilters, OrderRepository
+from app.services.async_service import AsyncServiceAdapter
 from app.services.master_service import MasterService
+from app.utils.etag import etag_matches, make_etag
+from app.utils.pagination import decode_keyset_cursor, encode_keyset_cursor
+from app.utils.timestamps import parse_timestamp
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on orders created or solved together by the bulk endpoints
+MAX_BATCH_SIZE = 1000
+
+# Orders fetched per query (and per short transaction) when streaming a listing
+STREAM_PAGE_SIZE = 500
+
 
 class OrderService:
     def __init__(self, db: Session):
@@ -25,29 +39,109 @@ class OrderService:
         logger.info(f"Created order {order.id}")
         return order.to_dict()
 
+    def create_orders_bulk(
+        self, orders_data: List[dict], auto_assign: bool = False, max_load: int = 5
+    ) -> Dict:
+        """
+        Create many orders with a single multi-row INSERT
+        With auto_assign, masters are then assigned to them as by assign_masters_batch
+        """
+        if len(orders_data) > MAX_BATCH_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_BATCH_SIZE} orders can be created at once",
+            )
+
+        order_ids = self.repository.create_many(orders_data)
+        logger.info(f"Bulk created {len(order_ids)} orders")
+
+        result = {"orderIds": order_ids}
+        if auto_assign:
+            result["assignment"] = self.assign_masters_batch(order_ids, max_load)
+        return result
+
     def get_order_by_id(self, order_id: int) -> Dict:
-        """Get order by ID with all relations"""
-        order = self.repository.get_by_id(order_id)
+        """
+        Get order by ID with all relations
+        Served from the read cache when NEXA_READ_CACHE_ENABLED is set
+        """
+        return self.get_order_if_changed(order_id, None)[1]
+
+    def get_order_if_changed(
+        self, order_id: int, if_none_match: Optional[str]
+    ) -> Tuple[str, Optional[Dict]]:
+        """
+        Conditional get_order_by_id(): returns the order's ETag, and the order unless
+        if_none_match matches that ETag (None then)
+
+        The ETag is derived from get_version_key(), a single query, so deciding that
+        an order is unchanged loads and renders neither the order nor its relations.
+        The order is then read in the same transaction, or taken from the read cache
+        only if it was cached under the same ETag, so the body always matches its tag.
+        """
+        version_key = self.repository.get_version_key(order_id)
+        if version_key is None:
+            raise HTTPException(status_code=404, detail=f"Order with id '{order_id}' not found")
+        etag = make_etag(*version_key)
+        if etag_matches(if_none_match, etag):
+            return etag, None
+
+        cached = read_cache.get(self.db, read_cache.ORDERS, order_id)
+        if cached is not None and cached[0] == etag:
+            return etag, cached[1]
+        order = self.repository.get_view_with_relations(order_id)
         if not order:
             raise HTTPException(status_code=404, detail=f"Order with id '{order_id}' not found")
-        return order.to_dict_with_relations()
+        read_cache.put(self.db, read_cache.ORDERS, order_id, (etag, order))
+        return etag, order
 
-    def assign_master_to_order(self, order_id: int) -> Dict:
+    def list_orders(self, filters: OrderFilters, cursor: Optional[str], limit: int) -> Dict:
         """
-        Assign the best available master to an order
-        Selection criteria: nearest available → higher rating → lower load
+        Get one page of orders matching the filters, oldest first
+        Pages are keyed on (created_at, id); nextCursor is None on the last page
         """
-        # Get the order
+        orders = self.repository.list_page(filters, self.decode_cursor(cursor), limit + 1)
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            last = orders[-1]
+            next_cursor = encode_keyset_cursor(parse_timestamp(last["createdAt"]), last["id"])
+        return {"orders": orders, "nextCursor": next_cursor}
+
+    @staticmethod
+    def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+        if cursor is None:
+            return None
+        try:
+            return decode_keyset_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor '{cursor}'")
+
+    def get_candidates(self, order_id: int, k: int) -> Dict:
+        """Preview the top k masters for an order without assigning any"""
         order = self.repository.get_by_id(order_id)
         if not order:
             raise HTTPException(status_code=404, detail=f"Order with id '{order_id}' not found")
 
-        # Check if already assigned
-        if order.assigned_master_id:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Order {order_id} is already assigned to master {order.assigned_master_id}",
-            )
+        candidates = []
+        for candidate in self.master_service.rank_candidates(order.geo_lat, order.geo_lng, k):
+            master_dict = candidate["master"].to_dict()
+            master_dict["currentLoad"] = candidate["load"]
+            master_dict["distanceKm"] = candidate["distance"]
+            candidates.append(master_dict)
+
+        return {"orderId": order.id, "candidates": candidates}
+
+    def assign_master_to_order(self, order_id: int) -> Dict:
+        """
+        Assign the best available master to an order
+        Selection criteria: nearest available → higher rating → lower load
+        """
+        # Get the order and check it exists and is not assigned yet
+        order = self.repository.get_with_relations(order_id)
+        error = self._assignment_error(order_id, order)
+        if error:
+            raise error
 
         # Find best master
         best_master_id = self.master_service.find_best_master(order.geo_lat, order.geo_lng)
@@ -55,12 +149,150 @@ class OrderService:
         if not best_master_id:
             raise HTTPException(status_code=400, detail="No available masters found for assignment")
 
-        # Assign master
+        # Assign master; fails if another request claimed the order in the meantime
         updated_order = self.repository.assign_master(order_id, best_master_id)
+        if updated_order is None:
+            raise self._conflict_error(order_id)
         logger.info(f"Assigned master {best_master_id} to order {order_id}")
 
+        self.repository.load_assigned_masters([updated_order])
         return updated_order.to_dict_with_relations()
 
+    def assign_masters_batch(self, order_ids: Optional[List[int]], max_load: int) -> Dict:
+        """
+        Assign masters to many orders at once with a min-cost matching
+        If order_ids is None, the oldest NEW orders (up to MAX_BATCH_SIZE) are used
+        """
+        if order_ids is None:
+            orders = self.repository.get_unassigned(MAX_BATCH_SIZE)
+            unassigned = []
+        else:
+            if len(order_ids) > MAX_BATCH_SIZE:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"At most {MAX_BATCH_SIZE} orders can be assigned at once",
+                )
+            orders, unassigned = self._assignable_orders(order_ids)
+
+        started = time.perf_counter()
+        plan = self.master_service.plan_assignments(
+            [(order.geo_lat, order.geo_lng) for order in orders], max_load
+        )
+        solve_ms = (time.perf_counter() - started) * 1000
+
+        assignments = []
+        assigned = []
+        for order, match in zip(orders, plan):
+            if match is None:
+                unassigned.append({"orderId": order.id, "reason": "no_capacity"})
+                continue
+            master_id, distance = match
+            assignments.append((order, master_id))
+            assigned.append({"orderId": order.id, "masterId": master_id, "distanceKm": distance})
+
+        _, conflicts = self.repository.assign_masters(assignments)
+        if conflicts:
+            conflicted = set(conflicts)
+            assigned = [item for item in assigned if item["orderId"] not in conflicted]
+            unassigned.extend({"orderId": order_id, "reason": "conflict"} for order_id in conflicts)
+        logger.info(
+            f"Batch assigned {len(assigned)} of {len(orders)} orders in {solve_ms:.2f}ms solve time"
+        )
+
+        return {"assigned": assigned, "unassigned": unassigned, "solveMs": round(solve_ms, 3)}
+
+    def assign_masters_in_arrival_order(self, order_ids: List[int]) -> List[object]:
+        """
+        Assign the best master to each order in turn, like repeated calls to
+        assign_master_to_order, but with one master snapshot, one distance
+        computation and one commit for the whole batch.
+
+        Returns, per requested order ID, the assigned order dict or the
+        HTTPException that assign_master_to_order would have raised.
+        """
+        orders = self.repository.get_many_with_relations(order_ids)
+        found = {order.id: order for order in orders}
+        results: List[object] = [None] * len(order_ids)
+        pending = []
+        claimed = set()
+        for position, order_id in enumerate(order_ids):
+            order = found.get(order_id)
+            if order_id in claimed:
+                # Later duplicates lose, as concurrent single requests would
+                error = self._conflict_error(order_id)
+            else:
+                error = self._assignment_error(order_id, order)
+            if error:
+                results[position] = error
+            else:
+                claimed.add(order_id)
+                pending.append((position, order))
+
+        picks = self.master_service.pick_best_masters(
+            [(order.geo_lat, order.geo_lng) for _, order in pending]
+        )
+        assignments = []
+        positions = {}
+        for (position, order), pick in zip(pending, picks):
+            if pick is None:
+                results[position] = HTTPException(
+                    status_code=400, detail="No available masters found for assignment"
+                )
+            else:
+                assignments.append((order, pick[0]))
+                positions[order.id] = position
+
+        assigned, conflicts = self.repository.assign_masters(assignments)
+        self.repository.load_assigned_masters(assigned)
+        for order in assigned:
+            results[positions[order.id]] = order.to_dict_with_relations()
+        for order_id in conflicts:
+            results[positions[order_id]] = self._conflict_error(order_id)
+
+        logger.info(f"Micro-batch assigned {len(assigned)} of {len(order_ids)} requested orders")
+        return results
+
+    @staticmethod
+    def _assignment_error(order_id: int, order) -> Optional[HTTPException]:
+        """Return the error that prevents assigning a master to the order, if any"""
+        if not order:
+            return HTTPException(status_code=404, detail=f"Order with id '{order_id}' not found")
+        if order.assigned_master_id:
+            return HTTPException(
+                status_code=400,
+                detail=f"Order {order_id} is already assigned to master {order.assigned_master_id}",
+            )
+        if order.status != OrderStatus.NEW:
+            return HTTPException(
+                status_code=400,
+                detail=f"Order {order_id} cannot be assigned in status '{order.status.value}'",
+            )
+        return None
+
+    @staticmethod
+    def _conflict_error(order_id: int) -> HTTPException:
+        return HTTPException(
+            status_code=409,
+            detail=f"Order {order_id} was assigned or changed by another request",
+        )
+
+    def _assignable_orders(self, order_ids: List[int]):
+        """Split requested order IDs into assignable orders and rejected entries"""
+        found = {order.id: order for order in self.repository.get_by_ids(order_ids)}
+        orders = []
+        rejected = []
+        for order_id in dict.fromkeys(order_ids):
+            order = found.get(order_id)
+            if order is None:
+                rejected.append({"orderId": order_id, "reason": "not_found"})
+            elif order.assigned_master_id:
+                rejected.append({"orderId": order_id, "reason": "already_assigned"})
+            elif order.status != OrderStatus.NEW:
+                rejected.append({"orderId": order_id, "reason": f"status_{order.status.value}"})
+            else:
+                orders.append(order)
+        return orders, rejected
+
     def complete_order(self, order_id: int) -> Dict:
         """
         Complete an order
@@ -69,7 +301,7 @@ class OrderService:
         - Order must have valid ADL (with GPS and timestamp)
         """
         # Get the order
-        order = self.repository.get_by_id(order_id)
+        order = self.repository.get_with_relations(order_id)
         if not order:
             raise HTTPException(status_code=404, detail=f"Order with id '{order_id}' not found")
 
@@ -77,15 +309,68 @@ class OrderService:
         if order.status == OrderStatus.COMPLETED:
             raise HTTPException(status_code=400, detail="Order is already completed")
 
-        # Validate ADL exists and is valid
-        if not self.adl_repository.has_valid_adl(order_id):
+        # Update status to completed if a valid ADL exists and no other request changed
+        # the order meanwhile; one UPDATE checks both, the reason is looked up on failure
+        updated_order = self.repository.complete_with_valid_adl(order_id, order.status)
+        if updated_order is None:
+            if not self.adl_repository.has_valid_adl(order_id):
+                raise HTTPException(
+                    status_code=400,
+                    detail="Cannot complete order: valid ADL media with GPS coordinates and timestamp is required",
+                )
             raise HTTPException(
-                status_code=400,
-                detail="Cannot complete order: valid ADL media with GPS coordinates and timestamp is required",
+                status_code=409, detail=f"Order {order_id} was changed by another request"
             )
-
-        # Update status to completed
-        updated_order = self.repository.update_status(order_id, OrderStatus.COMPLETED)
         logger.info(f"Completed order {order_id}")
 
         return updated_order.to_dict_with_relations()
+
+
+class AsyncOrderService(AsyncServiceAdapter):
+    """Async counterpart of OrderService"""
+
+    service_class = OrderService
+
+    async def create_order(self, order_data: dict) -> Dict:
+        return await self._call(OrderService.create_order, order_data)
+
+    async def get_order_by_id(self, order_id: int) -> Dict:
+        return await self._call(OrderService.get_order_by_id, order_id)
+
+    async def get_order_if_changed(
+        self, order_id: int, if_none_match: Optional[str]
+    ) -> Tuple[str, Optional[Dict]]:
+        return await self._call(OrderService.get_order_if_changed, order_id, if_none_match)
+
+    async def list_orders(self, filters: OrderFilters, cursor: Optional[str], limit: int) -> Dict:
+        return await self._call(OrderService.list_orders, filters, cursor, limit)
+
+    def stream_orders(self, filters: OrderFilters, cursor: Optional[str]) -> AsyncIterator[Dict]:
+        """
+        Iterate over every order matching the filters, oldest first.
+
+        The cursor is checked right away; orders are then fetched STREAM_PAGE_SIZE
+        at a time, each page in its own short session, so memory stays flat and no
+        read transaction is held open while the caller consumes the rows.
+        """
+        OrderService.decode_cursor(cursor)
+        return self._stream_pages(filters, cursor)
+
+    async def _stream_pages(self, filters: OrderFilters, cursor: Optional[str]):
+        while True:
+            async with AsyncSession(self.db.bind, autoflush=False) as db:
+                page = await AsyncOrderService(db).list_orders(filters, cursor, STREAM_PAGE_SIZE)
+            for order in page["orders"]:
+                yield order
+            cursor = page["nextCursor"]
+            if cursor is None:
+                return
+
+    async def get_candidates(self, order_id: int, k: int) -> Dict:
+        return await self._call(OrderService.get_candidates, order_id, k)
+
+    async def assign_master_to_order(self, order_id: int) -> Dict:
+        return await self._call(OrderService.assign_master_to_order, order_id)
+
+    async def complete_order(self, order_id: int) -> Dict:
+        return await self._call(OrderService.complete_order, order_id)
@@ -0,0 +1,97 @@
+from typing import Literal
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """
+    Application settings, read from NEXA_* environment variables or a .env file.
+
+    Example: NEXA_ASSIGN_DISPATCHER_ENABLED=true NEXA_ASSIGN_FLUSH_INTERVAL_MS=10
+    """
+
+    model_config = SettingsConfigDict(env_prefix="NEXA_", env_file=".env", extra="ignore")
+
+    # Database engine. Any SQLAlchemy URL works, e.g. sqlite:///./nexa_test2.db (file),
+    # sqlite:// (in-memory, one shared connection) or postgresql+psycopg2://user@host/db
+    database_url: str = Field("sqlite:///./nexa_test2.db", description="SQLAlchemy database URL")
+    db_pool_size: int = Field(10, ge=1, description="Connections kept open in the pool")
+    db_max_overflow: int = Field(
+        30, ge=0, description="Extra connections opened when the pool is exhausted"
+    )
+    db_pool_recycle_s: int = Field(
+        1800, ge=-1, description="Replace connections older than this (-1 never recycles)"
+    )
+    db_statement_timeout_ms: int = Field(
+        0, ge=0, description="Abort statements running longer than this (0 disables)"
+    )
+    db_echo: bool = Field(False, description="Log every SQL statement")
+
+    # Worker threads shared by sync handlers, the assignment dispatcher and the
+    # CPU-bound work async handlers move off the event loop (run_cpu_bound)
+    threadpool_size: int = Field(
+        40, ge=1, description="Threads available to blocking work across all requests"
+    )
+
+    # Render API responses with orjson, skipping response_model validation and re-encoding
+    fast_json_enabled: bool = Field(
+        False, description="Serialize the response dicts straight to JSON bytes with orjson"
+    )
+
+    # In-memory master registry (columnar snapshot + spatial index). It follows the writes of
+    # this process; disable it when several worker processes share the database, and masters
+    # are read with SQL, with candidates from bounding-box queries
+    master_registry_enabled: bool = Field(
+        True, description="Serve master reads and candidate searches from process memory"
+    )
+    master_registry_max_age_s: float = Field(
+        30.0, gt=0, description="Rebuild the registry after this long, picking up outside writes"
+    )
+
+    # In-process LRU+TTL cache of GET /orders/{id} and GET /masters/{id} results, invalidated
+    # by this process's writes; leave disabled when several processes share the database
+    read_cache_enabled: bool = Field(
+        False, description="Cache order and master read models in process memory"
+    )
+    read_cache_max_entries: int = Field(
+        10000, ge=1, description="Entries kept per cache (orders, masters) before LRU eviction"
+    )
+    read_cache_ttl_s: float = Field(
+        30.0, gt=0, description="Seconds a cached entry is served before it is read again"
+    )
+
+    # Micro-batching dispatcher for POST /orders/{id}/assign
+    assign_dispatcher_enabled: bool = Field(
+        False, description="Queue assign requests and process them in micro-batches"
+    )
+    assign_flush_interval_ms: float = Field(
+        5.0, gt=0, description="How long a batch collects requests before it is processed"
+    )
+    assign_max_batch_size: int = Field(
+        64, ge=1, description="Batch is processed early once this many requests are queued"
+    )
+
+    # SQLite connection profile, applied as PRAGMAs on every new connection
+    sqlite_journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = Field(
+        "WAL", description="WAL lets readers run while a write transaction is open"
+    )
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = Field(
+        "NORMAL",
+        description="With WAL, fsync only at checkpoints (consistent, not power-loss durable)",
+    )
+    sqlite_busy_timeout_ms: int = Field(
+        5000, ge=0, description="How long a writer waits for a lock before 'database is locked'"
+    )
+    sqlite_mmap_size: int = Field(
+        256 * 1024 * 1024, ge=0, description="Bytes of the database file read through mmap"
+    )
+    sqlite_cache_size: int = Field(
+        -64 * 1024, description="Page cache per connection; negative values are KiB"
+    )
+    sqlite_temp_store: Literal["DEFAULT", "FILE", "MEMORY"] = Field(
+        "MEMORY", description="Keep temporary tables and indexes in RAM"
+    )
+
+
+settings = Settings()
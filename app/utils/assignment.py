@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def solve_min_cost_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Solve the rectangular linear assignment problem.
+
+    Given an (n_rows, n_cols) cost matrix, picks at most one column per row and
+    one row per column so that min(n_rows, n_cols) pairs are matched with the
+    smallest total cost.
+
+    Returns an array of length n_rows holding the matched column for each row,
+    or -1 for rows left unmatched (only possible when n_rows > n_cols).
+
+    Hungarian algorithm with potentials (shortest augmenting paths), O(n²·m)
+    for n = min(n_rows, n_cols) and m = max(n_rows, n_cols). The inner loop
+    over columns is vectorized with NumPy.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    n_rows, n_cols = cost.shape
+    if n_rows == 0 or n_cols == 0:
+        return np.full(n_rows, -1, dtype=np.int64)
+
+    if n_rows > n_cols:
+        col_for_row = np.full(n_rows, -1, dtype=np.int64)
+        row_for_col = _solve_rows_le_cols(cost.T)
+        col_for_row[row_for_col] = np.arange(n_cols)
+        return col_for_row
+
+    return _solve_rows_le_cols(cost)
+
+
+def _solve_rows_le_cols(cost: np.ndarray) -> np.ndarray:
+    n, m = cost.shape
+    # Index 0 is a virtual column/row used as the root of each augmenting path
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of_col = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for row in range(1, n + 1):
+        row_of_col[0] = row
+        col = 0
+        min_reduced = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+
+        while True:
+            used[col] = True
+            current_row = row_of_col[col]
+            free = ~used[1:]
+
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+            improved = free & (reduced < min_reduced[1:])
+            min_reduced[1:][improved] = reduced[improved]
+            way[1:][improved] = col
+
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+
+            u[row_of_col[used]] += delta
+            v[used] -= delta
+            min_reduced[1:][free] -= delta
+
+            col = next_col
+            if row_of_col[col] == 0:
+                break
+
+        # Flip the augmenting path back to the root
+        while col:
+            previous = way[col]
+            row_of_col[col] = row_of_col[previous]
+            col = previous
+
+    col_for_row = np.full(n, -1, dtype=np.int64)
+    matched = row_of_col[1:] > 0
+    col_for_row[row_of_col[1:][matched] - 1] = np.nonzero(matched)[0]
+    return col_for_row
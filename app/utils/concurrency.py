@@ -0,0 +1,42 @@
+import threading
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+import anyio.to_thread
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+
+T = TypeVar("T")
+
+
+def run_cpu_bound(func: Callable[..., T], *args: Any) -> T:
+    """
+    Call a CPU-bound function (distance matrices, ranking, the assignment solve)
+    without stalling the event loop.
+
+    Sync service code called through AsyncSession.run_sync runs on the event
+    loop thread, so there the function runs in a worker thread of the shared
+    threadpool and the loop serves other requests meanwhile. Anywhere else
+    (threadpool handlers, the assignment dispatcher) the caller is already off
+    the loop and the function is called directly.
+
+    func must not use the session: it only gets plain values or loaded rows.
+    """
+    return _off_the_loop(func, *args)
+
+
+def acquire_lock(lock: threading.Lock) -> None:
+    """
+    Acquire a threading lock that may be held across awaits, like run_cpu_bound():
+    on the event loop thread (inside AsyncSession.run_sync or an async engine's
+    connection checkout) the wait happens in a worker thread, so the loop keeps
+    serving requests, among them the one holding the lock.
+    """
+    if not lock.acquire(blocking=False):
+        _off_the_loop(lock.acquire)
+
+
+def _off_the_loop(func: Callable[..., T], *args: Any) -> T:
+    if in_greenlet():
+        return await_only(anyio.to_thread.run_sync(partial(func, *args)))
+    return func(*args)
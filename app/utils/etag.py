@@ -0,0 +1,36 @@
+import hashlib
+from typing import Optional, Union
+
+
+def make_etag(*parts: Union[bytes, str, int, float, None]) -> str:
+    """
+    Build a strong, quoted ETag from the values a representation is derived from
+    (row versions, timestamps, column bytes). Equal parts give equal tags.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        data = part if isinstance(part, bytes) else repr(part).encode()
+        # Length-prefixed, so ("ab", "c") and ("a", "bc") hash differently
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match: a W/ prefix
+    is ignored, the header may list several tags, and "*" matches any tag.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,263 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.utils.spatial_index import GridIndex
+
+
+class MasterRecord:
+    """Lightweight read-only view of one master, shaped like the Master model"""
+
+    __slots__ = ("id", "name", "rating", "is_available", "geo_lat", "geo_lng", "active_load")
+
+    def __init__(self, id, name, rating, is_available, geo_lat, geo_lng, active_load):
+        self.id = id
+        self.name = name
+        self.rating = rating
+        self.is_available = is_available
+        self.geo_lat = geo_lat
+        self.geo_lng = geo_lng
+        self.active_load = active_load
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "rating": self.rating,
+            "isAvailable": self.is_available,
+            "geo": {"lat": self.geo_lat, "lng": self.geo_lng},
+        }
+
+
+class MasterColumns(NamedTuple):
+    """Column-wise snapshot of masters; row i of every array is the same master"""
+
+    ids: np.ndarray
+    names: List[str]
+    ratings: np.ndarray
+    available: np.ndarray
+    lats: np.ndarray
+    lngs: np.ndarray
+    loads: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_masters(cls, masters: Iterable) -> "MasterColumns":
+        """Build columns from Master models or MasterRecords"""
+        masters = list(masters)
+        return cls(
+            ids=np.array([master.id for master in masters], dtype=np.int64),
+            names=[master.name for master in masters],
+            ratings=np.array([master.rating for master in masters], dtype=np.float64),
+            available=np.array([master.is_available for master in masters], dtype=bool),
+            lats=np.array([master.geo_lat for master in masters], dtype=np.float64),
+            lngs=np.array([master.geo_lng for master in masters], dtype=np.float64),
+            loads=np.array([master.active_load for master in masters], dtype=np.int64),
+        )
+
+    def take(self, rows: np.ndarray) -> "MasterColumns":
+        """Select a subset of rows (boolean mask or positions)"""
+        positions = np.flatnonzero(rows) if rows.dtype == bool else rows
+        return MasterColumns(
+            ids=self.ids[positions],
+            names=[self.names[position] for position in positions.tolist()],
+            ratings=self.ratings[positions],
+            available=self.available[positions],
+            lats=self.lats[positions],
+            lngs=self.lngs[positions],
+            loads=self.loads[positions],
+        )
+
+    def in_bounding_box(
+        self,
+        min_lat: Optional[float] = None,
+        max_lat: Optional[float] = None,
+        min_lng: Optional[float] = None,
+        max_lng: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Boolean mask of the rows inside a (partial) bounding box; min_lng > max_lng
+        selects a box crossing the antimeridian
+        """
+        rows = np.ones(len(self), dtype=bool)
+        if min_lat is not None:
+            rows &= self.lats >= min_lat
+        if max_lat is not None:
+            rows &= self.lats <= max_lat
+        if min_lng is not None and max_lng is not None and min_lng > max_lng:
+            return rows & ((self.lngs >= min_lng) | (self.lngs <= max_lng))
+        if min_lng is not None:
+            rows &= self.lngs >= min_lng
+        if max_lng is not None:
+            rows &= self.lngs <= max_lng
+        return rows
+
+    def to_dicts(self) -> List[Dict]:
+        """Render every row like Master.to_dict() plus its currentLoad"""
+        return [
+            {
+                "id": master_id,
+                "name": name,
+                "rating": rating,
+                "isAvailable": available,
+                "geo": {"lat": lat, "lng": lng},
+                "currentLoad": load,
+            }
+            for master_id, name, rating, available, lat, lng, load in zip(
+                self.ids.tolist(),
+                self.names,
+                self.ratings.tolist(),
+                self.available.tolist(),
+                self.lats.tolist(),
+                self.lngs.tolist(),
+                self.loads.tolist(),
+            )
+        ]
+
+
+class MasterRegistry:
+    """
+    Columnar in-memory store of masters.
+
+    Each attribute lives in its own NumPy array (names in a list), with an
+    id -> row map for O(1) updates; removed rows are filled by moving the last
+    row into the gap. Available masters are also kept in a GridIndex for
+    nearest-k queries.
+
+    A few thousand masters take a few hundred KB, and snapshots for distance
+    computations are array slices rather than ORM objects.
+    """
+
+    _INITIAL_CAPACITY = 64
+
+    def __init__(self, cell_size_deg: float = 0.05):
+        self.index = GridIndex(cell_size_deg)
+        self._rows: Dict[int, int] = {}
+        self._names: List[str] = []
+        self._allocate(self._INITIAL_CAPACITY)
+
+    def _allocate(self, capacity: int) -> None:
+        size = len(self._rows)
+        old = getattr(self, "_ids", None)
+        columns = {
+            "_ids": np.int64,
+            "_ratings": np.float64,
+            "_available": bool,
+            "_lats": np.float64,
+            "_lngs": np.float64,
+            "_loads": np.int64,
+        }
+        for name, dtype in columns.items():
+            column = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                column[:size] = getattr(self, name)[:size]
+            setattr(self, name, column)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, master_id: int) -> bool:
+        return master_id in self._rows
+
+    def upsert(
+        self,
+        master_id: int,
+        name: str,
+        rating: float,
+        is_available: bool,
+        lat: float,
+        lng: float,
+        load: Optional[int] = None,
+    ) -> None:
+        """Insert or update a master; load=None keeps the current counter (0 for new rows)"""
+        row = self._rows.get(master_id)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self._ids):
+                self._allocate(2 * row)
+            self._rows[master_id] = row
+            self._names.append(name)
+            self._ids[row] = master_id
+            self._loads[row] = 0
+        self._names[row] = name
+        self._ratings[row] = rating
+        self._available[row] = bool(is_available)
+        self._lats[row] = lat
+        self._lngs[row] = lng
+        if load is not None:
+            self._loads[row] = load
+
+        if is_available:
+            self.index.upsert(master_id, lat, lng)
+        else:
+            self.index.remove(master_id)
+
+    def remove(self, master_id: int) -> None:
+        """Remove a master if present"""
+        row = self._rows.pop(master_id, None)
+        if row is None:
+            return
+        self.index.remove(master_id)
+        last = len(self._rows)
+        if row != last:
+            moved_id = int(self._ids[last])
+            self._rows[moved_id] = row
+            self._names[row] = self._names[last]
+            for column in (
+                self._ids,
+                self._ratings,
+                self._available,
+                self._lats,
+                self._lngs,
+                self._loads,
+            ):
+                column[row] = column[last]
+        self._names.pop()
+
+    def add_load(self, master_id: int, delta: int) -> None:
+        """Shift a master's active load counter"""
+        row = self._rows.get(master_id)
+        if row is not None:
+            self._loads[row] += delta
+
+    def record(self, master_id: int) -> Optional[MasterRecord]:
+        """Return one master as a MasterRecord, or None if unknown"""
+        row = self._rows.get(master_id)
+        if row is None:
+            return None
+        return MasterRecord(
+            int(self._ids[row]),
+            self._names[row],
+            float(self._ratings[row]),
+            bool(self._available[row]),
+            float(self._lats[row]),
+            float(self._lngs[row]),
+            int(self._loads[row]),
+        )
+
+    def records(self, master_ids: Iterable[int]) -> List[MasterRecord]:
+        """Return MasterRecords for the known IDs among master_ids, in the given order"""
+        records = (self.record(master_id) for master_id in master_ids)
+        return [record for record in records if record is not None]
+
+    def columns(self, available_only: bool = False) -> MasterColumns:
+        """Return a copy of the columns, ordered by master ID"""
+        size = len(self._rows)
+        order = np.argsort(self._ids[:size], kind="stable")
+        if available_only:
+            order = order[self._available[order]]
+        return MasterColumns(
+            ids=self._ids[order],
+            names=[self._names[row] for row in order.tolist()],
+            ratings=self._ratings[order],
+            available=self._available[order],
+            lats=self._lats[order],
+            lngs=self._lngs[order],
+            loads=self._loads[order],
+        )
+
+    def nearest(self, lat: float, lng: float, k: int):
+        """Return up to k (distance_km, master_id) pairs for the nearest available masters"""
+        return self.index.nearest(lat, lng, k)
@@ -0,0 +1,59 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+
+def _encode(key: list) -> str:
+    payload = json.dumps(key, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> Any:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def _check_id(row_id: Any) -> int:
+    if not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise ValueError("cursor id must be an integer")
+    return row_id
+
+
+def encode_keyset_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode the (created_at, id) key of the last row of a page as an opaque,
+    URL-safe cursor for the next page
+    """
+    return _encode([created_at.isoformat(), row_id])
+
+
+def decode_keyset_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor made by encode_keyset_cursor back into (created_at, id).
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        created_at, row_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), _check_id(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def encode_id_cursor(row_id: int) -> str:
+    """Encode the id of the last row of a page, for listings ordered by id"""
+    return _encode([row_id])
+
+
+def decode_id_cursor(cursor: str) -> int:
+    """
+    Decode a cursor made by encode_id_cursor back into the id.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        (row_id,) = _decode(cursor)
+        return _check_id(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
@@ -0,0 +1,150 @@
+import heapq
+import math
+from typing import Dict, List, Set, Tuple
+
+from app.utils.distance import EARTH_RADIUS_KM, haversine_distance
+
+
+class GridIndex:
+    """
+    Grid bucket index over lat/lng points for nearest-k queries.
+
+    Points are hashed into square cells of `cell_size_deg` degrees. A query
+    walks outwards from the query cell one ring at a time and stops as soon as
+    the k-th best distance found is closer than anything an unvisited ring
+    could contain, so only the cells around the query point are inspected.
+
+    Inserts, moves and removals are O(1), which lets the index follow writes
+    to the masters table without being rebuilt.
+    """
+
+    def __init__(self, cell_size_deg: float = 0.05):
+        self.cell_size_deg = cell_size_deg
+        self._lng_cells = int(math.ceil(360.0 / cell_size_deg))
+        self._points: Dict[int, Tuple[float, float]] = {}
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, point_id: int) -> bool:
+        return point_id in self._points
+
+    def _cell_of(self, lat: float, lng: float) -> Tuple[int, int]:
+        row = int(math.floor((lat + 90.0) / self.cell_size_deg))
+        col = int(math.floor((lng + 180.0) / self.cell_size_deg)) % self._lng_cells
+        return row, col
+
+    def upsert(self, point_id: int, lat: float, lng: float) -> None:
+        """Insert a point or move it to a new location"""
+        self.remove(point_id)
+        cell = self._cell_of(lat, lng)
+        self._points[point_id] = (lat, lng)
+        self._cells.setdefault(cell, set()).add(point_id)
+
+    def remove(self, point_id: int) -> None:
+        """Remove a point if present"""
+        location = self._points.pop(point_id, None)
+        if location is None:
+            return
+        cell = self._cell_of(*location)
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(point_id)
+            if not bucket:
+                del self._cells[cell]
+
+    def clear(self) -> None:
+        """Remove all points"""
+        self._points.clear()
+        self._cells.clear()
+
+    def _ring(self, row: int, col: int, radius: int):
+        """Yield the cells at Chebyshev distance `radius` from (row, col)"""
+        if radius == 0:
+            yield row, col
+            return
+        seen = set()
+        for d_row in range(-radius, radius + 1):
+            if abs(d_row) == radius:
+                d_cols = range(-radius, radius + 1)
+            else:
+                d_cols = (-radius, radius)
+            for d_col in d_cols:
+                cell = (row + d_row, (col + d_col) % self._lng_cells)
+                if cell not in seen:
+                    seen.add(cell)
+                    yield cell
+
+    def _ring_lower_bound_km(self, lat: float, radius: int) -> float:
+        """
+        Lower bound on the distance from a query at `lat` to any point lying
+        in a ring farther out than `radius`.
+
+        Such a point differs from the query by at least radius * cell_size
+        degrees in latitude or in longitude. The latitude case is bounded by
+        the meridian distance; the longitude case by the haversine term
+        cos φ1 ⋅ cos φ2 ⋅ sin²(Δλ/2), using the smallest cosine reachable
+        without crossing the latitude bound.
+        """
+        gap_deg = radius * self.cell_size_deg
+        if gap_deg >= 180.0:
+            return math.inf
+        lat_bound = EARTH_RADIUS_KM * math.radians(gap_deg)
+
+        far_lat = min(90.0, abs(lat) + gap_deg)
+        a = (
+            math.cos(math.radians(lat))
+            * math.cos(math.radians(far_lat))
+            * math.sin(math.radians(gap_deg) / 2) ** 2
+        )
+        lng_bound = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, max(0.0, a))))
+        return min(lat_bound, lng_bound)
+
+    def nearest(self, lat: float, lng: float, k: int) -> List[Tuple[float, int]]:
+        """
+        Return up to k (distance_km, point_id) pairs nearest to (lat, lng),
+        ordered by distance and then id.
+        """
+        if k <= 0 or not self._points:
+            return []
+
+        k = min(k, len(self._points))
+        row, col = self._cell_of(lat, lng)
+        # Max-heap (negated) of the best k candidates seen so far
+        best: List[Tuple[float, int]] = []
+        scanned_cells = 0
+        radius = 0
+
+        while True:
+            for cell in self._ring(row, col, radius):
+                scanned_cells += 1
+                for point_id in self._cells.get(cell, ()):
+                    self._offer(best, k, lat, lng, point_id)
+
+            lower_bound = self._ring_lower_bound_km(lat, radius)
+            if len(best) == k and -best[0][0] <= lower_bound:
+                break
+
+            # Sparse neighbourhood: scanning empty rings would cost more than
+            # checking every occupied cell, so finish with a direct scan.
+            if scanned_cells > 8 * len(self._cells) or lower_bound == math.inf:
+                best = []
+                for point_id in self._points:
+                    self._offer(best, k, lat, lng, point_id)
+                break
+
+            radius += 1
+
+        return sorted((-neg_distance, -neg_id) for neg_distance, neg_id in best)
+
+    def _offer(
+        self, best: List[Tuple[float, int]], k: int, lat: float, lng: float, point_id: int
+    ) -> None:
+        point_lat, point_lng = self._points[point_id]
+        distance = haversine_distance(lat, lng, point_lat, point_lng)
+        entry = (-distance, -point_id)
+        if len(best) < k:
+            heapq.heappush(best, entry)
+        elif entry > best[0]:
+            heapq.heapreplace(best, entry)
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional, Union
+
+from app.settings import settings
+
+
+def render_timestamp(value: Optional[datetime]) -> Union[datetime, str, None]:
+    """
+    Render a datetime for a response dict.
+
+    The default path validates the dicts against response models that declare
+    ISO strings, so it gets value.isoformat(). With NEXA_FAST_JSON_ENABLED the
+    dicts go straight to orjson, which encodes naive datetimes natively to the
+    same text, so the datetime is passed through.
+    """
+    if value is None or settings.fast_json_enabled:
+        return value
+    return value.isoformat()
+
+
+def parse_timestamp(value: Union[datetime, str]) -> datetime:
+    """Read back a timestamp rendered by render_timestamp()"""
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
@@ -0,0 +1,101 @@
+"""
+Benchmark bulk order creation.
+
+Creates the same orders through the API twice against a fresh database file:
+once with one POST /orders request per order, and once with POST /orders/bulk
+requests of --batch-size orders, and prints the throughput of each.
+
+Usage: python -m benchmarks.bulk_orders [--orders 2000] [--batch-size 500]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import create_db_engine, get_db, get_engine
+from app.main import app
+
+
+def order_payloads(count: int) -> List[Dict]:
+    rng = random.Random(1)
+    return [
+        {
+            "title": f"Order {i}",
+            "customer": {"name": f"Customer {i}", "phone": "+1234567890"},
+            "geo": {"lat": rng.uniform(40.5, 40.9), "lng": rng.uniform(-74.2, -73.7)},
+        }
+        for i in range(count)
+    ]
+
+
+def per_order(client: TestClient, orders: List[Dict], batch_size: int) -> None:
+    for order in orders:
+        response = client.post("/api/v1/orders", json=order)
+        assert response.status_code == 201, response.text
+
+
+def bulk(client: TestClient, orders: List[Dict], batch_size: int) -> None:
+    for start in range(0, len(orders), batch_size):
+        response = client.post(
+            "/api/v1/orders/bulk", json={"orders": orders[start : start + batch_size]}
+        )
+        assert response.status_code == 201, response.text
+
+
+def run_mode(create: Callable, orders: List[Dict], batch_size: int) -> float:
+    """Create the orders in a fresh database, returning orders per second"""
+    directory = tempfile.mkdtemp(prefix="nexa-bench-")
+    engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_engine():
+        return engine
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    try:
+        with TestClient(app) as client:
+            started = time.perf_counter()
+            create(client, orders, batch_size)
+            elapsed = time.perf_counter() - started
+    finally:
+        del app.dependency_overrides[get_db]
+        del app.dependency_overrides[get_engine]
+        engine.dispose()
+        shutil.rmtree(directory, ignore_errors=True)
+    return len(orders) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    orders = order_payloads(args.orders)
+    print(f"{args.orders} orders, bulk batches of {args.batch_size}")
+    print(f"{'mode':<12}{'orders/s':>12}{'speedup':>10}")
+    baseline = None
+    for name, create in (("per-order", per_order), ("bulk", bulk)):
+        throughput = run_mode(create, orders, args.batch_size)
+        baseline = baseline or throughput
+        print(f"{name:<12}{throughput:>12.0f}{throughput / baseline:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
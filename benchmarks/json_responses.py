@@ -0,0 +1,143 @@
+"""
+Benchmark the fast JSON response path.
+
+Seeds a fresh database file, then requests a few read endpoints repeatedly,
+once with the default path (response_model validation, jsonable_encoder, json)
+and once with NEXA_FAST_JSON_ENABLED (orjson), and prints the CPU time per
+request of each.
+
+Usage: python -m benchmarks.json_responses [--requests 200] [--masters 1000] [--orders 500]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import create_db_engine, get_db, get_engine
+from app.main import app
+from app.models import ADLMedia, Master, Order
+from app.models.adl_media import MediaType
+from app.models.order import OrderStatus
+from app.repositories import master_index
+from app.settings import settings
+
+ENDPOINTS = {
+    "GET /orders/1": ("/api/v1/orders/1", {}),
+    "GET /orders": ("/api/v1/orders", {"limit": 500}),
+    "GET /masters": ("/api/v1/masters", {}),
+}
+
+
+def seed(session_factory, masters: int, orders: int) -> None:
+    rng = random.Random(1)
+    db = session_factory()
+    db.add_all(
+        [
+            Master(
+                name=f"Master {i}",
+                rating=round(rng.uniform(3.5, 5.0), 1),
+                is_available=rng.random() < 0.8,
+                geo_lat=rng.uniform(40.5, 40.9),
+                geo_lng=rng.uniform(-74.2, -73.7),
+            )
+            for i in range(masters)
+        ]
+    )
+    db.add_all(
+        [
+            Order(
+                title=f"Order {i}",
+                description="Kitchen sink is leaking",
+                status=OrderStatus.ASSIGNED,
+                customer={"name": f"Customer {i}", "phone": "+1234567890"},
+                geo_lat=rng.uniform(40.5, 40.9),
+                geo_lng=rng.uniform(-74.2, -73.7),
+                assigned_master_id=1,
+            )
+            for i in range(orders)
+        ]
+    )
+    db.add_all(
+        [
+            ADLMedia(
+                order_id=1,
+                type=MediaType.PHOTO,
+                url=f"/uploads/order_1_{i}.jpg",
+                gps_lat=40.7128,
+                gps_lng=-74.0060,
+                captured_at=datetime(2025, 10, 16, 14, 30, i),
+                meta={"device": "phone"},
+            )
+            for i in range(20)
+        ]
+    )
+    db.commit()
+    db.close()
+
+
+def cpu_ms_per_request(client: TestClient, url: str, params: Dict, requests: int) -> float:
+    for _ in range(5):
+        client.get(url, params=params)
+    started = time.process_time()
+    for _ in range(requests):
+        response = client.get(url, params=params)
+        assert response.status_code == 200, response.text
+    return (time.process_time() - started) * 1000 / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--masters", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=500)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="nexa-bench-")
+    engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seed(session_factory, args.masters, args.orders)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_engine():
+        return engine
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    enabled = settings.fast_json_enabled
+    print(f"{args.masters} masters, {args.orders} orders, {args.requests} requests each")
+    print(f"{'endpoint':<16}{'default ms':>12}{'fast ms':>10}{'speedup':>10}")
+    try:
+        with TestClient(app) as client:
+            for name, (url, params) in ENDPOINTS.items():
+                timings = []
+                for fast in (False, True):
+                    settings.fast_json_enabled = fast
+                    timings.append(cpu_ms_per_request(client, url, params, args.requests))
+                default, fast = timings
+                print(f"{name:<16}{default:>12.3f}{fast:>10.3f}{default / fast:>9.1f}x")
+    finally:
+        settings.fast_json_enabled = enabled
+        del app.dependency_overrides[get_db]
+        del app.dependency_overrides[get_engine]
+        master_index.reset(engine)
+        engine.dispose()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Benchmark the read-only column views against ORM reads.
+
+Seeds a fresh database file, then builds the same response dicts for a few
+reads two ways: by loading ORM objects and calling to_dict(), and with the
+repositories' column views (Core select, dicts built from rows). Prints the
+time per call and the peak memory allocated per call (tracemalloc) of each.
+
+Usage: python -m benchmarks.read_allocations [--repeat 50] [--masters 1000] [--orders 500]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database.base import Base
+from app.database.config import create_db_engine
+from app.models import ADLMedia, Master, Order
+from app.models.adl_media import MediaType
+from app.models.order import OrderStatus
+from app.repositories.master_repository import MasterFilters, MasterRepository
+from app.repositories.order_repository import OrderFilters, OrderRepository
+
+
+def seed(db: Session, masters: int, orders: int) -> None:
+    rng = random.Random(1)
+    db.add_all(
+        [
+            Master(
+                name=f"Master {i}",
+                rating=round(rng.uniform(3.5, 5.0), 1),
+                is_available=rng.random() < 0.8,
+                geo_lat=rng.uniform(40.5, 40.9),
+                geo_lng=rng.uniform(-74.2, -73.7),
+            )
+            for i in range(masters)
+        ]
+    )
+    db.add_all(
+        [
+            Order(
+                title=f"Order {i}",
+                description="Kitchen sink is leaking",
+                status=OrderStatus.ASSIGNED,
+                customer={"name": f"Customer {i}", "phone": "+1234567890"},
+                geo_lat=rng.uniform(40.5, 40.9),
+                geo_lng=rng.uniform(-74.2, -73.7),
+                assigned_master_id=1,
+            )
+            for i in range(orders)
+        ]
+    )
+    db.add_all(
+        [
+            ADLMedia(
+                order_id=1,
+                type=MediaType.PHOTO,
+                url=f"/uploads/order_1_{i}.jpg",
+                gps_lat=40.7128,
+                gps_lng=-74.0060,
+                captured_at=datetime(2025, 10, 16, 14, 30, i),
+            )
+            for i in range(20)
+        ]
+    )
+    db.commit()
+
+
+def reads(db: Session, orders: int):
+    """(name, ORM read, view read) pairs building the same response dicts"""
+    order_repository = OrderRepository(db)
+    master_repository = MasterRepository(db)
+
+    def orm_masters():
+        masters = db.scalars(select(Master).order_by(Master.id))
+        return [{**master.to_dict(), "currentLoad": master.active_load} for master in masters]
+
+    def orm_orders():
+        query = select(Order).order_by(Order.created_at, Order.id).limit(orders)
+        return [order.to_dict() for order in db.scalars(query)]
+
+    return [
+        (
+            "order 1 + relations",
+            lambda: order_repository.get_with_relations(1).to_dict_with_relations(),
+            lambda: order_repository.get_view_with_relations(1),
+        ),
+        (
+            f"{orders} orders",
+            orm_orders,
+            lambda: order_repository.list_page(OrderFilters(), None, orders),
+        ),
+        (
+            "all masters",
+            orm_masters,
+            lambda: master_repository.list_page(MasterFilters(), None, None),
+        ),
+    ]
+
+
+def measure(db: Session, read: Callable, repeat: int) -> Tuple[float, float]:
+    """Return (ms per call, peak KiB allocated per call); the session is cleared per call"""
+    read()
+    db.expunge_all()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        read()
+        db.expunge_all()
+    elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(repeat, 10)):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        read()
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        db.expunge_all()
+    tracemalloc.stop()
+    return elapsed_ms, max(peaks) / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--masters", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=500)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="nexa-bench-")
+    engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        seed(db, args.masters, args.orders)
+        print(f"{args.masters} masters, {args.orders} orders, {args.repeat} calls each")
+        print(f"{'read':<22}{'orm ms':>9}{'view ms':>9}{'orm KiB':>10}{'view KiB':>10}")
+        for name, orm_read, view_read in reads(db, args.orders):
+            assert orm_read() is not None and view_read() is not None
+            orm_ms, orm_kib = measure(db, orm_read, args.repeat)
+            view_ms, view_kib = measure(db, view_read, args.repeat)
+            print(f"{name:<22}{orm_ms:>9.3f}{view_ms:>9.3f}{orm_kib:>10.1f}{view_kib:>10.1f}")
+    finally:
+        db.close()
+        engine.dispose()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark the SQLite connection profile.
+
+Runs concurrent reader threads (bounding-box candidate query + order count) and
+writer threads (insert an order, commit) against a fresh database file for a
+fixed time, once with SQLite's defaults and once with the profile from
+app.database.config.sqlite_pragmas(), and prints the throughput of each.
+
+Usage: python -m benchmarks.sqlite_profile [--seconds 5] [--readers 8] [--writers 2]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import create_db_engine, sqlite_pragmas
+from app.models import Master, Order
+from app.repositories.master_repository import MasterRepository
+
+MASTER_COUNT = 2000
+
+PROFILES = {
+    # Rollback journal, synchronous=FULL; keep the driver's default 5s busy timeout
+    "default": {"busy_timeout": 5000},
+    "tuned": sqlite_pragmas(),
+}
+
+
+def seed(session_factory) -> None:
+    rng = random.Random(1)
+    db = session_factory()
+    db.add_all(
+        [
+            Master(
+                name=f"Master {i}",
+                rating=round(rng.uniform(3.5, 5.0), 1),
+                is_available=rng.random() < 0.8,
+                geo_lat=rng.uniform(40.5, 40.9),
+                geo_lng=rng.uniform(-74.2, -73.7),
+            )
+            for i in range(MASTER_COUNT)
+        ]
+    )
+    db.commit()
+    db.close()
+
+
+class Workload:
+    """Reader and writer loops sharing one engine and one set of counters"""
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.errors = 0
+        self.write_latencies = []
+
+    def read_loop(self, seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        while not self.stop.is_set():
+            db = self.session_factory()
+            try:
+                MasterRepository(db).get_available_masters_near(
+                    rng.uniform(40.5, 40.9), rng.uniform(-74.2, -73.7), 2.0
+                )
+                db.query(func.count(Order.id)).scalar()
+                with self.lock:
+                    self.reads += 1
+            except OperationalError:
+                with self.lock:
+                    self.errors += 1
+            finally:
+                db.close()
+
+    def write_loop(self, seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        while not self.stop.is_set():
+            db = self.session_factory()
+            started = time.perf_counter()
+            try:
+                db.add(Order(title="Bench", geo_lat=rng.uniform(40.5, 40.9), geo_lng=-74.0))
+                db.commit()
+                with self.lock:
+                    self.writes += 1
+                    self.write_latencies.append(time.perf_counter() - started)
+            except OperationalError:
+                db.rollback()
+                with self.lock:
+                    self.errors += 1
+            finally:
+                db.close()
+
+
+def run_profile(pragmas: Dict[str, object], seconds: float, readers: int, writers: int) -> Dict:
+    directory = tempfile.mkdtemp(prefix="nexa-bench-")
+    engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", pragmas)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seed(session_factory)
+
+    workload = Workload(session_factory)
+    threads = [threading.Thread(target=workload.read_loop, args=(i,)) for i in range(readers)]
+    threads += [
+        threading.Thread(target=workload.write_loop, args=(100 + i,)) for i in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    workload.stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    shutil.rmtree(directory, ignore_errors=True)
+
+    latencies = sorted(workload.write_latencies) or [0.0]
+    return {
+        "reads_per_s": workload.reads / seconds,
+        "writes_per_s": workload.writes / seconds,
+        "errors": workload.errors,
+        "write_p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:.0f}s per profile")
+    print(f"{'profile':<10}{'reads/s':>12}{'writes/s':>12}{'errors':>10}{'write p99':>14}")
+    for name, pragmas in PROFILES.items():
+        result = run_profile(pragmas, args.seconds, args.readers, args.writers)
+        print(
+            f"{name:<10}{result['reads_per_s']:>12.0f}{result['writes_per_s']:>12.0f}"
+            f"{result['errors']:>10}{result['write_p99_ms']:>12.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
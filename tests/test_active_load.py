@@ -0,0 +1,112 @@
+"""
+Tests for the denormalized masters.active_load counter - it must follow
+order status transitions and be rebuildable from the orders table.
+"""
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.models import Master, Order
+from app.models.order import OrderStatus
+from app.repositories.master_repository import MasterRepository
+from app.repositories.order_repository import OrderRepository
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_active_load.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh database session for each test"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def masters(db_session):
+    masters = [
+        Master(name="First", rating=4.5, is_available=True, geo_lat=40.7128, geo_lng=-74.0060),
+        Master(name="Second", rating=4.8, is_available=True, geo_lat=40.7589, geo_lng=-73.9851),
+    ]
+    db_session.add_all(masters)
+    db_session.commit()
+    return masters
+
+
+def active_loads(db_session, masters):
+    db_session.expire_all()
+    return [master.active_load for master in masters]
+
+
+def test_active_load_follows_status_transitions(db_session, masters):
+    """Test that assign, start, reassign and complete move the counter"""
+    repository = OrderRepository(db_session)
+    order = repository.create({"title": "Fix sink", "geo_lat": 40.7128, "geo_lng": -74.0060})
+    assert active_loads(db_session, masters) == [0, 0]
+
+    repository.assign_master(order.id, masters[0].id)
+    assert active_loads(db_session, masters) == [1, 0]
+
+    repository.update_status(order.id, OrderStatus.IN_PROGRESS)
+    assert active_loads(db_session, masters) == [1, 0]
+
+    repository.update(order.id, {"assigned_master_id": masters[1].id})
+    assert active_loads(db_session, masters) == [0, 1]
+
+    repository.update_status(order.id, OrderStatus.COMPLETED)
+    assert active_loads(db_session, masters) == [0, 0]
+
+
+def test_active_load_counts_directly_inserted_orders(db_session, masters):
+    """Test that orders inserted already assigned count towards the load"""
+    db_session.add_all(
+        [
+            Order(
+                title=f"Order {i}",
+                status=OrderStatus.ASSIGNED,
+                geo_lat=40.7128,
+                geo_lng=-74.0060,
+                assigned_master_id=masters[1].id,
+            )
+            for i in range(3)
+        ]
+    )
+    db_session.commit()
+
+    assert active_loads(db_session, masters) == [0, 3]
+
+
+def test_active_load_rolls_back_with_transaction(db_session, masters):
+    """Test that the counter change is discarded with a rolled back transition"""
+    repository = OrderRepository(db_session)
+    order = repository.create({"title": "Fix sink", "geo_lat": 40.7128, "geo_lng": -74.0060})
+
+    order.assigned_master_id = masters[0].id
+    order.status = OrderStatus.ASSIGNED
+    db_session.flush()
+    db_session.rollback()
+
+    assert active_loads(db_session, masters) == [0, 0]
+
+
+def test_reconcile_active_load(db_session, masters):
+    """Test that reconciliation rebuilds drifted counters from the orders table"""
+    repository = OrderRepository(db_session)
+    for _ in range(2):
+        order = repository.create({"title": "Fix sink", "geo_lat": 40.7128, "geo_lng": -74.0060})
+        repository.assign_master(order.id, masters[0].id)
+
+    db_session.execute(update(Master).values(active_load=7))
+    db_session.commit()
+
+    corrected = MasterRepository(db_session).reconcile_active_load()
+
+    assert corrected == 2
+    assert active_loads(db_session, masters) == [2, 0]
+    assert MasterRepository(db_session).reconcile_active_load() == 0
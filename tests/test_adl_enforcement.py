@@ -8,7 +8,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.database.base import Base
-from app.database.config import get_db
+from app.database.config import get_db, get_engine
 from app.main import app
 from app.models import Master
 
@@ -27,10 +27,15 @@ def override_get_db():
         db.close()
 
 
+async def override_get_engine():
+    return engine
+
+
 @pytest.fixture(scope="function")
 def client():
     """Create test client with fresh database"""
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
 
     Base.metadata.create_all(bind=engine)
 
@@ -75,6 +80,8 @@ def client():
     # Remove dependency override
     if get_db in app.dependency_overrides:
         del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
 
 
 def create_and_assign_order(client):
@@ -6,7 +6,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.database.base import Base
-from app.database.config import get_db
+from app.database.config import get_db, get_engine
 from app.main import app
 from app.models import Master
 
@@ -24,11 +24,16 @@ def override_get_db():
         db.close()
 
 
+async def override_get_engine():
+    return engine
+
+
 @pytest.fixture(scope="function")
 def client():
     """Create test client with fresh database"""
     # Set up dependency override for this test
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
 
     # Create tables
     Base.metadata.create_all(bind=engine)
@@ -58,6 +63,8 @@ def client():
     # Remove dependency override
     if get_db in app.dependency_overrides:
         del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
 
 
 def test_health_check(client):
@@ -109,6 +116,25 @@ def test_assign_master(client):
     assert "assignedMaster" in order
 
 
+def test_get_order_candidates(client):
+    """Test previewing candidate masters without assigning"""
+    order_data = {"title": "Test Order", "geo": {"lat": 40.7128, "lng": -74.0060}}
+    response = client.post("/api/v1/orders", json=order_data)
+    order_id = response.json()["id"]
+
+    response = client.get(f"/api/v1/orders/{order_id}/candidates?k=5")
+    assert response.status_code == 200
+    candidates = response.json()["candidates"]
+    # Only the two available masters are candidates, nearest first
+    assert [master["name"] for master in candidates] == ["Test Master 1", "Test Master 2"]
+    assert candidates[0]["distanceKm"] < candidates[1]["distanceKm"]
+    assert "currentLoad" in candidates[0]
+
+    # Previewing does not assign
+    response = client.get(f"/api/v1/orders/{order_id}")
+    assert response.json()["assignedMasterId"] is None
+
+
 def test_attach_adl(client):
     """Test attaching ADL media to order"""
     # Create order
@@ -0,0 +1,179 @@
+"""
+Tests for the micro-batching assignment dispatcher - concurrent assign
+requests are processed together but each caller gets the same result it
+would get from a single assignment.
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import get_db, get_engine
+from app.main import app
+from app.models import Master, Order
+from app.models.order import OrderStatus
+from app.routes import order_routes
+from app.services.assignment_dispatcher import AssignmentDispatcher
+from app.services.order_service import OrderService
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_assignment_dispatcher.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_engine():
+    return engine
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh database with two masters and four NEW orders"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all(
+        [
+            Master(name="Downtown", rating=4.5, is_available=True, geo_lat=40.7128, geo_lng=-74.0),
+            Master(name="Midtown", rating=4.8, is_available=True, geo_lat=40.7589, geo_lng=-74.0),
+        ]
+    )
+    session.add_all(
+        [Order(title=f"Order {i}", geo_lat=40.7128 + i * 0.01, geo_lng=-74.0) for i in range(4)]
+    )
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+class RecordingDispatcher(AssignmentDispatcher):
+    """Dispatcher that records the order IDs of every batch it processes"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def _assign(self, order_ids):
+        self.batches.append(list(order_ids))
+        return super()._assign(order_ids)
+
+
+async def submit_all(dispatcher, order_ids):
+    await dispatcher.start()
+    try:
+        return await asyncio.gather(
+            *(dispatcher.submit(order_id) for order_id in order_ids), return_exceptions=True
+        )
+    finally:
+        await dispatcher.stop()
+
+
+def test_concurrent_requests_share_a_batch(db_session):
+    """Test that concurrent submits are processed as one batch with per-caller results"""
+    dispatcher = RecordingDispatcher(TestingSessionLocal, flush_interval_ms=50, max_batch_size=10)
+
+    results = asyncio.run(submit_all(dispatcher, [1, 2, 3, 4]))
+
+    assert dispatcher.batches == [[1, 2, 3, 4]]
+    assert [result["id"] for result in results] == [1, 2, 3, 4]
+    assert all(result["status"] == "assigned" for result in results)
+    assert [result["assignedMaster"]["name"] for result in results] == [
+        "Downtown",
+        "Downtown",
+        "Downtown",
+        "Midtown",
+    ]
+
+    db_session.expire_all()
+    loads = {master.name: master.active_load for master in db_session.query(Master).all()}
+    assert loads == {"Downtown": 3, "Midtown": 1}
+
+
+def test_batch_matches_sequential_assignment(db_session):
+    """Test that a batch picks the same masters as assigning one order after another"""
+    expected = []
+    other = TestingSessionLocal()
+    try:
+        service = OrderService(other)
+        for order_id in [1, 2, 3, 4]:
+            expected.append(service.assign_master_to_order(order_id)["assignedMaster"]["id"])
+        other.query(Order).update({"status": OrderStatus.NEW, "assigned_master_id": None})
+        other.query(Master).update({"active_load": 0})
+        other.commit()
+    finally:
+        other.close()
+
+    dispatcher = AssignmentDispatcher(TestingSessionLocal, flush_interval_ms=50)
+    results = asyncio.run(submit_all(dispatcher, [1, 2, 3, 4]))
+
+    assert [result["assignedMaster"]["id"] for result in results] == expected
+
+
+def test_errors_are_routed_to_their_caller(db_session):
+    """Test that unknown orders and duplicate requests fail without affecting the rest"""
+    dispatcher = AssignmentDispatcher(TestingSessionLocal, flush_interval_ms=50)
+
+    results = asyncio.run(submit_all(dispatcher, [1, 999, 1, 2]))
+
+    assert results[0]["id"] == 1
+    assert isinstance(results[1], HTTPException) and results[1].status_code == 404
+    assert isinstance(results[2], HTTPException) and results[2].status_code == 409
+    assert results[3]["id"] == 2
+
+
+def test_max_batch_size_flushes_early(db_session):
+    """Test that a full batch is processed without waiting for the flush interval"""
+    dispatcher = RecordingDispatcher(
+        TestingSessionLocal, flush_interval_ms=10_000, max_batch_size=2
+    )
+
+    results = asyncio.run(submit_all(dispatcher, [1, 2, 3, 4]))
+
+    assert dispatcher.batches == [[1, 2], [3, 4]]
+    assert all(result["status"] == "assigned" for result in results)
+
+
+def test_assign_endpoint_uses_dispatcher(db_session, monkeypatch):
+    """
+    Test that POST /orders/{id}/assign goes through the dispatcher when it is
+    enabled, without opening a request session
+    """
+
+    def no_request_session(bind):
+        raise AssertionError("the dispatcher path opened a request session")
+
+    monkeypatch.setattr(order_routes, "async_unit_of_work", no_request_session)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    dispatcher = RecordingDispatcher(TestingSessionLocal, flush_interval_ms=1)
+    try:
+        with TestClient(app) as client:
+            client.portal.call(dispatcher.start)
+            app.state.assignment_dispatcher = dispatcher
+
+            response = client.post("/api/v1/orders/1/assign")
+            assert response.status_code == 200
+            assert response.json()["assignedMaster"]["name"] == "Downtown"
+
+            response = client.post("/api/v1/orders/1/assign")
+            assert response.status_code == 400
+            assert "already assigned" in response.json()["detail"]
+    finally:
+        app.state.assignment_dispatcher = None
+        del app.dependency_overrides[get_db]
+        del app.dependency_overrides[get_engine]
+
+    assert dispatcher.batches == [[1], [1]]
+    assert not dispatcher.running
@@ -0,0 +1,254 @@
+"""
+Tests for the async database path:
+1. Async services read and write the same database as the sync session
+2. Async requests wait on the database without holding a threadpool worker,
+   and move CPU-bound work off the event loop
+3. get_async_db follows get_engine overrides, and NEXA_THREADPOOL_SIZE sizes the pool
+4. In-memory SQLite serves concurrent requests of the sync and async engines
+"""
+import asyncio
+import threading
+
+import anyio.to_thread
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import (
+    create_async_db_engine,
+    create_db_engine,
+    dispose_async_engines,
+    get_db,
+    get_engine,
+)
+from app.main import app
+from app.models import Master, Order
+from app.services.assignment_dispatcher import AssignmentDispatcher
+from app.services.master_service import AsyncMasterService
+from app.services.order_service import AsyncOrderService
+from app.settings import settings
+from app.utils.concurrency import run_cpu_bound
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_async_db.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_engine():
+    return engine
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh database with two masters"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all(
+        [
+            Master(name="Downtown", rating=4.5, is_available=True, geo_lat=40.7128, geo_lng=-74.0),
+            Master(name="Midtown", rating=4.8, is_available=True, geo_lat=40.7589, geo_lng=-74.0),
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(db_session):
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    with TestClient(app) as test_client:
+        yield test_client
+    if get_db in app.dependency_overrides:
+        del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
+
+
+async def with_async_session(url, work):
+    async_engine = create_async_db_engine(url)
+    try:
+        async with AsyncSession(async_engine, autoflush=False) as db:
+            return await work(db)
+    finally:
+        await async_engine.dispose()
+
+
+def test_async_services_share_the_database(db_session):
+    """Test that async writes are visible to sync sessions and vice versa"""
+
+    async def work(db):
+        order = await AsyncOrderService(db).create_order(
+            {"title": "Async", "geo_lat": 40.7128, "geo_lng": -74.0}
+        )
+        assigned = await AsyncOrderService(db).assign_master_to_order(order["id"])
+        await db.commit()
+        masters = await AsyncMasterService(db).get_all_masters()
+        return assigned, masters
+
+    assigned, masters = asyncio.run(with_async_session(SQLALCHEMY_DATABASE_URL, work))
+
+    assert assigned["assignedMasterId"] == 1
+    assert {master["name"]: master["currentLoad"] for master in masters} == {
+        "Downtown": 1,
+        "Midtown": 0,
+    }
+    db_session.expire_all()
+    order = db_session.query(Order).one()
+    assert (order.title, order.assigned_master_id) == ("Async", 1)
+    assert db_session.get(Master, 1).active_load == 1
+
+
+def test_async_queries_do_not_hold_worker_threads(db_session):
+    """Test that async requests complete while every threadpool worker is busy"""
+
+    async def get_master(async_engine):
+        async with AsyncSession(async_engine, autoflush=False) as db:
+            return await AsyncMasterService(db).get_master_by_id(1)
+
+    async def run():
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = 1
+        release = threading.Event()
+        blocked = asyncio.ensure_future(anyio.to_thread.run_sync(release.wait))
+        async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL)
+        try:
+            await asyncio.sleep(0.05)
+            assert limiter.borrowed_tokens == 1
+            return await asyncio.wait_for(
+                asyncio.gather(*(get_master(async_engine) for _ in range(5))), timeout=5
+            )
+        finally:
+            release.set()
+            await blocked
+            await async_engine.dispose()
+
+    results = asyncio.run(run())
+
+    assert [master["name"] for master in results] == ["Downtown"] * 5
+
+
+def test_cpu_bound_work_runs_off_the_event_loop(db_session):
+    """Test that run_cpu_bound uses a worker thread under run_sync, and runs inline elsewhere"""
+
+    async def run():
+        async with AsyncSession(create_async_db_engine(SQLALCHEMY_DATABASE_URL)) as db:
+            worker = await db.run_sync(lambda session: run_cpu_bound(threading.get_ident))
+            await db.bind.dispose()
+        return threading.get_ident(), worker
+
+    loop_thread, worker_thread = asyncio.run(run())
+
+    assert worker_thread != loop_thread
+    assert run_cpu_bound(threading.get_ident) == threading.get_ident()
+
+
+def test_in_memory_database_is_shared_with_async_engine():
+    """Test that sqlite:// maps to one in-memory database for sync and async engines"""
+    sync_engine = create_db_engine("sqlite://")
+    Base.metadata.create_all(bind=sync_engine)
+    try:
+        with sessionmaker(bind=sync_engine)() as db:
+            db.add(Master(name="Memory", rating=4.0, geo_lat=0.0, geo_lng=0.0))
+            db.commit()
+
+        masters = asyncio.run(
+            with_async_session("sqlite://", lambda db: AsyncMasterService(db).get_all_masters())
+        )
+
+        assert [master["name"] for master in masters] == ["Memory"]
+    finally:
+        Base.metadata.drop_all(bind=sync_engine)
+        sync_engine.dispose()
+
+
+@pytest.mark.parametrize("dispatched", [False, True], ids=["async", "async+sync"])
+def test_in_memory_database_serves_concurrent_requests(dispatched):
+    """
+    Test that concurrent create+assign requests all succeed on sqlite://, with the
+    assignments made by async sessions or by the dispatcher's sync sessions
+    """
+    memory_engine = create_db_engine("sqlite://")
+    Base.metadata.create_all(bind=memory_engine)
+    memory_sessions = sessionmaker(autocommit=False, autoflush=False, bind=memory_engine)
+    with memory_sessions() as db:
+        db.add_all(
+            Master(name=f"Master {i}", rating=4.5, is_available=True, geo_lat=40.7, geo_lng=-74.0)
+            for i in range(5)
+        )
+        db.commit()
+
+    async def override_memory_engine():
+        return memory_engine
+
+    async def create_and_assign(client, i):
+        response = await client.post(
+            "/api/v1/orders", json={"title": f"Order {i}", "geo": {"lat": 40.7, "lng": -74.0}}
+        )
+        if response.status_code != 201:
+            return response.status_code
+        return (await client.post(f"/api/v1/orders/{response.json()['id']}/assign")).status_code
+
+    async def run():
+        dispatcher = AssignmentDispatcher(memory_sessions, flush_interval_ms=1)
+        if dispatched:
+            await dispatcher.start()
+            app.state.assignment_dispatcher = dispatcher
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(*(create_and_assign(client, i) for i in range(50)))
+        finally:
+            app.state.assignment_dispatcher = None
+            await dispatcher.stop()
+            await dispose_async_engines()
+
+    app.dependency_overrides[get_engine] = override_memory_engine
+    try:
+        statuses = asyncio.run(run())
+        with memory_sessions() as db:
+            assert db.query(Order).filter(Order.assigned_master_id.isnot(None)).count() == 50
+    finally:
+        del app.dependency_overrides[get_engine]
+        Base.metadata.drop_all(bind=memory_engine)
+        memory_engine.dispose()
+
+    assert statuses == [200] * 50
+
+
+def test_async_routes_follow_get_engine_override(client, db_session):
+    """Test that async handlers write to the database get_engine is overridden with"""
+    response = client.post(
+        "/api/v1/orders", json={"title": "Routed", "geo": {"lat": 40.7589, "lng": -74.0}}
+    )
+    assert response.status_code == 201
+
+    response = client.post(f"/api/v1/orders/{response.json()['id']}/assign")
+    assert response.status_code == 200
+    assert response.json()["assignedMasterId"] == 2
+
+    db_session.expire_all()
+    assert db_session.query(Order).one().assigned_master_id == 2
+
+
+def test_threadpool_size_follows_settings(client):
+    """Test that startup sizes the worker threadpool from NEXA_THREADPOOL_SIZE"""
+    total_tokens = client.portal.call(
+        lambda: anyio.to_thread.current_default_thread_limiter().total_tokens
+    )
+    assert total_tokens == settings.threadpool_size
@@ -0,0 +1,163 @@
+"""
+Tests for batch assignment - the min-cost solver and POST /orders/assign-batch:
+1. The solver finds the optimal matching on rectangular matrices
+2. Batch assignment beats greedy arrival-order assignment
+3. Per-master capacity is respected and everything commits together
+"""
+import itertools
+import random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import get_db, get_engine
+from app.main import app
+from app.models import Master
+from app.utils.assignment import solve_min_cost_assignment
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_batch_assignment.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_engine():
+    return engine
+
+
+@pytest.fixture(scope="function")
+def client():
+    """Create test client with two masters on the same meridian"""
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    Base.metadata.create_all(bind=engine)
+
+    db = TestingSessionLocal()
+    db.add_all(
+        [
+            Master(name="South", rating=4.5, is_available=True, geo_lat=40.700, geo_lng=-74.0),
+            Master(name="North", rating=4.5, is_available=True, geo_lat=40.710, geo_lng=-74.0),
+            Master(name="Offline", rating=5.0, is_available=False, geo_lat=40.704, geo_lng=-74.0),
+        ]
+    )
+    db.commit()
+    db.close()
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+    Base.metadata.drop_all(bind=engine)
+    if get_db in app.dependency_overrides:
+        del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
+
+
+def create_order(client, lat, lng=-74.0):
+    response = client.post(
+        "/api/v1/orders", json={"title": "Order", "geo": {"lat": lat, "lng": lng}}
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def brute_force_cost(cost):
+    n_rows, n_cols = cost.shape
+    if n_rows <= n_cols:
+        return min(
+            sum(cost[i, cols[i]] for i in range(n_rows))
+            for cols in itertools.permutations(range(n_cols), n_rows)
+        )
+    return min(
+        sum(cost[rows[j], j] for j in range(n_cols))
+        for rows in itertools.permutations(range(n_rows), n_cols)
+    )
+
+
+def test_solver_matches_brute_force():
+    """Test that the solver is optimal for square and rectangular matrices"""
+    rng = random.Random(3)
+    for _ in range(100):
+        n_rows, n_cols = rng.randint(1, 5), rng.randint(1, 5)
+        cost = np.array([[rng.randint(-5, 20) for _ in range(n_cols)] for _ in range(n_rows)])
+
+        col_for_row = solve_min_cost_assignment(cost)
+
+        matched = col_for_row[col_for_row >= 0]
+        assert len(matched) == min(n_rows, n_cols)
+        assert len(set(matched.tolist())) == len(matched)
+        total = sum(cost[row, col] for row, col in enumerate(col_for_row) if col >= 0)
+        assert total == brute_force_cost(cost)
+
+
+def test_batch_assignment_is_globally_optimal(client):
+    """Test that the batch solve avoids the greedy arrival-order trap"""
+    # First order is slightly closer to South, second order is only close to South
+    first = create_order(client, 40.704)
+    second = create_order(client, 40.690)
+
+    response = client.post(
+        "/api/v1/orders/assign-batch", json={"orderIds": [first, second], "maxLoad": 1}
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["unassigned"] == []
+    assert result["solveMs"] >= 0
+    masters_by_order = {item["orderId"]: item["masterId"] for item in result["assigned"]}
+    assert masters_by_order == {first: 2, second: 1}
+
+    order = client.get(f"/api/v1/orders/{first}").json()
+    assert order["status"] == "assigned"
+    assert order["assignedMaster"]["name"] == "North"
+
+
+def test_batch_assignment_respects_capacity(client):
+    """Test that masters never exceed maxLoad and leftover orders are reported"""
+    order_ids = [create_order(client, 40.700 + i * 0.001) for i in range(5)]
+
+    response = client.post(
+        "/api/v1/orders/assign-batch", json={"orderIds": order_ids, "maxLoad": 2}
+    )
+
+    result = response.json()
+    assert len(result["assigned"]) == 4
+    assert [item["reason"] for item in result["unassigned"]] == ["no_capacity"]
+
+    masters = client.get("/api/v1/masters").json()
+    assert {master["name"]: master["currentLoad"] for master in masters} == {
+        "South": 2,
+        "North": 2,
+        "Offline": 0,
+    }
+
+
+def test_batch_assignment_defaults_to_all_new_orders(client):
+    """Test that omitting orderIds assigns every NEW order and skips assigned ones"""
+    first = create_order(client, 40.700)
+    second = create_order(client, 40.710)
+    client.post(f"/api/v1/orders/{first}/assign")
+
+    response = client.post("/api/v1/orders/assign-batch", json={})
+    assert [item["orderId"] for item in response.json()["assigned"]] == [second]
+
+    response = client.post("/api/v1/orders/assign-batch", json={"orderIds": [first, second, 999]})
+    result = response.json()
+    assert result["assigned"] == []
+    assert {item["orderId"]: item["reason"] for item in result["unassigned"]} == {
+        first: "already_assigned",
+        second: "already_assigned",
+        999: "not_found",
+    }
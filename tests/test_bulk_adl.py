@@ -0,0 +1,154 @@
+"""
+Tests for bulk ADL ingestion - POST /orders/adl/bulk looks up every order
+with one query, inserts the valid items with one statement and reports a
+result per item.
+"""
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import get_async_engine, get_db, get_engine
+from app.main import app
+from app.models import ADLMedia, Master, Order
+from app.models.order import OrderStatus
+from app.services.adl_service import MAX_BULK_ITEMS
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_bulk_adl.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_engine():
+    return engine
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh database with a master and three assigned orders"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add(Master(name="Field", rating=4.5, is_available=True, geo_lat=40.7, geo_lng=-74.0))
+    session.commit()
+    session.add_all(
+        [
+            Order(
+                title=f"Order {i}",
+                status=OrderStatus.ASSIGNED,
+                geo_lat=40.7,
+                geo_lng=-74.0,
+                assigned_master_id=1,
+            )
+            for i in range(3)
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(db_session):
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    with TestClient(app) as test_client:
+        yield test_client
+    if get_db in app.dependency_overrides:
+        del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements the async request path runs against the test database"""
+    statements = []
+    target = get_async_engine(engine).sync_engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+def adl_item(order_id, **overrides):
+    item = {
+        "orderId": order_id,
+        "type": "photo",
+        "url": f"/uploads/order_{order_id}.jpg",
+        "gps": {"lat": 40.7128, "lng": -74.0060},
+        "capturedAt": "2025-10-16T14:30:00",
+    }
+    item.update(overrides)
+    return item
+
+
+def test_bulk_attach_reports_per_item_results(client, db_session):
+    """Test that valid items are attached and invalid ones report the single-attach error"""
+    items = [
+        adl_item(1),
+        adl_item(99),
+        adl_item(2, gps={"lng": -74.0060}),
+        adl_item(3, capturedAt=None),
+        adl_item(1, type="video", url="/uploads/order_1.mp4", meta={"device": "phone"}),
+    ]
+
+    with count_queries() as statements:
+        response = client.post("/api/v1/orders/adl/bulk", json={"items": items})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["attached"], body["failed"]) == (2, 3)
+    results = body["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert [result["status"] for result in results] == [201, 404, 400, 400, 201]
+    assert results[1]["detail"] == "Order with id '99' not found"
+    assert results[2]["detail"] == "GPS coordinates (gps_lat, gps_lng) are required"
+    assert results[3]["detail"] == "Timestamp (captured_at) is required in ISO format"
+    assert results[4]["adl"]["type"] == "video"
+    assert results[4]["adl"]["meta"] == {"device": "phone"}
+
+    # One IN query for the orders, one INSERT for the media
+    assert len(statements) == 2
+    assert statements[1].startswith("INSERT INTO adl_media")
+
+    stored = {adl.id: adl for adl in db_session.query(ADLMedia).all()}
+    assert sorted(stored) == sorted(results[i]["adl"]["id"] for i in (0, 4))
+    for i in (0, 4):
+        assert stored[results[i]["adl"]["id"]].to_dict() == results[i]["adl"]
+
+    # Attached media count towards completion like single attachments
+    assert client.post("/api/v1/orders/1/complete").status_code == 200
+    assert client.post("/api/v1/orders/2/complete").status_code == 400
+
+
+def test_bulk_attach_rejects_malformed_requests(client, db_session):
+    """Test that malformed or oversized uploads are rejected as a whole"""
+    response = client.post("/api/v1/orders/adl/bulk", json={"items": [adl_item(1, type="audio")]})
+    assert response.status_code == 422
+
+    response = client.post("/api/v1/orders/adl/bulk", json={"items": []})
+    assert response.status_code == 422
+
+    items = [adl_item(1)] * (MAX_BULK_ITEMS + 1)
+    response = client.post("/api/v1/orders/adl/bulk", json={"items": items})
+    assert response.status_code == 400
+
+    assert db_session.query(ADLMedia).count() == 0
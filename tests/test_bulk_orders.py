@@ -0,0 +1,143 @@
+"""
+Tests for bulk order creation - POST /orders/bulk validates every order,
+inserts them with one statement in one transaction, and can assign masters.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import get_db, get_engine
+from app.main import app
+from app.models import Master, Order
+from app.models.order import OrderStatus
+from app.services.order_service import MAX_BATCH_SIZE
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_bulk_orders.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_engine():
+    return engine
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh database with two masters"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all(
+        [
+            Master(name="South", rating=4.5, is_available=True, geo_lat=40.700, geo_lng=-74.0),
+            Master(name="North", rating=4.5, is_available=True, geo_lat=40.710, geo_lng=-74.0),
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(db_session):
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    with TestClient(app) as test_client:
+        yield test_client
+    if get_db in app.dependency_overrides:
+        del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
+
+
+def order_payload(i, lat=40.700):
+    return {
+        "title": f"Order {i}",
+        "customer": {"name": f"Customer {i}"},
+        "geo": {"lat": lat, "lng": -74.0},
+    }
+
+
+def test_bulk_create_inserts_with_one_statement(client, db_session):
+    """Test that all orders are inserted by one INSERT, with IDs in request order"""
+    inserts = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.post(
+            "/api/v1/orders/bulk", json={"orders": [order_payload(i) for i in range(50)]}
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert response.status_code == 201
+    assert len(inserts) == 1
+    order_ids = response.json()["orderIds"]
+    assert "assignment" not in response.json()
+
+    orders = {order.id: order for order in db_session.query(Order).all()}
+    assert [orders[order_id].title for order_id in order_ids] == [f"Order {i}" for i in range(50)]
+    first = orders[order_ids[0]]
+    assert first.status == OrderStatus.NEW
+    assert first.customer == {"name": "Customer 0", "phone": None}
+    assert first.created_at is not None and first.assigned_master_id is None
+
+
+def test_bulk_create_is_all_or_nothing(client, db_session):
+    """Test that one invalid order rejects the whole request before anything is written"""
+    orders = [order_payload(0), {"title": "No location"}, order_payload(2)]
+
+    response = client.post("/api/v1/orders/bulk", json={"orders": orders})
+
+    assert response.status_code == 422
+    assert db_session.query(Order).count() == 0
+
+
+def test_bulk_create_limits(client, db_session):
+    """Test that empty and oversized batches are rejected"""
+    response = client.post("/api/v1/orders/bulk", json={"orders": []})
+    assert response.status_code == 422
+
+    orders = [order_payload(i) for i in range(MAX_BATCH_SIZE + 1)]
+    response = client.post("/api/v1/orders/bulk", json={"orders": orders})
+    assert response.status_code == 400
+    assert db_session.query(Order).count() == 0
+
+
+def test_bulk_create_with_auto_assign(client, db_session):
+    """Test that autoAssign assigns the new orders within the master capacity"""
+    orders = [order_payload(i, lat=40.700 + i * 0.001) for i in range(3)]
+
+    response = client.post(
+        "/api/v1/orders/bulk", json={"orders": orders, "autoAssign": True, "maxLoad": 1}
+    )
+
+    assert response.status_code == 201
+    body = response.json()
+    assignment = body["assignment"]
+    assert len(assignment["assigned"]) == 2
+    [unassigned] = assignment["unassigned"]
+    assert unassigned["reason"] == "no_capacity" and unassigned["orderId"] in body["orderIds"]
+
+    db_session.expire_all()
+    assigned = {order.id: order.assigned_master_id for order in db_session.query(Order).all()}
+    assert sorted(master_id for master_id in assigned.values() if master_id) == [1, 2]
+    assert [master.active_load for master in db_session.query(Master).order_by(Master.id)] == [
+        1,
+        1,
+    ]
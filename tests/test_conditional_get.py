@@ -0,0 +1,199 @@
+"""
+Tests for conditional GETs - GET /orders/{id} and GET /masters return strong
+ETags, answer a matching If-None-Match with an empty 304, and change their
+ETag whenever the response would change.
+"""
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import get_async_engine, get_db, get_engine
+from app.main import app
+from app.models import Master
+from app.models.order import adjust_active_load
+from app.repositories import master_index
+from app.repositories.master_repository import MasterRepository
+from app.settings import settings
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_conditional_get.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_engine():
+    return engine
+
+
+@pytest.fixture(scope="function", params=[True, False], ids=["registry", "sql"])
+def db_session(request, monkeypatch):
+    """Create a fresh database with three available masters"""
+    monkeypatch.setattr(settings, "master_registry_enabled", request.param)
+    master_index.reset()
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all(
+        [
+            Master(name=f"Master {i}", rating=4.5, is_available=True, geo_lat=40.7, geo_lng=-74.0)
+            for i in range(3)
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(db_session):
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    with TestClient(app) as test_client:
+        yield test_client
+    if get_db in app.dependency_overrides:
+        del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements the async request path runs against the test database"""
+    statements = []
+    target = get_async_engine(engine).sync_engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+def create_order(client):
+    response = client.post(
+        "/api/v1/orders", json={"title": "Fix sink", "geo": {"lat": 40.7, "lng": -74.0}}
+    )
+    return response.json()["id"]
+
+
+def attach_adl(client, order_id):
+    adl = {
+        "type": "photo",
+        "url": f"/uploads/order_{order_id}.jpg",
+        "gps": {"lat": 40.7128, "lng": -74.0060},
+        "capturedAt": "2025-10-16T14:30:00",
+    }
+    assert client.post(f"/api/v1/orders/{order_id}/adl", json=adl).status_code == 200
+
+
+def test_order_not_modified_without_loading_relations(client, db_session):
+    """Test that a matching If-None-Match gets an empty 304 after a single query"""
+    order_id = create_order(client)
+    attach_adl(client, order_id)
+    response = client.get(f"/api/v1/orders/{order_id}")
+    etag = response.headers["ETag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    with count_queries() as statements:
+        response = client.get(f"/api/v1/orders/{order_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert len(statements) == 1
+
+    for header in (f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get(f"/api/v1/orders/{order_id}", headers={"If-None-Match": header})
+        assert response.status_code == 304
+
+    response = client.get(f"/api/v1/orders/{order_id}", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+    assert response.json()["id"] == order_id
+    assert client.get("/api/v1/orders/999", headers={"If-None-Match": "*"}).status_code == 404
+
+
+def test_order_etag_follows_order_master_and_media(client, db_session):
+    """Test that the ETag changes with the order, its ADL media and its master"""
+    order_id = create_order(client)
+    etags = [client.get(f"/api/v1/orders/{order_id}").headers["ETag"]]
+
+    attach_adl(client, order_id)
+    etags.append(client.get(f"/api/v1/orders/{order_id}").headers["ETag"])
+
+    master_id = client.post(f"/api/v1/orders/{order_id}/assign").json()["assignedMasterId"]
+    etags.append(client.get(f"/api/v1/orders/{order_id}").headers["ETag"])
+    assert len(set(etags)) == 3
+
+    # The order renders its master, so editing the master changes the order's ETag too
+    MasterRepository(db_session).update(master_id, {"name": "Renamed"})
+    db_session.commit()
+    response = client.get(f"/api/v1/orders/{order_id}", headers={"If-None-Match": etags[-1]})
+    assert response.status_code == 200
+    assert response.json()["assignedMaster"]["name"] == "Renamed"
+    assert response.headers["ETag"] not in etags
+
+
+def test_master_listing_not_modified_until_a_master_changes(client, db_session):
+    """Test GET /masters 304s while its page is unchanged, per page and across writes"""
+    response = client.get("/api/v1/masters")
+    etag = response.headers["ETag"]
+    response = client.get("/api/v1/masters", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    first_page = client.get("/api/v1/masters", params={"limit": 2})
+    second_page = client.get(
+        "/api/v1/masters",
+        params={"limit": 2, "cursor": first_page.headers["X-Next-Cursor"]},
+    )
+    assert len({etag, first_page.headers["ETag"], second_page.headers["ETag"]}) == 3
+
+    # Assigning an order raises one master's currentLoad
+    client.post(f"/api/v1/orders/{create_order(client)}/assign")
+    response = client.get("/api/v1/masters", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert sorted(master["currentLoad"] for master in response.json()) == [0, 0, 1]
+
+
+def test_master_listing_etag_sees_writes_of_other_processes(client, db_session):
+    """Test that the masters ETag and body follow masters.version, which the registry misses"""
+    etag = client.get("/api/v1/masters").headers["ETag"]
+
+    # A Core write on its own connection, like one made by another worker process
+    with engine.begin() as connection:
+        connection.execute(update(Master).where(Master.id == 1).values(rating=4.9))
+
+    response = client.get("/api/v1/masters", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    # The body is read like the ETag, not from a registry that missed the write
+    assert response.json()[0]["rating"] == 4.9
+
+
+def test_master_version_bumps_on_every_update(db_session):
+    """Test that ORM updates and Core active_load updates both bump masters.version"""
+    repository = MasterRepository(db_session)
+    assert repository.get_by_id(1).version == 1
+
+    repository.update(1, {"rating": 4.9})
+    db_session.commit()
+    assert repository.get_by_id(1).version == 2
+
+    adjust_active_load(db_session.connection(), 1, 1)
+    db_session.commit()
+    assert repository.get_by_id(1).version == 3
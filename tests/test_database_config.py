@@ -0,0 +1,185 @@
+"""
+Tests for the database engine factory:
+1. SQLite connections get the WAL / busy-timeout PRAGMAs, so readers keep
+   working while a write is in flight
+2. URL, pool, statement timeout and echo come from NEXA_* settings, for file
+   SQLite, in-memory SQLite and server databases alike
+"""
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.database.base import Base
+from app.database.config import create_db_engine, engine_options, sqlite_pragmas
+from app.models import Master
+from app.settings import Settings
+
+DATABASE_FILE = "./test_database_config.db"
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_FILE}"
+
+
+@pytest.fixture
+def database_file():
+    """Remove the database file (and WAL side files) around each test"""
+
+    def remove():
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(DATABASE_FILE + suffix):
+                os.remove(DATABASE_FILE + suffix)
+
+    remove()
+    yield SQLALCHEMY_DATABASE_URL
+    remove()
+
+
+def create_table(engine):
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+
+
+def test_sqlite_profile_is_applied_to_every_connection(database_file):
+    """Test that each pooled connection reports the configured PRAGMA values"""
+    engine = create_db_engine(database_file)
+    connections = [engine.connect() for _ in range(3)]
+    try:
+        for connection in connections:
+            pragma = connection.exec_driver_sql
+            assert pragma("PRAGMA journal_mode").scalar() == "wal"
+            assert pragma("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert pragma("PRAGMA busy_timeout").scalar() == 5000
+            assert pragma("PRAGMA cache_size").scalar() == -64 * 1024
+            assert pragma("PRAGMA temp_store").scalar() == 2  # MEMORY
+    finally:
+        for connection in connections:
+            connection.close()
+        engine.dispose()
+
+
+def test_sqlite_profile_follows_settings(database_file):
+    """Test that the PRAGMAs come from NEXA_SQLITE_* settings"""
+    config = Settings(sqlite_journal_mode="DELETE", sqlite_busy_timeout_ms=250)
+    engine = create_db_engine(database_file, sqlite_pragmas(config))
+    try:
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
+            assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 250
+    finally:
+        engine.dispose()
+
+
+def test_wal_writer_commits_while_reader_is_open(database_file):
+    """Test that a long read transaction no longer blocks writers"""
+    pragmas = {**sqlite_pragmas(), "busy_timeout": 100}
+    engine = create_db_engine(database_file, pragmas)
+    create_table(engine)
+    try:
+        with engine.connect() as reader, engine.connect() as writer:
+            reader.exec_driver_sql("BEGIN")
+            assert reader.exec_driver_sql("SELECT COUNT(*) FROM items").scalar() == 0
+
+            writer.exec_driver_sql("INSERT INTO items DEFAULT VALUES")
+            writer.commit()
+
+            # The reader keeps its snapshot until its transaction ends
+            assert reader.exec_driver_sql("SELECT COUNT(*) FROM items").scalar() == 0
+            reader.exec_driver_sql("COMMIT")
+            assert reader.exec_driver_sql("SELECT COUNT(*) FROM items").scalar() == 1
+    finally:
+        engine.dispose()
+
+
+def test_rollback_journal_writer_is_locked_out_by_reader(database_file):
+    """Test the failure WAL avoids: with a rollback journal the commit times out"""
+    pragmas = {**sqlite_pragmas(), "journal_mode": "DELETE", "busy_timeout": 100}
+    engine = create_db_engine(database_file, pragmas)
+    create_table(engine)
+    try:
+        with engine.connect() as reader, engine.connect() as writer:
+            reader.exec_driver_sql("BEGIN")
+            reader.exec_driver_sql("SELECT COUNT(*) FROM items").scalar()
+
+            writer.exec_driver_sql("INSERT INTO items DEFAULT VALUES")
+            with pytest.raises(OperationalError, match="database is locked"):
+                writer.commit()
+            writer.rollback()
+            reader.exec_driver_sql("COMMIT")
+    finally:
+        engine.dispose()
+
+
+def test_engine_follows_environment(database_file, monkeypatch):
+    """Test that a deployment is configured through NEXA_* variables alone"""
+    monkeypatch.setenv("NEXA_DATABASE_URL", database_file)
+    monkeypatch.setenv("NEXA_DB_POOL_SIZE", "3")
+    monkeypatch.setenv("NEXA_DB_MAX_OVERFLOW", "2")
+    monkeypatch.setenv("NEXA_DB_POOL_RECYCLE_S", "60")
+    monkeypatch.setenv("NEXA_DB_ECHO", "true")
+
+    engine = create_db_engine(config=Settings())
+    try:
+        assert str(engine.url) == database_file
+        assert isinstance(engine.pool, QueuePool)
+        assert engine.pool.size() == 3
+        assert engine.pool._max_overflow == 2
+        assert engine.pool._recycle == 60
+        assert engine.echo is True
+    finally:
+        engine.dispose()
+
+
+def test_in_memory_sqlite_is_shared_between_sessions():
+    """Test that sqlite:// sessions take turns on one connection and see the same data"""
+    engine = create_db_engine("sqlite://")
+    assert isinstance(engine.pool, QueuePool)
+    assert (engine.pool.size(), engine.pool._max_overflow) == (1, 0)
+    SessionLocal = sessionmaker(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        with SessionLocal() as writer:
+            writer.add(Master(name="Memory", rating=4.0, geo_lat=0.0, geo_lng=0.0))
+            writer.commit()
+        with SessionLocal() as reader:
+            assert [master.name for master in reader.query(Master)] == ["Memory"]
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def test_server_database_options():
+    """Test the pool options a server database URL gets, without connecting to one"""
+    config = Settings(
+        db_pool_size=20, db_max_overflow=5, db_pool_recycle_s=300, db_statement_timeout_ms=1500
+    )
+
+    options = engine_options(make_url("postgresql+psycopg2://nexa@db/nexa"), config)
+
+    assert options == {
+        "echo": False,
+        "pool_pre_ping": True,
+        "pool_size": 20,
+        "max_overflow": 5,
+        "pool_recycle": 300,
+        "connect_args": {"options": "-c statement_timeout=1500"},
+    }
+
+
+def test_sqlite_statement_timeout(database_file):
+    """Test that SQLite statements exceeding db_statement_timeout_ms are interrupted"""
+    engine = create_db_engine(database_file, config=Settings(db_statement_timeout_ms=50))
+    slow_query = text(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) "
+        "SELECT COUNT(*) FROM (SELECT i FROM n LIMIT 100000000)"
+    )
+    try:
+        with engine.connect() as connection:
+            with pytest.raises(OperationalError, match="interrupted"):
+                connection.execute(slow_query)
+            # Later statements get a fresh deadline
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+    finally:
+        engine.dispose()
@@ -0,0 +1,144 @@
+"""
+Tests for the opt-in fast JSON path (NEXA_FAST_JSON_ENABLED) - responses
+rendered with orjson must match the default response_model path exactly.
+"""
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import get_db, get_engine
+from app.main import app
+from app.models import Master, Order
+from app.repositories import master_index
+from app.settings import settings
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_fast_json.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_engine():
+    return engine
+
+
+@pytest.fixture(scope="function")
+def client():
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    with TestClient(app) as test_client:
+        yield test_client
+    if get_db in app.dependency_overrides:
+        del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
+
+
+def run_workflow(client):
+    """Run every JSON endpoint on a fresh database, returning the responses in order"""
+    master_index.reset()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all(
+        [
+            Master(name="South", rating=4.5, is_available=True, geo_lat=40.70, geo_lng=-74.0),
+            Master(name="North", rating=4.8, is_available=True, geo_lat=40.75, geo_lng=-74.0),
+        ]
+    )
+    session.commit()
+    session.close()
+
+    order = {"title": "Fix sink", "customer": {"name": "Jane"}, "geo": {"lat": 40.7, "lng": -74}}
+    adl = {
+        "type": "photo",
+        "url": "/photo.jpg",
+        "gps": {"lat": 40.7, "lng": -74.0},
+        "capturedAt": "2025-10-16T14:30:00",
+        "meta": {"device": "phone"},
+    }
+    return [
+        client.post("/api/v1/orders", json=order),
+        client.post("/api/v1/orders/bulk", json={"orders": [order] * 3}),
+        client.get("/api/v1/orders", params={"limit": 2}),
+        client.get("/api/v1/orders/1/candidates", params={"k": 2}),
+        client.post("/api/v1/orders/1/assign"),
+        client.post("/api/v1/orders/1/adl", json=adl),
+        client.post("/api/v1/orders/adl/bulk", json={"items": [{**adl, "orderId": 2}]}),
+        client.post("/api/v1/orders/1/complete"),
+        client.get("/api/v1/orders/1"),
+        client.post("/api/v1/orders/assign-batch", json={"orderIds": [2, 3, 99]}),
+        client.get("/api/v1/masters", params={"limit": 1}),
+        client.get("/api/v1/masters/2"),
+        client.get("/api/v1/orders/99"),
+    ]
+
+
+VOLATILE_KEYS = {"createdAt", "updatedAt", "solveMs", "nextCursor"}
+
+
+def normalized(body):
+    """Replace the values of timestamps and timings, which differ between runs, by their type"""
+    if isinstance(body, dict):
+        return {
+            key: type(value).__name__ if key in VOLATILE_KEYS else normalized(value)
+            for key, value in body.items()
+        }
+    if isinstance(body, list):
+        return [normalized(item) for item in body]
+    return body
+
+
+def test_fast_json_matches_default_responses(client, monkeypatch):
+    """Test that every endpoint returns the same status, headers and JSON on both paths"""
+    monkeypatch.setattr(settings, "fast_json_enabled", False)
+    default = run_workflow(client)
+    monkeypatch.setattr(settings, "fast_json_enabled", True)
+    fast = run_workflow(client)
+
+    for expected, response in zip(default, fast):
+        request = f"{response.request.method} {response.request.url}"
+        assert response.status_code == expected.status_code, request
+        assert response.headers["content-type"] == "application/json", request
+        assert ("X-Next-Cursor" in response.headers) == ("X-Next-Cursor" in expected.headers)
+        assert normalized(response.json()) == normalized(expected.json()), request
+
+    orders_page = fast[2]
+    assert orders_page.headers["X-Next-Cursor"] == orders_page.json()["nextCursor"]
+    assert [response.status_code for response in fast][:2] == [201, 201]
+    assert fast[-1].status_code == 404
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_fast_json_renders_timestamps_like_isoformat(client, monkeypatch):
+    """Test that datetimes handed to orjson come out as the isoformat() strings of the default"""
+    master_index.reset()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    created = datetime(2025, 10, 16, 14, 30, 0, 120)
+    session.add(Order(title="Fix sink", geo_lat=40.7, geo_lng=-74.0, created_at=created))
+    session.commit()
+    order = session.get(Order, 1)
+    monkeypatch.setattr(settings, "fast_json_enabled", True)
+    assert order.to_dict()["createdAt"] == created
+    session.close()
+
+    fast = client.get("/api/v1/orders/1").json()
+    monkeypatch.setattr(settings, "fast_json_enabled", False)
+    default = client.get("/api/v1/orders/1").json()
+    assert fast == default
+    assert fast["createdAt"] == "2025-10-16T14:30:00.000120"
+    Base.metadata.drop_all(bind=engine)
@@ -1,4 +1,15 @@
-from app.utils.distance import haversine_distance
+import random
+
+import numpy as np
+
+from app.utils.distance import haversine_distance, haversine_distance_matrix, haversine_distances
+
+
+def random_points(count, seed=7):
+    rng = random.Random(seed)
+    lats = [rng.uniform(-90.0, 90.0) for _ in range(count)]
+    lngs = [rng.uniform(-180.0, 180.0) for _ in range(count)]
+    return lats, lngs
 
 
 def test_haversine_same_location():
@@ -42,3 +53,49 @@ def test_haversine_symmetry():
     distance2 = haversine_distance(lat2, lng2, lat1, lng1)
 
     assert distance1 == distance2
+
+
+def test_batch_haversine_matches_scalar():
+    """Test that one-to-many distances match the scalar function within 1e-9 km"""
+    lats, lngs = random_points(500)
+    expected = [haversine_distance(40.7128, -74.0060, lat, lng) for lat, lng in zip(lats, lngs)]
+
+    distances = haversine_distances(40.7128, -74.0060, lats, lngs)
+
+    assert distances.dtype == np.float64
+    assert np.allclose(distances, expected, rtol=0, atol=1e-9)
+
+
+def test_batch_haversine_float32_tolerance():
+    """Test that float32 mode stays within the documented 1e-2 km tolerance"""
+    lats, lngs = random_points(500)
+    expected = [haversine_distance(40.7128, -74.0060, lat, lng) for lat, lng in zip(lats, lngs)]
+
+    distances = haversine_distances(40.7128, -74.0060, lats, lngs, dtype=np.float32)
+
+    expected = np.array(expected)
+    assert distances.dtype == np.float32
+    # Near-antipodal pairs have a looser bound
+    regular = expected < 18000
+    assert np.allclose(distances[regular], expected[regular], rtol=0, atol=1e-2)
+    assert np.allclose(distances, expected, rtol=0, atol=0.2)
+
+
+def test_haversine_distance_matrix():
+    """Test that the many-to-many matrix matches pairwise scalar distances"""
+    lats1, lngs1 = random_points(20, seed=1)
+    lats2, lngs2 = random_points(30, seed=2)
+
+    matrix = haversine_distance_matrix(lats1, lngs1, lats2, lngs2)
+
+    assert matrix.shape == (20, 30)
+    for i in range(20):
+        for j in range(30):
+            expected = haversine_distance(lats1[i], lngs1[i], lats2[j], lngs2[j])
+            assert abs(matrix[i, j] - expected) <= 1e-9
+
+
+def test_batch_haversine_empty_input():
+    """Test that an empty set of points yields an empty result"""
+    assert haversine_distances(40.7128, -74.0060, [], []).shape == (0,)
+    assert haversine_distance_matrix([40.7128], [-74.0060], [], []).shape == (1, 0)
@@ -5,13 +5,15 @@ Unit tests for master assignment algorithm - tests tie-break logic:
 3. Lower load wins when ratings are close
 """
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from app.database.base import Base
 from app.models import Master, Order
 from app.models.order import OrderStatus
+from app.repositories.master_repository import MasterRepository
 from app.services.master_service import MasterService
+from app.settings import settings
 
 # Create test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test_master_assignment.db"
@@ -278,3 +280,106 @@ def test_assignment_complete_tiebreak_scenario(db_session):
     assert selected_master.name != "Far High Rating Low Load"
     # When distance and rating are equal, lower load wins
     assert selected_master.name == "Close High Rating Low Load"
+
+
+@pytest.fixture
+def without_master_registry(monkeypatch):
+    """Disable the master registry, so candidates come from bounding-box SQL queries"""
+    monkeypatch.setattr(settings, "master_registry_enabled", False)
+
+
+def test_bounding_box_candidates_touch_few_rows(db_session, without_master_registry):
+    """Test that the widening radius stops at the first box holding a master"""
+    masters = [
+        Master(name="Near", rating=4.0, is_available=True, geo_lat=40.7350, geo_lng=-74.0060),
+        Master(name="Far", rating=5.0, is_available=True, geo_lat=41.1000, geo_lng=-74.0060),
+        Master(name="Very Far", rating=5.0, is_available=True, geo_lat=45.0000, geo_lng=-74.0060),
+    ]
+    db_session.add_all(masters)
+    db_session.commit()
+
+    service = MasterService(db_session)
+    candidates = service._masters_within_widening_radius(40.7128, -74.0060)
+
+    assert [master.name for master in candidates] == ["Near"]
+    selected = db_session.get(Master, service.find_best_master(40.7128, -74.0060))
+    assert selected.name == "Near"
+
+
+def test_bounding_box_corner_does_not_hide_nearer_master(db_session, without_master_registry):
+    """Test that a master in the box corner but outside the radius triggers widening"""
+    masters = [
+        # ~2.5 km away diagonally: inside the 2 km box, outside the 2 km circle
+        Master(name="Corner", rating=5.0, is_available=True, geo_lat=40.7287, geo_lng=-73.9850),
+        # ~2.2 km due north: outside the 2 km box
+        Master(name="North", rating=4.0, is_available=True, geo_lat=40.7326, geo_lng=-74.0060),
+    ]
+    db_session.add_all(masters)
+    db_session.commit()
+
+    service = MasterService(db_session)
+    selected = db_session.get(Master, service.find_best_master(40.7128, -74.0060))
+
+    assert selected.name == "North"
+
+
+def test_bounding_box_across_antimeridian(db_session, without_master_registry):
+    """Test that boxes wrapping around longitude 180 still find masters"""
+    masters = [
+        Master(name="East", rating=4.0, is_available=True, geo_lat=0.0, geo_lng=-179.99),
+        Master(name="Distant", rating=5.0, is_available=True, geo_lat=0.0, geo_lng=170.0),
+    ]
+    db_session.add_all(masters)
+    db_session.commit()
+
+    service = MasterService(db_session)
+    selected = db_session.get(Master, service.find_best_master(0.0, 179.99))
+
+    assert selected.name == "East"
+
+
+def test_bounding_box_query_uses_geo_index(db_session):
+    """Test that SQLite plans the candidate query on the composite geo index"""
+    executed = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        MasterRepository(db_session).get_available_masters_near(40.7128, -74.0060, 5.0)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    statement, parameters = executed[-1]
+    plan = db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+
+    assert any("ix_masters_available_geo" in row[-1] for row in plan.fetchall())
+
+
+@pytest.mark.parametrize("spatial_index", [True, False])
+def test_rank_candidates_matches_full_sort(db_session, monkeypatch, spatial_index):
+    """Test that top-k heap selection returns the same prefix as a full sort"""
+    monkeypatch.setattr(settings, "master_registry_enabled", spatial_index)
+    masters = [
+        Master(
+            name=f"Master {i}",
+            rating=4.0 + (i % 4) / 4,
+            is_available=i % 5 != 0,
+            # Pairs of masters share a location so the k-th place is often a tie
+            geo_lat=40.70 + (i // 2) * 0.01,
+            geo_lng=-74.00,
+        )
+        for i in range(40)
+    ]
+    db_session.add_all(masters)
+    db_session.commit()
+
+    service = MasterService(db_session)
+    everything = service.rank_candidates(40.7128, -74.0060, 40)
+    expected = [candidate["master"].id for candidate in everything]
+    assert len(expected) == 32
+
+    for k in (1, 3, 4, 10):
+        ranked = service.rank_candidates(40.7128, -74.0060, k)
+        assert [candidate["master"].id for candidate in ranked] == expected[:k]
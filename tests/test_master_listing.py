@@ -0,0 +1,149 @@
+"""
+Tests for the master listing - GET /masters filters masters, pages through
+them with an id cursor (X-Next-Cursor) and can stream them as NDJSON, with
+the same results from the in-memory registry and from SQL.
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import get_db, get_engine
+from app.main import app
+from app.models import Master
+from app.repositories import master_index
+from app.services import master_service
+from app.settings import settings
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_master_listing.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+MASTER_COUNT = 23
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_engine():
+    return engine
+
+
+@pytest.fixture(scope="function", params=[True, False], ids=["registry", "sql"])
+def db_session(request, monkeypatch):
+    """
+    Create a fresh database with 23 masters along a meridian; every third one is
+    unavailable and ratings cycle through 3.0-4.5
+    """
+    monkeypatch.setattr(settings, "master_registry_enabled", request.param)
+    master_index.reset()
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all(
+        [
+            Master(
+                name=f"Master {i}",
+                rating=3.0 + (i % 4) * 0.5,
+                is_available=i % 3 != 0,
+                geo_lat=40.0 + i * 0.1,
+                geo_lng=-74.0,
+            )
+            for i in range(MASTER_COUNT)
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(db_session):
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    with TestClient(app) as test_client:
+        yield test_client
+    if get_db in app.dependency_overrides:
+        del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
+
+
+def names(masters):
+    return [master["name"] for master in masters]
+
+
+def test_default_lists_every_master(client, db_session):
+    """Test that without parameters the full list is returned as before"""
+    response = client.get("/api/v1/masters")
+
+    assert response.status_code == 200
+    assert names(response.json()) == [f"Master {i}" for i in range(MASTER_COUNT)]
+    assert response.json()[1]["currentLoad"] == 0
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_cursor_pages_cover_every_master_once(client, db_session):
+    """Test that following X-Next-Cursor returns every master once, by id"""
+    seen = []
+    params = {"limit": 5}
+    while True:
+        response = client.get("/api/v1/masters", params=params)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+
+    assert names(seen) == [f"Master {i}" for i in range(MASTER_COUNT)]
+
+
+def test_filters(client, db_session):
+    """Test the availability, rating and bounding box filters"""
+
+    def listed(**params):
+        response = client.get("/api/v1/masters", params=params)
+        assert response.status_code == 200
+        return names(response.json())
+
+    assert listed(available=False) == [f"Master {i}" for i in range(0, MASTER_COUNT, 3)]
+    assert listed(minRating=4.5) == [f"Master {i}" for i in range(3, MASTER_COUNT, 4)]
+    assert listed(available=True, minRating=4.0, limit=3) == ["Master 2", "Master 7", "Master 10"]
+    assert listed(minLat=40.45, maxLat=40.85, minLng=-75, maxLng=-73) == [
+        f"Master {i}" for i in range(5, 9)
+    ]
+    # A box crossing the antimeridian (minLng > maxLng) excludes lng -74
+    assert listed(minLng=170, maxLng=-170) == []
+    assert len(listed(minLng=-80, maxLng=-170)) == MASTER_COUNT
+
+
+def test_invalid_parameters(client, db_session):
+    """Test that malformed cursors and out-of-range parameters are rejected"""
+    assert client.get("/api/v1/masters", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/v1/masters", params={"limit": 0}).status_code == 422
+    assert client.get("/api/v1/masters", params={"maxLng": 181}).status_code == 422
+    response = client.get("/api/v1/masters", params={"format": "ndjson", "cursor": "bad"})
+    assert response.status_code == 400
+
+
+def test_ndjson_streams_every_matching_master(client, db_session, monkeypatch):
+    """Test that format=ndjson streams all matching masters across several fetched pages"""
+    monkeypatch.setattr(master_service, "STREAM_PAGE_SIZE", 4)
+
+    response = client.get("/api/v1/masters", params={"format": "ndjson", "available": True})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert streamed == client.get("/api/v1/masters", params={"available": True}).json()
+    assert len(streamed) == MASTER_COUNT - len(range(0, MASTER_COUNT, 3))
@@ -0,0 +1,273 @@
+"""
+Tests for the in-memory master registry:
+1. MasterRegistry keeps its columns consistent through inserts, updates and removals
+2. The process-level registry follows committed master and active_load changes,
+   is not kept when built out of step with them, and expires to pick up outside writes
+"""
+import random
+import time
+
+import pytest
+from sqlalchemy import create_engine, event, text, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database.base import Base
+from app.models import Master, Order
+from app.models.order import OrderStatus
+from app.repositories import master_index
+from app.repositories.order_repository import OrderRepository
+from app.services.master_service import MasterService
+from app.settings import settings
+from app.utils.master_registry import MasterRegistry
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_master_registry.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh database with three masters"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all(
+        [
+            Master(name="First", rating=4.5, is_available=True, geo_lat=40.7128, geo_lng=-74.0060),
+            Master(name="Second", rating=4.8, is_available=True, geo_lat=40.7589, geo_lng=-73.9851),
+            Master(name="Offline", rating=5.0, is_available=False, geo_lat=40.7000, geo_lng=-74.0),
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def registry_loads(db_session):
+    columns = master_index.get_columns(db_session)
+    return dict(zip(columns.ids.tolist(), columns.loads.tolist()))
+
+
+def database_loads(db_session):
+    db_session.expire_all()
+    return {master.id: master.active_load for master in db_session.query(Master).all()}
+
+
+def test_registry_matches_dict_model():
+    """Test random upserts, removals and load changes against a plain dict"""
+    rng = random.Random(5)
+    registry = MasterRegistry()
+    expected = {}
+    for _ in range(2000):
+        master_id = rng.randint(1, 150)
+        action = rng.random()
+        if action < 0.6:
+            state = (f"M{master_id}", rng.uniform(3, 5), rng.random() < 0.8)
+            state += (rng.uniform(-60, 60), rng.uniform(-180, 180))
+            registry.upsert(master_id, *state)
+            load = expected[master_id][5] if master_id in expected else 0
+            expected[master_id] = state + (load,)
+        elif action < 0.8:
+            registry.remove(master_id)
+            expected.pop(master_id, None)
+        elif master_id in expected:
+            registry.add_load(master_id, 1)
+            expected[master_id] = expected[master_id][:5] + (expected[master_id][5] + 1,)
+
+    columns = registry.columns()
+    assert columns.ids.tolist() == sorted(expected)
+    for row, master_id in enumerate(columns.ids.tolist()):
+        name, rating, available, lat, lng, load = expected[master_id]
+        assert columns.names[row] == name
+        assert columns.ratings[row] == rating
+        assert columns.available[row] == available
+        assert (columns.lats[row], columns.lngs[row]) == (lat, lng)
+        assert columns.loads[row] == load
+        assert (master_id in registry.index) == available
+
+    available = registry.columns(available_only=True)
+    assert available.ids.tolist() == sorted(i for i, state in expected.items() if state[2])
+
+
+def test_registry_follows_master_writes(db_session):
+    """Test that listings reflect committed inserts, updates and deletes"""
+    service = MasterService(db_session)
+    assert [master["name"] for master in service.get_all_masters()] == [
+        "First",
+        "Second",
+        "Offline",
+    ]
+
+    added = Master(name="Added", rating=3.9, is_available=True, geo_lat=41.0, geo_lng=-73.0)
+    db_session.add(added)
+    first = db_session.get(Master, 1)
+    first.name = "Renamed"
+    first.is_available = False
+    db_session.delete(db_session.get(Master, 3))
+    db_session.commit()
+
+    masters = {master["id"]: master for master in service.get_all_masters()}
+    assert sorted(masters) == [1, 2, added.id]
+    assert masters[1]["name"] == "Renamed" and masters[1]["isAvailable"] is False
+    assert masters[added.id] == {**added.to_dict(), "currentLoad": 0}
+    assert service.get_master_by_id(3) is None
+    assert service.find_best_master(40.7128, -74.0060) == 2
+
+
+def test_registry_follows_active_load(db_session):
+    """Test that ORM order writes and compare-and-set transitions move registry loads"""
+    assert registry_loads(db_session) == {1: 0, 2: 0, 3: 0}
+
+    db_session.add_all(
+        [
+            Order(
+                title="A",
+                geo_lat=40.7,
+                geo_lng=-74.0,
+                status=OrderStatus.ASSIGNED,
+                assigned_master_id=1,
+            ),
+            Order(title="B", geo_lat=40.7, geo_lng=-74.0),
+        ]
+    )
+    db_session.commit()
+    assert registry_loads(db_session) == database_loads(db_session) == {1: 1, 2: 0, 3: 0}
+
+    repository = OrderRepository(db_session)
+    repository.assign_master(2, 2)
+    repository.update_status(1, OrderStatus.COMPLETED, expected_status=OrderStatus.ASSIGNED)
+    db_session.commit()
+    assert registry_loads(db_session) == database_loads(db_session) == {1: 0, 2: 1, 3: 0}
+
+    order = db_session.get(Order, 2)
+    order.assigned_master_id = 1
+    db_session.commit()
+    db_session.delete(db_session.get(Order, 1))
+    db_session.commit()
+    assert registry_loads(db_session) == database_loads(db_session) == {1: 1, 2: 0, 3: 0}
+
+
+def test_registry_ignores_rolled_back_load(db_session):
+    """Test that a rolled back assignment never reaches the registry"""
+    db_session.add(Order(title="A", geo_lat=40.7, geo_lng=-74.0))
+    db_session.commit()
+    assert registry_loads(db_session) == {1: 0, 2: 0, 3: 0}
+
+    order = db_session.get(Order, 1)
+    order.status = OrderStatus.ASSIGNED
+    order.assigned_master_id = 2
+    db_session.flush()
+    db_session.rollback()
+
+    assert registry_loads(db_session) == database_loads(db_session) == {1: 0, 2: 0, 3: 0}
+
+
+def test_bulk_master_update_rebuilds_registry(db_session):
+    """Test that ORM bulk updates, which skip per-object events, force a rebuild"""
+    assert registry_loads(db_session)[1] == 0
+
+    db_session.execute(update(Master).where(Master.id == 1).values(active_load=7))
+    db_session.commit()
+
+    assert registry_loads(db_session)[1] == 7
+
+
+def test_registry_built_during_a_commit_is_not_kept(db_session):
+    """Test that a build seeing a commit before its after_commit ran does not count it twice"""
+    db_session.add(Order(title="A", geo_lat=40.7, geo_lng=-74.0))
+    db_session.commit()
+    writer = TestingSessionLocal()
+    built = []
+
+    def build_before_registry_hook(session):
+        if session is writer:
+            reader = TestingSessionLocal()
+            built.append(registry_loads(reader))
+            reader.close()
+
+    # insert=True: runs after the database COMMIT, before the registry's own hook
+    event.listen(Session, "after_commit", build_before_registry_hook, insert=True)
+    try:
+        OrderRepository(writer).assign_master(1, 1)
+        writer.commit()
+    finally:
+        event.remove(Session, "after_commit", build_before_registry_hook)
+        writer.close()
+
+    assert built == [{1: 1, 2: 0, 3: 0}]
+    assert registry_loads(db_session) == database_loads(db_session) == {1: 1, 2: 0, 3: 0}
+
+
+def test_registry_built_in_an_older_transaction_is_not_kept(db_session):
+    """Test that a build in a transaction that began before a commit is used once only"""
+    db_session.add(Order(title="A", geo_lat=40.7, geo_lng=-74.0))
+    db_session.commit()
+    reader = TestingSessionLocal()
+    reader.execute(text("SELECT 1"))
+    writer = TestingSessionLocal()
+    OrderRepository(writer).assign_master(1, 2)
+    writer.commit()
+    writer.close()
+    registry_loads(reader)
+    reader.close()
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        assert registry_loads(db_session) == {1: 0, 2: 1, 3: 0}
+        assert registry_loads(db_session) == {1: 0, 2: 1, 3: 0}
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    # Rebuilt once by the fresh transaction, then kept
+    assert len(statements) == 1
+
+
+def test_order_writes_without_load_changes_do_not_outdate_a_build(db_session):
+    """Test that creating NEW orders, committed or still open, lets a build be kept"""
+    reader = TestingSessionLocal()
+    reader.execute(text("SELECT 1"))
+    writer = TestingSessionLocal()
+    writer.add(Order(title="Committed", geo_lat=40.7, geo_lng=-74.0))
+    writer.commit()
+    open_writer = TestingSessionLocal()
+    open_writer.add(Order(title="Open", geo_lat=40.7, geo_lng=-74.0))
+    open_writer.flush()
+
+    assert registry_loads(reader) == {1: 0, 2: 0, 3: 0}
+    reader.close()
+    open_writer.rollback()
+    open_writer.close()
+    writer.close()
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        assert registry_loads(db_session) == {1: 0, 2: 0, 3: 0}
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    # The reader's build was kept
+    assert statements == []
+
+
+def test_registry_expires_to_pick_up_outside_writes(db_session, monkeypatch):
+    """Test that writes the session events never see (other processes) show up after max age"""
+    monkeypatch.setattr(settings, "master_registry_max_age_s", 0.05)
+    assert registry_loads(db_session) == {1: 0, 2: 0, 3: 0}
+    db_session.commit()
+
+    # Another process, e.g. `make reconcile`, writing without this process's sessions
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE masters SET active_load = 4 WHERE id = 1"))
+    assert registry_loads(db_session)[1] == 0
+
+    time.sleep(0.1)
+    assert registry_loads(db_session) == database_loads(db_session) == {1: 4, 2: 0, 3: 0}
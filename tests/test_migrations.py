@@ -0,0 +1,108 @@
+"""
+Tests for the versioned schema migrations - a database created before the
+active_load and version columns and the index pack is upgraded in place, and a database
+created from the current models only gets the versions recorded.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.database.base import Base
+from app.database.migrations import MIGRATIONS, applied_versions, run_migrations
+
+DATABASE_FILE = "./test_migrations.db"
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_FILE}"
+
+# Schema of the first release: primary key indexes only, no masters.active_load
+LEGACY_SCHEMA = [
+    """CREATE TABLE masters (
+        id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, rating FLOAT NOT NULL,
+        is_available BOOLEAN NOT NULL, geo_lat FLOAT NOT NULL, geo_lng FLOAT NOT NULL
+    )""",
+    """CREATE TABLE orders (
+        id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, description VARCHAR,
+        status VARCHAR(11) NOT NULL, customer JSON, geo_lat FLOAT NOT NULL,
+        geo_lng FLOAT NOT NULL, assigned_master_id INTEGER REFERENCES masters (id),
+        created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE adl_media (
+        id INTEGER PRIMARY KEY, order_id INTEGER NOT NULL REFERENCES orders (id),
+        type VARCHAR(5) NOT NULL, url VARCHAR NOT NULL, gps_lat FLOAT NOT NULL,
+        gps_lng FLOAT NOT NULL, captured_at DATETIME NOT NULL, meta JSON
+    )""",
+    "CREATE INDEX ix_masters_id ON masters (id)",
+    "CREATE INDEX ix_orders_id ON orders (id)",
+    "CREATE INDEX ix_adl_media_id ON adl_media (id)",
+]
+
+INDEX_PACK = {
+    "ix_masters_available_geo",
+    "ix_orders_master_status",
+    "ix_adl_media_order_id",
+    "ix_orders_created_id",
+}
+
+
+@pytest.fixture(scope="function")
+def engine():
+    """Engine on a fresh database file"""
+    if os.path.exists(DATABASE_FILE):
+        os.remove(DATABASE_FILE)
+    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    yield engine
+    engine.dispose()
+    os.remove(DATABASE_FILE)
+
+
+def index_names(engine):
+    inspector = inspect(engine)
+    return {
+        index["name"]
+        for table in ("masters", "orders", "adl_media")
+        for index in inspector.get_indexes(table)
+    }
+
+
+def test_legacy_database_is_upgraded_in_place(engine):
+    """Test that an old database gets active_load (backfilled), version and the index pack"""
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(
+            text(
+                "INSERT INTO masters VALUES (1, 'Busy', 4.5, 1, 40.7, -74.0), "
+                "(2, 'Idle', 4.8, 1, 40.8, -74.0)"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO orders (title, status, geo_lat, geo_lng, assigned_master_id, "
+                "created_at, updated_at) VALUES "
+                "('A', 'ASSIGNED', 40.7, -74.0, 1, '2025-01-01', '2025-01-01'), "
+                "('B', 'IN_PROGRESS', 40.7, -74.0, 1, '2025-01-01', '2025-01-01'), "
+                "('C', 'COMPLETED', 40.7, -74.0, 2, '2025-01-01', '2025-01-01')"
+            )
+        )
+
+    Base.metadata.create_all(bind=engine)
+    assert run_migrations(engine) == [migration.version for migration in MIGRATIONS]
+
+    assert INDEX_PACK <= index_names(engine)
+    with engine.connect() as connection:
+        loads = connection.execute(text("SELECT id, active_load, version FROM masters ORDER BY id"))
+        assert loads.all() == [(1, 2, 1), (2, 0, 1)]
+
+    # Applied versions are not run again
+    assert run_migrations(engine) == []
+
+
+def test_new_database_only_records_versions(engine):
+    """Test that a database created from the current models needs no schema changes"""
+    Base.metadata.create_all(bind=engine)
+    assert INDEX_PACK <= index_names(engine)
+
+    run_migrations(engine)
+
+    assert applied_versions(engine) == [migration.version for migration in MIGRATIONS]
+    assert INDEX_PACK <= index_names(engine)
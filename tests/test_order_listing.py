@@ -0,0 +1,168 @@
+"""
+Tests for the order listing - GET /orders filters orders, pages through them
+with a (created_at, id) keyset cursor and can stream them as NDJSON.
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import get_db, get_engine
+from app.main import app
+from app.models import Master, Order
+from app.models.order import OrderStatus
+from app.services import order_service
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_order_listing.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+START = datetime(2025, 10, 1, 8, 0)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_engine():
+    return engine
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """
+    Create a fresh database with a master and 25 orders; orders 0-9 share one
+    created_at so pages must break ties on id
+    """
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add(Master(name="Field", rating=4.5, is_available=True, geo_lat=40.7, geo_lng=-74.0))
+    session.commit()
+    session.add_all(
+        [
+            Order(
+                title=f"Order {i}",
+                status=OrderStatus.ASSIGNED if i % 2 else OrderStatus.NEW,
+                geo_lat=40.7 + i * 0.01,
+                geo_lng=-74.0,
+                assigned_master_id=1 if i % 2 else None,
+                created_at=START + timedelta(minutes=max(i - 9, 0)),
+            )
+            for i in range(25)
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(db_session):
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    with TestClient(app) as test_client:
+        yield test_client
+    if get_db in app.dependency_overrides:
+        del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
+
+
+def titles(orders):
+    return [order["title"] for order in orders]
+
+
+def test_keyset_pages_cover_every_order_once(client, db_session):
+    """Test that following nextCursor returns every order once, in (created_at, id) order"""
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/orders", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        seen.extend(body["orders"])
+        pages += 1
+        cursor = body["nextCursor"]
+        assert response.headers.get("X-Next-Cursor") == cursor
+        if cursor is None:
+            break
+
+    assert pages == 4
+    assert titles(seen) == [f"Order {i}" for i in range(25)]
+
+    # A cursor stays valid when newer orders arrive meanwhile
+    first = client.get("/api/v1/orders", params={"limit": 20}).json()
+    db_session.add(Order(title="Late", geo_lat=40.7, geo_lng=-74.0, created_at=START))
+    db_session.commit()
+    rest = client.get("/api/v1/orders", params={"cursor": first["nextCursor"]}).json()
+    assert titles(rest["orders"]) == [f"Order {i}" for i in range(20, 25)]
+
+
+def test_filters(client, db_session):
+    """Test the status, master, created_at range and bounding box filters"""
+
+    def listed(**params):
+        response = client.get("/api/v1/orders", params=params)
+        assert response.status_code == 200
+        return titles(response.json()["orders"])
+
+    assert listed(status="assigned", limit=100) == [f"Order {i}" for i in range(1, 25, 2)]
+    assert listed(masterId=1, limit=100) == [f"Order {i}" for i in range(1, 25, 2)]
+    assert listed(masterId=2) == []
+    assert listed(
+        createdFrom=(START + timedelta(minutes=5)).isoformat(),
+        createdTo=(START + timedelta(minutes=8)).isoformat(),
+    ) == ["Order 14", "Order 15", "Order 16"]
+    assert listed(minLat=40.745, maxLat=40.775, minLng=-74.1, maxLng=-73.9) == [
+        "Order 5",
+        "Order 6",
+        "Order 7",
+    ]
+    # A box crossing the antimeridian (minLng > maxLng) excludes lng -74
+    assert listed(minLng=170, maxLng=-170) == []
+    assert listed(status="new", minLat=40.745, maxLat=40.775) == ["Order 6"]
+
+
+def test_invalid_parameters(client, db_session):
+    """Test that malformed cursors and out-of-range parameters are rejected"""
+    assert client.get("/api/v1/orders", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/api/v1/orders", params={"limit": 0}).status_code == 422
+    assert client.get("/api/v1/orders", params={"limit": 501}).status_code == 422
+    assert client.get("/api/v1/orders", params={"status": "LOST"}).status_code == 422
+    assert client.get("/api/v1/orders", params={"minLat": 91}).status_code == 422
+    response = client.get("/api/v1/orders", params={"format": "ndjson", "cursor": "bad"})
+    assert response.status_code == 400
+
+
+def test_ndjson_streams_every_matching_order(client, db_session, monkeypatch):
+    """Test that format=ndjson streams all matching orders across several fetched pages"""
+    monkeypatch.setattr(order_service, "STREAM_PAGE_SIZE", 4)
+
+    response = client.get("/api/v1/orders", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert titles(json.loads(line) for line in lines) == [f"Order {i}" for i in range(25)]
+
+    # Resuming from a cursor streams only the rest, with the filters applied
+    cursor = client.get("/api/v1/orders", params={"limit": 10}).json()["nextCursor"]
+    response = client.get(
+        "/api/v1/orders", params={"format": "ndjson", "cursor": cursor, "status": "new"}
+    )
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert titles(streamed) == [f"Order {i}" for i in range(10, 25, 2)]
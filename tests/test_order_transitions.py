@@ -0,0 +1,159 @@
+"""
+Tests for compare-and-set order transitions - concurrent assign/complete
+calls must not both win, and the loser gets a clean 409.
+"""
+import threading
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.models import ADLMedia, Master, Order
+from app.models.adl_media import MediaType
+from app.models.order import OrderStatus
+from app.repositories.order_repository import OrderRepository
+from app.services.order_service import OrderService
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_order_transitions.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh database with two masters and one NEW order"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all(
+        [
+            Master(name="First", rating=4.5, is_available=True, geo_lat=40.7128, geo_lng=-74.0060),
+            Master(name="Second", rating=4.8, is_available=True, geo_lat=40.7589, geo_lng=-73.9851),
+            Order(title="Fix sink", geo_lat=40.7128, geo_lng=-74.0060),
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def total_active_load(db_session):
+    db_session.expire_all()
+    return sum(master.active_load for master in db_session.query(Master).all())
+
+
+def test_assign_master_is_compare_and_set(db_session):
+    """Test that only the first conditional assignment applies"""
+    repository = OrderRepository(db_session)
+
+    first = repository.assign_master(1, 1)
+    second = repository.assign_master(1, 2)
+
+    assert first.status == OrderStatus.ASSIGNED
+    assert first.assigned_master_id == 1
+    assert second is None
+    assert db_session.get(Order, 1).assigned_master_id == 1
+    assert total_active_load(db_session) == 1
+
+
+def test_lost_assign_race_returns_409(db_session, monkeypatch):
+    """Test that an assignment committed between read and write yields 409"""
+    service = OrderService(db_session)
+    find_best_master = service.master_service.find_best_master
+
+    def assign_concurrently(order_lat, order_lng):
+        other = TestingSessionLocal()
+        try:
+            OrderRepository(other).assign_master(1, 2)
+            other.commit()
+        finally:
+            other.close()
+        return find_best_master(order_lat, order_lng)
+
+    monkeypatch.setattr(service.master_service, "find_best_master", assign_concurrently)
+
+    with pytest.raises(HTTPException) as exc_info:
+        service.assign_master_to_order(1)
+    # As the request boundary does when the handler raises
+    db_session.rollback()
+
+    assert exc_info.value.status_code == 409
+    assert db_session.get(Order, 1).assigned_master_id == 2
+    assert total_active_load(db_session) == 1
+
+
+def test_lost_complete_race_returns_409(db_session, monkeypatch):
+    """Test that completing an order whose status changed after the read yields 409"""
+    OrderRepository(db_session).assign_master(1, 1)
+    db_session.add(
+        ADLMedia(
+            order_id=1,
+            type=MediaType.PHOTO,
+            url="/photo.jpg",
+            gps_lat=40.7128,
+            gps_lng=-74.0060,
+            captured_at=db_session.get(Order, 1).created_at,
+        )
+    )
+    db_session.commit()
+
+    service = OrderService(db_session)
+    get_with_relations = service.repository.get_with_relations
+
+    def start_concurrently(order_id):
+        order = get_with_relations(order_id)
+        other = TestingSessionLocal()
+        try:
+            OrderRepository(other).update_status(
+                order_id, OrderStatus.IN_PROGRESS, expected_status=OrderStatus.ASSIGNED
+            )
+            other.commit()
+        finally:
+            other.close()
+        return order
+
+    monkeypatch.setattr(service.repository, "get_with_relations", start_concurrently)
+
+    with pytest.raises(HTTPException) as exc_info:
+        service.complete_order(1)
+    # As the request boundary does when the handler raises
+    db_session.rollback()
+
+    assert exc_info.value.status_code == 409
+    assert db_session.get(Order, 1).status == OrderStatus.IN_PROGRESS
+    assert total_active_load(db_session) == 1
+
+    # A retry sees the new state and succeeds
+    assert service.complete_order(1)["status"] == "completed"
+    assert total_active_load(db_session) == 0
+
+
+def test_parallel_assign_has_single_winner(db_session):
+    """Test that parallel workers assigning the same order produce one assignment"""
+    outcomes = []
+    barrier = threading.Barrier(6)
+
+    def worker():
+        session = TestingSessionLocal()
+        try:
+            barrier.wait()
+            OrderService(session).assign_master_to_order(1)
+            session.commit()
+            outcomes.append(200)
+        except HTTPException as exc:
+            outcomes.append(exc.status_code)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert outcomes.count(200) == 1
+    assert set(outcomes) <= {200, 400, 409}
+    assert total_active_load(db_session) == 1
@@ -0,0 +1,270 @@
+"""
+Query budget tests - guard against N+1 regressions by counting the SQL
+statements each request issues.
+"""
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import get_async_engine, get_db, get_engine
+from app.main import app
+from app.models import Master, Order
+from app.models.order import OrderStatus
+from app.repositories.master_repository import MasterRepository
+from app.services.master_service import MasterService
+from app.services.order_service import OrderService
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_query_counts.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+MASTER_COUNT = 50
+
+
+@contextmanager
+def count_queries():
+    """Collect every SQL statement executed against the test database, by both engines"""
+    statements = []
+    engines = (engine, get_async_engine(engine).sync_engine)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for target in engines:
+        event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def count_commits():
+    """Collect the transactions committed on the test database, by both engines"""
+    commits = []
+    engines = (engine, get_async_engine(engine).sync_engine)
+
+    def commit(conn):
+        commits.append(conn)
+
+    for target in engines:
+        event.listen(target, "commit", commit)
+    try:
+        yield commits
+    finally:
+        for target in engines:
+            event.remove(target, "commit", commit)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_engine():
+    return engine
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh database with a fleet of masters and some active orders"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    masters = [
+        Master(
+            name=f"Master {i}",
+            rating=4.0 + (i % 10) / 10,
+            is_available=i % 7 != 0,
+            geo_lat=40.70 + i * 0.001,
+            geo_lng=-74.00 + i * 0.001,
+        )
+        for i in range(MASTER_COUNT)
+    ]
+    session.add_all(masters)
+    session.commit()
+    for i, master in enumerate(masters[:10]):
+        for _ in range(i % 3 + 1):
+            session.add(
+                Order(
+                    title="Busy",
+                    status=OrderStatus.ASSIGNED,
+                    geo_lat=40.7,
+                    geo_lng=-74.0,
+                    assigned_master_id=master.id,
+                )
+            )
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def client(db_session):
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    with TestClient(app) as test_client:
+        yield test_client
+    if get_db in app.dependency_overrides:
+        del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
+
+
+def test_reconcile_active_load_single_query(db_session):
+    """Test that rebuilding every master's active_load is one UPDATE, not a query per master"""
+    repository = MasterRepository(db_session)
+    masters = repository.get_all()
+    for master in masters:
+        master.active_load = 0
+    db_session.commit()
+
+    with count_queries() as statements:
+        corrected = repository.reconcile_active_load()
+
+    assert len(statements) == 1
+    assert statements[0].lstrip().startswith("UPDATE masters")
+    db_session.commit()
+    assert corrected == len([master for master in masters if master.active_load])
+    assert {master.id: master.active_load for master in masters} == {
+        master.id: repository.get_master_order_count(master.id) for master in masters
+    }
+
+
+def test_list_masters_query_count(client):
+    """Test that listing masters does not issue a query per master"""
+    with count_queries() as statements:
+        response = client.get("/api/v1/masters")
+
+    assert response.status_code == 200
+    assert len(response.json()) == MASTER_COUNT
+    # The ETag's (id, version) query, then the page, read like the ETag with SQL
+    assert len(statements) == 2
+
+    with count_queries() as statements:
+        response = client.get(
+            "/api/v1/masters", headers={"If-None-Match": response.headers["ETag"]}
+        )
+
+    assert response.status_code == 304
+    assert len(statements) == 1
+
+
+def test_find_best_master_query_count(db_session):
+    """Test that ranking candidates issues a fixed number of queries"""
+    service = MasterService(db_session)
+    service.find_best_master(40.7128, -74.0060)  # warm up the master registry
+
+    with count_queries() as statements:
+        service.find_best_master(40.7128, -74.0060)
+
+    # Candidates, ratings and active_load counters all come from the registry
+    assert statements == []
+
+
+def create_order_with_media(client, media_count):
+    response = client.post(
+        "/api/v1/orders", json={"title": "Fix sink", "geo": {"lat": 40.7, "lng": -74.0}}
+    )
+    order_id = response.json()["id"]
+    for i in range(media_count):
+        adl = {
+            "type": "photo",
+            "url": f"/photo_{i}.jpg",
+            "gps": {"lat": 40.7, "lng": -74.0},
+            "capturedAt": "2025-10-16T14:30:00",
+        }
+        client.post(f"/api/v1/orders/{order_id}/adl", json=adl)
+    return order_id
+
+
+@pytest.mark.parametrize("media_count", [1, 8])
+def test_order_endpoints_with_relations_query_budget(client, media_count):
+    """Test that reads and transitions rendering the master and media use a fixed query count"""
+    client.get("/api/v1/masters/1")  # warm up the master registry
+    order_id = create_order_with_media(client, media_count)
+
+    with count_queries() as statements:
+        response = client.get(f"/api/v1/orders/{order_id}")
+    assert len(response.json()["adlMedia"]) == media_count
+    # ETag version key, then the order (with its master) and its media
+    assert len(statements) == 3
+
+    with count_queries() as statements:
+        response = client.post(f"/api/v1/orders/{order_id}/assign")
+    assigned = response.json()
+    assert assigned["assignedMaster"]["id"] == assigned["assignedMasterId"]
+    assert len(assigned["adlMedia"]) == media_count
+    # Order with master (joined), media, claim, load counter, new master
+    assert len(statements) == 5
+
+    with count_queries() as statements:
+        response = client.get(f"/api/v1/orders/{order_id}")
+    assert response.json()["assignedMaster"] == assigned["assignedMaster"]
+    assert len(statements) == 3
+
+    with count_queries() as statements:
+        response = client.post(f"/api/v1/orders/{order_id}/complete")
+    completed = response.json()
+    assert completed["status"] == "completed"
+    assert completed["assignedMaster"] == assigned["assignedMaster"]
+    assert len(completed["adlMedia"]) == media_count
+    # Order with master, media, status flip guarded by the ADL EXISTS, load counter
+    assert len(statements) == 4
+    assert "EXISTS" in statements[2]
+
+
+@pytest.mark.parametrize("order_count", [2, 12])
+def test_arrival_order_batch_query_budget(client, db_session, order_count):
+    """Test that a dispatcher micro-batch renders its orders without per-order queries"""
+    client.get("/api/v1/masters/1")  # warm up the master registry
+    order_ids = [create_order_with_media(client, 2) for _ in range(order_count)]
+
+    service = OrderService(db_session)
+    with count_queries() as statements:
+        results = service.assign_masters_in_arrival_order(order_ids)
+    db_session.commit()
+
+    assert all(result["assignedMaster"]["id"] == result["assignedMasterId"] for result in results)
+    assert all(len(result["adlMedia"]) == 2 for result in results)
+    # One claim per order and one counter update per master; the reads stay fixed:
+    # orders with masters (joined), media (selectin) and the new masters (IN)
+    writes = [statement for statement in statements if statement.startswith("UPDATE")]
+    assert sum(statement.startswith("UPDATE orders") for statement in writes) == order_count
+    assert len(statements) - len(writes) == 3
+
+
+def test_write_requests_commit_once_without_refresh(client):
+    """Test that a write request flushes once, reads nothing back and commits once"""
+    with count_queries() as statements, count_commits() as commits:
+        response = client.post(
+            "/api/v1/orders", json={"title": "Fix sink", "geo": {"lat": 40.7, "lng": -74.0}}
+        )
+
+    assert response.status_code == 201
+    assert response.json()["createdAt"] is not None
+    assert len(statements) == 1 and statements[0].startswith("INSERT INTO orders")
+    assert len(commits) == 1
+
+    adl = {
+        "type": "photo",
+        "url": "/photo.jpg",
+        "gps": {"lat": 40.7, "lng": -74.0},
+        "capturedAt": "2025-10-16T14:30:00",
+    }
+    with count_queries() as statements, count_commits() as commits:
+        response = client.post(f"/api/v1/orders/{response.json()['id']}/adl", json=adl)
+
+    assert response.status_code == 200
+    # Order lookup, then the insert; no SELECT to refresh the new row
+    assert len(statements) == 2 and statements[1].startswith("INSERT INTO adl_media")
+    assert len(commits) == 1
@@ -0,0 +1,119 @@
+"""
+Query plan tests - the hot queries, as the repositories issue them, must be
+served by an index (EXPLAIN QUERY PLAN) rather than a full table scan.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.repositories.adl_repository import ADLRepository
+from app.repositories.master_repository import MasterRepository
+from app.repositories.order_repository import OrderFilters, OrderRepository
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_query_plans.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh, empty database"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+@contextmanager
+def query_plans(db_session):
+    """Collect the EXPLAIN QUERY PLAN details of every SELECT and UPDATE run inside the block"""
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE")):
+            executed.append((statement, parameters))
+
+    plans = []
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield plans
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    connection = db_session.connection()
+    for statement, parameters in executed:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plans.append(" | ".join(row.detail for row in rows))
+
+
+def test_active_load_reads_use_master_status_index(db_session):
+    """Test that counting a master's orders and reconciling active_load seek (master, status)"""
+    repository = MasterRepository(db_session)
+    with query_plans(db_session) as plans:
+        repository.get_master_order_count(1)
+        repository.reconcile_active_load()
+
+    search = "SEARCH orders USING COVERING INDEX ix_orders_master_status"
+    search += " (assigned_master_id=? AND status=?)"
+    assert plans[0] == search
+    # One pass over masters; each correlated count is an index seek, not a scan of orders
+    assert plans[1] == (
+        f"SCAN masters | CORRELATED SCALAR SUBQUERY 2 | {search} | "
+        f"CORRELATED SCALAR SUBQUERY 1 | {search}"
+    )
+
+
+def test_adl_lookup_uses_order_index(db_session):
+    """Test that loading an order's ADL media seeks adl_media.order_id"""
+    with query_plans(db_session) as plans:
+        ADLRepository(db_session).get_by_order_id(1)
+
+    assert plans == ["SEARCH adl_media USING INDEX ix_adl_media_order_id (order_id=?)"]
+
+
+def test_valid_adl_check_is_an_indexed_exists(db_session):
+    """Test that the ADL validity check is one EXISTS seeking adl_media.order_id"""
+    with query_plans(db_session) as plans:
+        assert ADLRepository(db_session).has_valid_adl(1) is False
+
+    assert plans == [
+        "SCAN CONSTANT ROW | SCALAR SUBQUERY 1 | "
+        "SEARCH adl_media USING INDEX ix_adl_media_order_id (order_id=?)"
+    ]
+
+
+def test_assignment_queue_is_read_in_index_order(db_session):
+    """Test that the oldest unassigned orders come from the index, without a sort"""
+    with query_plans(db_session) as plans:
+        OrderRepository(db_session).get_unassigned(10)
+
+    [plan] = plans
+    assert "USING INDEX ix_orders_master_status (assigned_master_id=? AND status=?)" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_candidate_query_uses_available_geo_index(db_session):
+    """Test that the bounding-box candidate query seeks is_available and geo_lat"""
+    with query_plans(db_session) as plans:
+        MasterRepository(db_session).get_available_masters_near(40.7, -74.0, 5.0)
+
+    [plan] = plans
+    assert (
+        "USING INDEX ix_masters_available_geo (is_available=? AND geo_lat>? AND geo_lat<?)" in plan
+    )
+
+
+def test_order_listing_pages_in_index_order(db_session):
+    """Test that keyset pages seek (created_at, id) instead of sorting the table"""
+    after = (datetime(2025, 1, 1), 10)
+    with query_plans(db_session) as plans:
+        OrderRepository(db_session).list_page(OrderFilters(), after, 50)
+
+    [plan] = plans
+    assert "USING INDEX ix_orders_created_id" in plan
+    assert "TEMP B-TREE" not in plan
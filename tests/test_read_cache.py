@@ -0,0 +1,201 @@
+"""
+Tests for the read cache - GET /orders/{id} and GET /masters/{id} are served
+from an in-process LRU+TTL cache that the repository writes invalidate on
+commit, and stale reads never fill it.
+"""
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text, update
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.database.config import get_async_engine, get_db, get_engine
+from app.main import app
+from app.models import Master, Order
+from app.repositories import master_index, read_cache
+from app.repositories.order_repository import OrderRepository
+from app.services.order_service import OrderService
+from app.settings import settings
+from app.utils.lru_cache import LRUCache
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_read_cache.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+async def override_get_engine():
+    return engine
+
+
+@pytest.fixture(scope="function")
+def db_session(monkeypatch):
+    """Create a fresh database with two masters, the read cache on and the registry off"""
+    monkeypatch.setattr(settings, "read_cache_enabled", True)
+    monkeypatch.setattr(settings, "master_registry_enabled", False)
+    master_index.reset()
+    read_cache.reset()
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all(
+        [
+            Master(name="Near", rating=4.5, is_available=True, geo_lat=40.7, geo_lng=-74.0),
+            Master(name="Far", rating=4.5, is_available=True, geo_lat=41.7, geo_lng=-74.0),
+        ]
+    )
+    session.commit()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+    read_cache.reset()
+
+
+@pytest.fixture(scope="function")
+def client(db_session):
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_engine] = override_get_engine
+    with TestClient(app) as test_client:
+        yield test_client
+    if get_db in app.dependency_overrides:
+        del app.dependency_overrides[get_db]
+    if get_engine in app.dependency_overrides:
+        del app.dependency_overrides[get_engine]
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements the async request path runs against the test database"""
+    statements = []
+    target = get_async_engine(engine).sync_engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+
+def create_order(client):
+    response = client.post(
+        "/api/v1/orders", json={"title": "Fix sink", "geo": {"lat": 40.7, "lng": -74.0}}
+    )
+    return response.json()["id"]
+
+
+def test_lru_cache_evicts_and_expires():
+    """Test LRU eviction, TTL expiry, invalidation and the counters"""
+    now = [0.0]
+    cache = LRUCache(max_entries=2, ttl_s=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert (cache.get("b"), cache.get("a"), cache.get("c")) == (None, 1, 3)
+
+    now[0] = 10.0
+    assert cache.get("a") is None
+    cache.put("d", 4)
+    cache.invalidate(["d", "unknown"])
+    assert len(cache) == 1
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (3, 2)
+    assert (stats["evictions"], stats["expirations"], stats["invalidations"]) == (1, 1, 1)
+
+
+def test_order_reads_are_cached_until_a_write(client, db_session):
+    """Test that order reads hit the cache and attach/assign/complete invalidate it"""
+    order_id = create_order(client)
+    assert client.get(f"/api/v1/orders/{order_id}").json()["status"] == "new"
+
+    with count_queries() as statements:
+        response = client.get(f"/api/v1/orders/{order_id}")
+    assert response.json()["status"] == "new"
+    # Only the ETag version key; the order itself comes from the cache
+    assert len(statements) == 1
+
+    adl = {
+        "type": "photo",
+        "url": "/uploads/order.jpg",
+        "gps": {"lat": 40.7128, "lng": -74.0060},
+        "capturedAt": "2025-10-16T14:30:00",
+    }
+    client.post(f"/api/v1/orders/{order_id}/adl", json=adl)
+    assert len(client.get(f"/api/v1/orders/{order_id}").json()["adlMedia"]) == 1
+
+    client.post(f"/api/v1/orders/{order_id}/assign")
+    assert client.get(f"/api/v1/orders/{order_id}").json()["assignedMaster"]["name"] == "Near"
+
+    client.post(f"/api/v1/orders/{order_id}/complete")
+    assert client.get(f"/api/v1/orders/{order_id}").json()["status"] == "completed"
+
+    stats = client.get("/health/cache").json()
+    assert stats["enabled"] is True
+    assert stats["caches"]["orders"]["hits"] == 1
+    assert stats["caches"]["orders"]["invalidations"] == 3
+
+
+def test_cached_order_is_only_served_for_its_etag(client, db_session):
+    """Test that a write the cache was not told about is served with its own ETag"""
+    order_id = create_order(client)
+    etag = client.get(f"/api/v1/orders/{order_id}").headers["ETag"]
+
+    # A Core write on its own connection, like one made by another worker process
+    with engine.begin() as connection:
+        connection.execute(update(Order).where(Order.id == order_id).values(title="Outside"))
+
+    response = client.get(f"/api/v1/orders/{order_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Outside"
+    assert response.headers["ETag"] != etag
+    assert client.get(f"/api/v1/orders/{order_id}").json()["title"] == "Outside"
+
+
+def test_master_reads_follow_load_changes(client, db_session):
+    """Test that master reads hit the cache and assignments refresh currentLoad"""
+    assert client.get("/api/v1/masters/1").json()["currentLoad"] == 0
+    with count_queries() as statements:
+        assert client.get("/api/v1/masters/1").json()["name"] == "Near"
+    assert statements == []
+
+    client.post(f"/api/v1/orders/{create_order(client)}/assign")
+    assert client.get("/api/v1/masters/1").json()["currentLoad"] == 1
+
+
+def test_stale_and_uncommitted_reads_do_not_fill_the_cache(db_session):
+    """Test the snapshot and pending-invalidation guards, and rollback"""
+    order_id = OrderRepository(db_session).create({"title": "A", "geo_lat": 1, "geo_lng": 1}).id
+    db_session.commit()
+
+    # A transaction that began before a committed write may not fill the cache
+    reader = TestingSessionLocal()
+    reader.execute(text("SELECT 1"))
+    writer = TestingSessionLocal()
+    OrderRepository(writer).update(order_id, {"title": "B"})
+    writer.commit()
+    assert OrderService(reader).get_order_by_id(order_id)["title"] == "B"
+    assert read_cache.stats()["orders"]["size"] == 0
+    reader.close()
+
+    # A fresh transaction does; the writer's own uncommitted changes are not cached
+    assert OrderService(db_session).get_order_by_id(order_id)["title"] == "B"
+    db_session.commit()
+    OrderRepository(writer).update(order_id, {"title": "C"})
+    assert OrderService(writer).get_order_by_id(order_id)["title"] == "C"
+    writer.rollback()
+    writer.close()
+    assert OrderService(db_session).get_order_by_id(order_id)["title"] == "B"
+    assert read_cache.stats()["orders"]["hits"] == 1
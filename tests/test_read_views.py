@@ -0,0 +1,109 @@
+"""
+Tests for the read-only views - repository reads that select columns and
+build response dicts from rows must match the ORM to_dict() output and load
+nothing into the session.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.models import ADLMedia, Master, Order
+from app.models.adl_media import MediaType
+from app.models.order import OrderStatus
+from app.repositories.master_repository import MasterFilters, MasterRepository
+from app.repositories.order_repository import OrderFilters, OrderRepository
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_read_views.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh database with two masters, an assigned order with media and a new order"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    session.add_all(
+        [
+            Master(name="Busy", rating=4.5, is_available=True, geo_lat=40.7, geo_lng=-74.0),
+            Master(name="Offline", rating=4.9, is_available=False, geo_lat=40.8, geo_lng=-73.9),
+        ]
+    )
+    session.commit()
+    session.add_all(
+        [
+            Order(
+                title="Fix sink",
+                description="Leaking",
+                status=OrderStatus.ASSIGNED,
+                customer={"name": "Jane", "phone": None},
+                geo_lat=40.71,
+                geo_lng=-74.01,
+                assigned_master_id=1,
+            ),
+            Order(title="Paint wall", geo_lat=40.72, geo_lng=-74.02),
+        ]
+    )
+    session.commit()
+    session.add_all(
+        [
+            ADLMedia(
+                order_id=1,
+                type=media_type,
+                url=f"/uploads/{i}",
+                gps_lat=40.71,
+                gps_lng=-74.01,
+                captured_at=datetime(2025, 10, 16, 14, 30, i),
+                meta={"device": "phone"} if i else None,
+            )
+            for i, media_type in enumerate([MediaType.PHOTO, MediaType.VIDEO, MediaType.PHOTO])
+        ]
+    )
+    session.commit()
+    session.expunge_all()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def orm_order(db_session, order_id):
+    """The response the ORM path builds, with media in id order"""
+    result = OrderRepository(db_session).get_with_relations(order_id).to_dict_with_relations()
+    if "adlMedia" in result:
+        result["adlMedia"].sort(key=lambda adl: adl["id"])
+    return result
+
+
+def test_order_views_match_orm_dicts(db_session):
+    """Test that order views equal to_dict() / to_dict_with_relations() without loading objects"""
+    repository = OrderRepository(db_session)
+
+    views = [repository.get_view_with_relations(order_id) for order_id in (1, 2)]
+    page = repository.list_page(OrderFilters(), None, 10)
+
+    assert len(db_session.identity_map) == 0
+    assert repository.get_view_with_relations(99) is None
+    assert views == [orm_order(db_session, 1), orm_order(db_session, 2)]
+    assert "assignedMaster" not in views[1] and "adlMedia" not in views[1]
+    assert [adl["type"] for adl in views[0]["adlMedia"]] == ["photo", "video", "photo"]
+    assert page == [db_session.get(Order, order_id).to_dict() for order_id in (1, 2)]
+
+
+def test_master_views_match_orm_dicts(db_session):
+    """Test that master views equal to_dict() plus currentLoad without loading objects"""
+    repository = MasterRepository(db_session)
+
+    views = [repository.get_view(master_id) for master_id in (1, 2)]
+    page = repository.list_page(MasterFilters(), None, None)
+
+    assert len(db_session.identity_map) == 0
+    assert repository.get_view(99) is None
+    expected = [
+        {**master.to_dict(), "currentLoad": master.active_load} for master in repository.get_all()
+    ]
+    assert views == page == expected
+    assert [master["currentLoad"] for master in page] == [1, 0]
@@ -0,0 +1,122 @@
+"""
+Tests for the master spatial index:
+1. GridIndex nearest-k matches a brute-force scan
+2. The process-level index follows committed writes to masters
+"""
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.models import Master
+from app.repositories import master_index
+from app.services.master_service import MasterService
+from app.utils.distance import haversine_distance
+from app.utils.spatial_index import GridIndex
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_spatial_index.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    """Create a fresh database session for each test"""
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def brute_force_nearest(points, lat, lng, k):
+    distances = sorted(
+        (haversine_distance(lat, lng, p_lat, p_lng), point_id)
+        for point_id, (p_lat, p_lng) in points.items()
+    )
+    return distances[:k]
+
+
+@pytest.mark.parametrize(
+    "center_lat, center_lng, spread",
+    [(40.7128, -74.0060, 0.5), (0.0, 179.9, 0.5), (89.5, 0.0, 1.0), (0.0, 0.0, 90.0)],
+)
+def test_grid_index_matches_brute_force(center_lat, center_lng, spread):
+    """Test nearest-k agrees with a full scan, including antimeridian and pole cases"""
+    rng = random.Random(42)
+    index = GridIndex(cell_size_deg=0.05)
+    points = {}
+    for point_id in range(1, 501):
+        lat = max(-90.0, min(90.0, center_lat + rng.uniform(-spread, spread)))
+        lng = (center_lng + rng.uniform(-spread, spread) + 180.0) % 360.0 - 180.0
+        points[point_id] = (lat, lng)
+        index.upsert(point_id, lat, lng)
+
+    for _ in range(20):
+        lat = max(-90.0, min(90.0, center_lat + rng.uniform(-spread, spread)))
+        lng = (center_lng + rng.uniform(-spread, spread) + 180.0) % 360.0 - 180.0
+        for k in (1, 5, 25):
+            assert index.nearest(lat, lng, k) == brute_force_nearest(points, lat, lng, k)
+
+
+def test_grid_index_upsert_and_remove():
+    """Test that moving and removing points is reflected in queries"""
+    index = GridIndex()
+    index.upsert(1, 40.7128, -74.0060)
+    index.upsert(2, 40.8000, -74.0000)
+
+    assert index.nearest(40.7128, -74.0060, 1)[0][1] == 1
+
+    index.upsert(1, 41.5000, -74.0000)
+    assert index.nearest(40.7128, -74.0060, 1)[0][1] == 2
+
+    index.remove(2)
+    assert len(index) == 1
+    assert index.nearest(40.7128, -74.0060, 5)[0][1] == 1
+
+
+def test_index_follows_new_and_updated_masters(db_session):
+    """Test that masters created or changed after the index is built are picked up"""
+    far = Master(name="Far", rating=4.5, is_available=True, geo_lat=40.8000, geo_lng=-74.0000)
+    db_session.add(far)
+    db_session.commit()
+
+    service = MasterService(db_session)
+    assert service.find_best_master(40.7128, -74.0060) == far.id
+
+    near = Master(name="Near", rating=4.5, is_available=True, geo_lat=40.7130, geo_lng=-74.0061)
+    db_session.add(near)
+    db_session.commit()
+    assert service.find_best_master(40.7128, -74.0060) == near.id
+
+    near.is_available = False
+    db_session.commit()
+    assert service.find_best_master(40.7128, -74.0060) == far.id
+
+    far.geo_lat, far.geo_lng = 51.5074, -0.1278
+    db_session.commit()
+    index = master_index.get_index(db_session)
+    assert index.nearest(51.5, -0.12, 1)[0][1] == far.id
+    assert near.id not in index
+
+
+def test_index_ignores_rolled_back_changes(db_session):
+    """Test that a rolled back insert never reaches the index"""
+    master = Master(name="Only", rating=4.5, is_available=True, geo_lat=40.8000, geo_lng=-74.0000)
+    db_session.add(master)
+    db_session.commit()
+
+    service = MasterService(db_session)
+    assert service.find_best_master(40.7128, -74.0060) == master.id
+
+    db_session.add(
+        Master(name="Ghost", rating=5.0, is_available=True, geo_lat=40.7128, geo_lng=-74.0060)
+    )
+    db_session.flush()
+    db_session.rollback()
+
+    assert len(master_index.get_index(db_session)) == 1
+    assert service.find_best_master(40.7128, -74.0060) == master.id